@@ -0,0 +1,136 @@
+"""
+Requests/sec of the sync DRF read views against their async twins, served
+through the project's ASGI application in-process at a fixed concurrency.
+
+    SECRET_KEY=x python -m benchmarks.async_views [requests] [concurrency]
+
+Defaults to 2,000 requests per endpoint at a concurrency of 200, against a
+throwaway SQLite file and the local-memory cache. Under ASGI every sync view
+runs in the one thread-sensitive executor thread, which is what the async
+views avoid.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "carservices.settings")
+
+
+def setup(db_path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    settings.EVENTS_BROKER_URL = "memory://"
+    settings.ALLOWED_HOSTS = ["*"]
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def seed():
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from booking import availability
+    from booking.models import Booking
+    from cars.models import Car, Category
+    from services.models import Service
+    from users.models import User
+
+    user = User.objects.create_user(phone_number="+989120000000", password="x")
+    category = Category.objects.create(name="Bench")
+    car = Car.objects.create(owner=user, category=category, name="car", pelak="P1", vin="V1")
+    services = [
+        Service.objects.create(title=f"Service {i}", service_type=Service.Type.Periodic, base_duration_minutes=30)
+        for i in range(20)
+    ]
+    day = timezone.localdate() + timedelta(days=2)
+    opens, _ = availability.working_window(day)
+    Booking.objects.create(user=user, car=car, service=services[0], start_at=opens, duration_minutes=60)
+    return str(RefreshToken.for_user(user).access_token), services[0].id, day
+
+
+async def request(app, path, query, token):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"cookie", f"accessToken={token}".encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    sent = False
+    status = None
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app, path, query, token, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await request(app, path, query, token)
+
+    assert await request(app, path, query, token) == 200, path  # warm caches
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, set(statuses)
+    return total / elapsed
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(os.path.join(tmp, "bench.sqlite3"))
+        token, service_id, day = seed()
+
+        from carservices.asgi import application
+
+        available = f"service_id={service_id}&date={day.isoformat()}"
+        pairs = [
+            ("available", "/booking/book/available/", "/booking/async/available/", available),
+            ("services", "/services/services/", "/services/async/services/", ""),
+            ("user info", "/users/info/", "/users/async/info/", ""),
+        ]
+
+        print(f"{total} requests per endpoint, concurrency {concurrency}")
+        for name, sync_path, async_path, query in pairs:
+            sync_rps = asyncio.run(run(application, sync_path, query, token, total, concurrency))
+            async_rps = asyncio.run(run(application, async_path, query, token, total, concurrency))
+            print(f"{name:10} sync {sync_rps:8.0f} req/s   async {async_rps:8.0f} req/s   x{async_rps / sync_rps:.2f}")
+
+
+if __name__ == "__main__":
+    main()
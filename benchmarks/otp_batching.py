@@ -0,0 +1,171 @@
+"""
+End-to-end latency, provider calls and dispatcher runs of outbox SMS sends
+during a login burst: one dispatcher kicked per message against the
+lingering kick, with a local fake gateway standing in for ippanel and a
+thread pool standing in for the Celery workers.
+
+    SECRET_KEY=x python -m benchmarks.otp_batching [messages] [rate/s] [gateway ms]
+
+Defaults to 1,000 messages arriving at 200/s, a gateway that answers in
+25 ms and 8 workers, against a throwaway SQLite file. Latency runs from the
+outbox row's created_at to its sent_at. "distinct" gives every recipient
+its own code, as real OTPs do; the pattern API takes one params set per
+request, so those still need one provider call each. "shared" draws from 5
+param sets, as a reminder wave would, and shows the call coalescing.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "carservices.settings")
+
+WORKERS = 8
+
+
+class Gateway(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), GatewayHandler)
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.calls += 1
+        time.sleep(self.server.latency)
+        body = b'{"status": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def setup(db_path, gateway):
+    for name, value in {
+        "FARAZ_SMS_API_KEY": "bench",
+        "FARAZ_SMS_SENDER_NUMBER": "+983000",
+        "FARAZ_SMS_LOGIN_OTP_PATTERN_CODE": "otp",
+        "FARAZ_SMS_REMINDER_PATTERN_CODE": "reminder",
+        "FARAZ_SMS_PHONE_BOOK_ID": "1",
+    }.items():
+        os.environ[name] = value
+
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    settings.SMS_BACKEND = "third_parties.sms.faraz_sms.SMSHandler"
+    settings.SMS_FALLBACK_BACKEND = None
+    django.setup()
+
+    from django.core.management import call_command
+
+    from third_parties.sms import faraz_sms
+
+    call_command("migrate", verbosity=0)
+    faraz_sms.SMSHandler.BASE_URL = f"http://127.0.0.1:{gateway.server_address[1]}/v1"
+
+
+def workload(total, shared):
+    from third_parties.sms.backends import LOGIN_OTP, REMINDER
+
+    if shared:
+        return [(f"+98912{i:07d}", REMINDER, {"time": f"1{i % 5}:00"}) for i in range(total)]
+    return [(f"+98912{i:07d}", LOGIN_OTP, {"verification-code": f"{i:05d}"}) for i in range(total)]
+
+
+def run(mode, items, rate):
+    from unittest import mock
+
+    from django.core.cache import cache
+    from django.db import connection, transaction
+
+    from users import outbox, tasks
+    from users.models import SmsOutbox
+
+    SmsOutbox.objects.all().delete()
+    cache.clear()
+    runs = []
+    executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="worker")
+
+    def dispatch():
+        try:
+            runs.append(tasks.dispatch_sms_outbox())
+        finally:
+            connection.close()
+
+    def apply_async(countdown=0):
+        threading.Timer(countdown, executor.submit, args=(dispatch,)).start()
+
+    def kick_every_message():
+        # the outbox before kicks lingered: one dispatcher task per message
+        tasks.dispatch_sms_outbox.apply_async(countdown=0)
+
+    patches = [mock.patch.object(tasks.dispatch_sms_outbox, "apply_async", apply_async)]
+    if mode == "per message":
+        patches.append(mock.patch.object(outbox, "kick", kick_every_message))
+    for patch in patches:
+        patch.start()
+
+    started = time.perf_counter()
+    for i, (phone, pattern, params) in enumerate(items):
+        time.sleep(max(started + i / rate - time.perf_counter(), 0))
+        with transaction.atomic():
+            outbox.enqueue(phone, pattern, params)
+    while SmsOutbox.objects.filter(sent_at__isnull=True).exists():
+        time.sleep(0.05)
+    executor.shutdown(wait=True)
+    for patch in patches:
+        patch.stop()
+
+    latencies = sorted(
+        (sent_at - created_at).total_seconds() for created_at, sent_at in SmsOutbox.objects.values_list(
+            "created_at", "sent_at",
+        )
+    )
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], len(runs)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 25) / 1000
+
+    gateway = Gateway(latency)
+    threading.Thread(target=gateway.serve_forever, daemon=True).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(os.path.join(tmp, "bench.sqlite3"), gateway)
+
+        print(f"{total} messages at {rate:.0f}/s, gateway {latency * 1000:.0f} ms, {WORKERS} workers")
+        for workload_name, shared in (("distinct", False), ("shared", True)):
+            items = workload(total, shared)
+            for mode in ("per message", "lingering"):
+                gateway.calls = 0
+                p50, p99, runs = run(mode, items, rate)
+                print(
+                    f"{workload_name:9} {mode:12} p50 {p50 * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms   "
+                    f"provider calls {gateway.calls:5}   dispatcher runs {runs}"
+                )
+    gateway.shutdown()
+
+
+if __name__ == "__main__":
+    main()
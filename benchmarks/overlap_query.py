@@ -0,0 +1,139 @@
+"""
+Car overlap check on a seeded bookings table: the original Python loop,
+versus the single exists() query on the persisted end_at column.
+
+    SECRET_KEY=x python -m benchmarks.overlap_query [bookings] [cars]
+
+Defaults to 1,000,000 bookings over 1,000 cars in a throwaway SQLite file.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "carservices.settings")
+
+SEED_BATCH = 5000
+CHECKS = 200
+
+
+def setup(db_path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def seed(total, car_count):
+    from django.utils import timezone
+
+    from booking.models import Booking
+    from cars.models import Car, Category
+    from services.models import Service
+    from users.models import User
+
+    user = User.objects.create_user(phone_number="+989120000000", password="x")
+    category = Category.objects.create(name="Bench")
+    service = Service.objects.create(title="Bench", service_type=Service.Type.Periodic, base_duration_minutes=30)
+    Car.objects.bulk_create(
+        Car(owner=user, category=category, name=f"car{i}", pelak=f"P{i}", vin=f"V{i}") for i in range(car_count)
+    )
+    car_ids = list(Car.objects.values_list("id", flat=True))
+
+    rnd = random.Random(1)
+    origin = timezone.now() - timedelta(days=3 * 365)
+    statuses = [s.value for s in Booking.Status]
+    batch = []
+    for i in range(total):
+        start = origin + timedelta(minutes=30 * (i // car_count))
+        minutes = rnd.choice((30, 60, 90))
+        batch.append(Booking(
+            user=user, car_id=car_ids[i % car_count], service=service,
+            start_at=start, duration_minutes=minutes, end_at=start + timedelta(minutes=minutes),
+            status=rnd.choice(statuses),
+        ))
+        if len(batch) == SEED_BATCH:
+            Booking.objects.bulk_create(batch)
+            batch = []
+    Booking.objects.bulk_create(batch)
+    return car_ids, origin + timedelta(minutes=30 * (total // car_count))
+
+
+rows_read = {"legacy": 0}
+
+
+def legacy_check(car_id, start_at, end_at):
+    from booking.models import Booking
+    from booking.serializers import ACTIVE_STATUSES
+
+    qs = Booking.objects.filter(car_id=car_id, status__in=ACTIVE_STATUSES)
+    for b in qs.filter(start_at__lt=end_at).exclude(start_at__gte=end_at):
+        rows_read["legacy"] += 1
+        b_end = b.start_at + timedelta(minutes=b.duration_minutes)
+        if b.start_at < end_at and b_end > start_at:
+            return True
+    return False
+
+
+def exists_check(car_id, start_at, end_at):
+    from booking import defaults
+    from booking.models import Booking
+    from booking.serializers import ACTIVE_STATUSES
+
+    return Booking.objects.filter(
+        car_id=car_id,
+        status__in=ACTIVE_STATUSES,
+        start_at__gte=start_at - timedelta(minutes=defaults.MAX_BOOKING_MINUTES),
+        start_at__lt=end_at,
+        end_at__gt=start_at,
+    ).exists()
+
+
+def measure(check, probes):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        began = time.perf_counter()
+        results = [check(*probe) for probe in probes]
+        elapsed = time.perf_counter() - began
+    return results, len(queries) / len(probes), elapsed / len(probes) * 1000
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    car_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(os.path.join(tmp, "bench.sqlite3"))
+        began = time.perf_counter()
+        car_ids, horizon = seed(total, car_count)
+        print(f"seeded {total} bookings over {car_count} cars in {time.perf_counter() - began:.1f}s")
+
+        rnd = random.Random(2)
+        probes = []
+        for _ in range(CHECKS):
+            # half the probes land inside the history, half just after it
+            start = horizon - timedelta(minutes=rnd.choice((15, 600, -60)))
+            probes.append((rnd.choice(car_ids), start, start + timedelta(minutes=30)))
+
+        legacy, legacy_queries, legacy_ms = measure(legacy_check, probes)
+        new, new_queries, new_ms = measure(exists_check, probes)
+        assert legacy == new
+
+        print(f"{'check':>8} {'queries/check':>14} {'rows/check':>11} {'ms/check':>9}")
+        print(f"{'legacy':>8} {legacy_queries:>14.1f} {rows_read['legacy'] / CHECKS:>11.1f} {legacy_ms:>9.2f}")
+        print(f"{'exists':>8} {new_queries:>14.1f} {'-':>11} {new_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Time to create a 52-week recurring series against a service type with a
+year of bookings: the bay allocator reading the whole year at once, versus
+reading only the occurrence windows.
+
+    SECRET_KEY=x python -m benchmarks.series [bookings per day] [runs]
+
+Defaults to 360 bookings a day for a year in a throwaway SQLite file and 5
+series per variant. Exits non-zero when a windowed series takes longer than
+TARGET_MS.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "carservices.settings")
+
+SEED_BATCH = 5000
+DAYS = 365
+OCCURRENCES = 52
+TARGET_MS = 100
+
+
+def setup(db_path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    settings.EVENTS_BROKER_URL = "memory://"
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def seed(per_day):
+    from django.utils import timezone
+
+    from booking.models import Booking
+    from cars.models import Car, Category
+    from services.models import Service, ServiceBay
+    from users.models import User
+
+    user = User.objects.create_user(phone_number="+989120000000", password="x")
+    category = Category.objects.create(name="Bench")
+    service = Service.objects.create(title="Bench", service_type=Service.Type.Periodic, base_duration_minutes=60)
+    bay = ServiceBay.objects.create(title="Line", service_type=service.service_type, capacity=per_day)
+    cars = Car.objects.bulk_create(
+        Car(owner=user, category=category, name=f"car{i}", pelak=f"P{i}", vin=f"V{i}") for i in range(per_day)
+    )
+
+    first_day = timezone.localdate() + timedelta(days=1)
+    batch = []
+    for day in range(DAYS):
+        opens = timezone.make_aware(datetime.combine(first_day + timedelta(days=day), datetime.min.time())).replace(hour=9)
+        for i, car in enumerate(cars):
+            start = opens + timedelta(minutes=30 * (i % 16))
+            batch.append(Booking(
+                user=user, car=car, service=service, bay=bay,
+                start_at=start, duration_minutes=60, end_at=start + timedelta(minutes=60),
+            ))
+            if len(batch) == SEED_BATCH:
+                Booking.objects.bulk_create(batch)
+                batch = []
+    Booking.objects.bulk_create(batch)
+    return user, service, category, first_day
+
+
+def measure(create, runs):
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for run in range(runs):
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            began = time.perf_counter()
+            created = create(run)
+            timings.append((time.perf_counter() - began) * 1000)
+            assert len(created) == OCCURRENCES
+            transaction.set_rollback(True)
+    return len(queries), statistics.median(timings)
+
+
+def main():
+    per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 360
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(os.path.join(tmp, "bench.sqlite3"))
+        began = time.perf_counter()
+        user, service, category, first_day = seed(per_day)
+        print(f"seeded {per_day * DAYS} bookings over {DAYS} days in {time.perf_counter() - began:.1f}s")
+
+        from unittest import mock
+
+        from django.utils import timezone
+
+        from booking import bays, bulk, series
+        from cars.models import Car
+
+        car = Car.objects.create(owner=user, category=category, name="series", pelak="S1", vin="S1")
+        start_at = timezone.make_aware(datetime.combine(first_day, datetime.min.time())).replace(hour=17)
+
+        def create(run):
+            data = {
+                "car": car, "service": service, "start_at": start_at + timedelta(days=run),
+                "duration_minutes": 60, "interval_weeks": 1, "occurrences": OCCURRENCES, "note": "",
+            }
+            return series.create_series(user, data)[1]
+
+        real_allocator = bays.BayAllocator
+
+        def whole_range(service_types, windows, *args, **kwargs):
+            # the allocator before it read per window: one range over the whole series
+            windows = list(windows)
+            span = (min(start for start, _ in windows), max(end for _, end in windows))
+            return real_allocator(service_types, [span], *args, **kwargs)
+
+        with mock.patch.object(bulk, "BayAllocator", whole_range):
+            range_queries, range_ms = measure(create, runs)
+        windowed_queries, windowed_ms = measure(create, runs)
+
+        print(f"{'allocator':>12} {'queries':>8} {'ms/series':>10}")
+        print(f"{'whole range':>12} {range_queries:>8} {range_ms:>10.1f}")
+        print(f"{'windowed':>12} {windowed_queries:>8} {windowed_ms:>10.1f}")
+        ok = windowed_ms < TARGET_MS
+        print(f"target {TARGET_MS} ms per series: {'met' if ok else 'MISSED'}")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
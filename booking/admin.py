@@ -1,5 +1,5 @@
 from django.contrib import admin
-from booking.models import Booking
+from booking.models import ArchivedBooking, Booking, BookingSeries, Holiday, WorkingCalendar
 
 
 @admin.register(Booking)
@@ -9,9 +9,56 @@ class BookingAdmin(admin.ModelAdmin):
         "user",
         "car",
         "service",
+        "bay",
         "start_at",
         "duration_minutes",
         "status",
         "created_at",
     )
-    list_filter = ("status", "service", "created_at")
\ No newline at end of file
+    list_filter = ("status", "service", "bay", "created_at")
+
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "car",
+        "service",
+        "start_at",
+        "interval_weeks",
+        "occurrences",
+        "created_at",
+    )
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "car",
+        "service",
+        "start_at",
+        "status",
+        "archived_at",
+    )
+    list_filter = ("status", "service")
+
+
+@admin.register(WorkingCalendar)
+class WorkingCalendarAdmin(admin.ModelAdmin):
+    list_display = (
+        "weekday",
+        "is_closed",
+        "opens_at",
+        "closes_at",
+        "break_starts_at",
+        "break_ends_at",
+    )
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ("date", "title")
+    search_fields = ("title",)
@@ -0,0 +1,264 @@
+import math
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from booking import bays, defaults, holds, schedule
+from carservices import singleflight
+from booking.models import Booking
+from booking.intervals import IntervalIndex
+from booking.occupancy import MINUTE, DayOccupancy
+from booking.serializers import ACTIVE_STATUSES
+
+
+def working_window(day):
+    """``(opens, closes)`` of ``day`` from the working calendar, ``(None, None)`` when closed."""
+    grid = schedule.day_grid(day)
+    return grid.opens, grid.closes
+
+
+def days_between(day_from, day_to):
+    return [day_from + timedelta(days=i) for i in range((day_to - day_from).days + 1)]
+
+
+def slots_per_day(day, slot_minutes=defaults.SLOT_MINUTES):
+    return sum(schedule.day_grid(day, slot_minutes=slot_minutes).bookable)
+
+
+def occupancy_by_day(group, day_from, day_to, calendar=None):
+    """
+    Build a DayOccupancy for every open day in ``day_from..day_to``
+    (inclusive) for one ``bays.BayGroup``, from one
+    range query over ``start_at``. Bookings that started before a window but
+    run into it are found through the interval index. Closed days get no
+    occupancy, and a range without open days runs no query.
+    """
+    service_type, capacity, _ = group
+    calendar = calendar or schedule.rules()
+    occupancies = {}
+    for day in days_between(day_from, day_to):
+        grid = schedule.day_grid(day, calendar)
+        if grid.opens is not None:
+            occupancies[day] = DayOccupancy(grid.opens, grid.closes, capacity=capacity)
+    if not occupancies:
+        return occupancies
+    range_start = min(occupancy.window_start for occupancy in occupancies.values())
+    range_end = max(schedule.day_grid(day, calendar).closes for day in occupancies)
+
+    rows = Booking.objects.filter(
+        service__service_type=service_type,
+        status__in=ACTIVE_STATUSES,
+        start_at__gte=range_start - timedelta(minutes=defaults.MAX_BOOKING_MINUTES),
+        start_at__lt=range_end,
+        end_at__gt=range_start,
+    ).values_list("start_at", "end_at")
+    index = IntervalIndex(rows, timedelta(minutes=defaults.MAX_BOOKING_MINUTES))
+
+    for occupancy in occupancies.values():
+        window_end = occupancy.window_start + timedelta(minutes=occupancy.minutes)
+        for start, end in index.overlapping(occupancy.window_start, window_end):
+            occupancy.add(start, end)
+    return occupancies
+
+
+def _version_key(day):
+    return f"availability:version:{day.isoformat()}"
+
+
+def _entry_key(group, day, version, calendar):
+    service_type, capacity, slot_minutes = group
+    return (
+        f"availability:{service_type}:{capacity}:{slot_minutes}:{day.isoformat()}:v{version}:c{calendar.version}"
+    )
+
+
+HEADROOM_CACHE = {
+    "timeout": defaults.AVAILABILITY_CACHE_SECONDS,
+    "stale_timeout": defaults.AVAILABILITY_STALE_SECONDS,
+    "stats_prefix": "availability:stats",
+}
+
+
+def cache_stats():
+    stats = cache.get_many(["availability:stats:hits", "availability:stats:misses"])
+    return {
+        "hits": stats.get("availability:stats:hits", 0),
+        "misses": stats.get("availability:stats:misses", 0),
+    }
+
+
+def invalidate_days(days):
+    """Drop the cached availability of ``days`` for every bay group."""
+    for day in set(days):
+        key = _version_key(day)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def _open_days(day_from, day_to, calendar):
+    return [day for day in days_between(day_from, day_to) if schedule.day_grid(day, calendar).opens is not None]
+
+
+def _headroom_entries(group, days, versions, calendar):
+    keys = {_entry_key(group, day, versions.get(_version_key(day), 0), calendar): day for day in days}
+
+    def compute(missing_keys):
+        missing = sorted(keys[key] for key in missing_keys)
+        occupancies = occupancy_by_day(group, missing[0], missing[-1], calendar)
+        computed = {}
+        for key in missing_keys:
+            day = keys[key]
+            rooms = occupancies[day].slot_headroom(group.slot_minutes)
+            bookable = schedule.day_grid(day, calendar, group.slot_minutes).bookable
+            computed[key] = [room if is_bookable else 0 for room, is_bookable in zip(rooms, bookable)]
+        return computed
+
+    return keys, compute
+
+
+def _unlimited_headroom(day_from, day_to, calendar, slot_minutes):
+    """Headroom of a service type without bays: every bookable slot has room."""
+    return {
+        day: [math.inf if is_bookable else 0 for is_bookable in schedule.day_grid(day, calendar, slot_minutes).bookable]
+        for day in days_between(day_from, day_to)
+    }
+
+
+def headroom_by_day(group, day_from, day_to, calendar=None):
+    """
+    ``{day: [spare capacity per slot]}`` for ``day_from..day_to``, from
+    bookings only, served from the cache where possible. Missing days are
+    computed together with one range query spanning the first to the last
+    missing day, by a single worker at a time (see carservices.singleflight).
+    Closed days come back empty without touching the cache or the database,
+    and so does every day of a group without bays.
+    """
+    calendar = calendar or schedule.rules()
+    if group.capacity is bays.UNLIMITED:
+        return _unlimited_headroom(day_from, day_to, calendar, group.slot_minutes)
+    headroom = {day: [] for day in days_between(day_from, day_to)}
+    days = _open_days(day_from, day_to, calendar)
+    if days:
+        versions = cache.get_many([_version_key(day) for day in days])
+        keys, compute = _headroom_entries(group, days, versions, calendar)
+        values = singleflight.get_many_or_compute(keys, compute, **HEADROOM_CACHE)
+        headroom.update({day: values[key] for key, day in keys.items()})
+    return headroom
+
+
+async def aheadroom_by_day(group, day_from, day_to, calendar=None):
+    """Async form of :func:`headroom_by_day`; a warm cache needs no thread hop."""
+    calendar = calendar or await schedule.arules()
+    if group.capacity is bays.UNLIMITED:
+        return _unlimited_headroom(day_from, day_to, calendar, group.slot_minutes)
+    headroom = {day: [] for day in days_between(day_from, day_to)}
+    days = _open_days(day_from, day_to, calendar)
+    if days:
+        versions = await cache.aget_many([_version_key(day) for day in days])
+        keys, compute = _headroom_entries(group, days, versions, calendar)
+        values = await singleflight.aget_many_or_compute(keys, compute, **HEADROOM_CACHE)
+        headroom.update({day: values[key] for key, day in keys.items()})
+    return headroom
+
+
+def _free_offsets(headroom, held, calendar, slot_minutes):
+    result = {}
+    for day, rooms in headroom.items():
+        rooms = list(rooms)
+        if rooms:
+            opens = schedule.day_grid(day, calendar, slot_minutes).opens
+            for start_at, end_at in held[day]:
+                first = max((start_at - opens) // MINUTE // slot_minutes, 0)
+                last = min(-((opens - end_at) // MINUTE) - 1, len(rooms) * slot_minutes - 1)
+                for index in range(first, last // slot_minutes + 1):
+                    rooms[index] -= 1
+        result[day] = [index * slot_minutes for index, room in enumerate(rooms) if room > 0]
+    return result
+
+
+def free_offsets_by_day(group, day_from, day_to, calendar=None):
+    """
+    ``{day: [free slot offsets]}``: cached booking headroom minus the slot
+    holds currently in the cache. Needs no database round trip once warm.
+    """
+    calendar = calendar or schedule.rules()
+    headroom = headroom_by_day(group, day_from, day_to, calendar)
+    return _free_offsets(headroom, holds.active_holds(group.service_type, list(headroom)), calendar, group.slot_minutes)
+
+
+async def afree_offsets_by_day(group, day_from, day_to, calendar=None):
+    calendar = calendar or await schedule.arules()
+    headroom = await aheadroom_by_day(group, day_from, day_to, calendar)
+    held = await holds.aactive_holds(group.service_type, list(headroom))
+    return _free_offsets(headroom, held, calendar, group.slot_minutes)
+
+
+def _slot_times(grid, offsets, slot_minutes):
+    return [grid.starts[offset // slot_minutes] for offset in offsets]
+
+
+def _masks(offsets_by_day, calendar, slot_minutes):
+    masks = {}
+    for day, offsets in offsets_by_day.items():
+        mask = ["0"] * len(schedule.day_grid(day, calendar, slot_minutes).starts)
+        for offset in offsets:
+            mask[offset // slot_minutes] = "1"
+        masks[day] = "".join(mask)
+    return masks
+
+
+def free_slots(group, day):
+    calendar = schedule.rules()
+    grid = schedule.day_grid(day, calendar, group.slot_minutes)
+    return _slot_times(grid, free_offsets_by_day(group, day, day, calendar)[day], group.slot_minutes)
+
+
+async def afree_slots(group, day):
+    calendar = await schedule.arules()
+    offsets = (await afree_offsets_by_day(group, day, day, calendar))[day]
+    return _slot_times(schedule.day_grid(day, calendar, group.slot_minutes), offsets, group.slot_minutes)
+
+
+def free_slot_masks(group, day_from, day_to):
+    """
+    ``{day: "1101..."}`` with one character per slot of the group's slot
+    size from the day's opening time, ``1`` meaning free. Closed days have
+    an empty mask.
+    """
+    calendar = schedule.rules()
+    return _masks(free_offsets_by_day(group, day_from, day_to, calendar), calendar, group.slot_minutes)
+
+
+async def afree_slot_masks(group, day_from, day_to):
+    calendar = await schedule.arules()
+    return _masks(await afree_offsets_by_day(group, day_from, day_to, calendar), calendar, group.slot_minutes)
+
+
+def free_slot_counts(group, day_from, day_to):
+    return {day: len(offsets) for day, offsets in free_offsets_by_day(group, day_from, day_to).items()}
+
+
+def next_free_slots(group, day_from, count, time_from=None, time_to=None):
+    """
+    The first ``count`` free slots from ``day_from`` on, optionally limited
+    to slots starting in ``time_from..time_to`` (local time, end exclusive).
+    The whole NEXT_AVAILABLE_HORIZON_DAYS horizon is read at once, so a cold
+    cache costs one range query however far away the first free slot is.
+    Slots that already started are skipped. Returns ``(slots, last day scanned)``.
+    """
+    day_to = day_from + timedelta(days=defaults.NEXT_AVAILABLE_HORIZON_DAYS - 1)
+    calendar = schedule.rules()
+    now = timezone.now()
+    found = []
+    for day, offsets in sorted(free_offsets_by_day(group, day_from, day_to, calendar).items()):
+        for slot in _slot_times(schedule.day_grid(day, calendar, group.slot_minutes), offsets, group.slot_minutes):
+            clock = timezone.localtime(slot).time()
+            if slot < now or (time_from and clock < time_from) or (time_to and clock >= time_to):
+                continue
+            found.append(slot)
+            if len(found) == count:
+                return found, day
+    return found, day_to
@@ -0,0 +1,226 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+from operator import itemgetter
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from rest_framework import serializers
+
+from booking import defaults, holds
+from booking.models import Booking
+from booking.occupancy import peak_concurrency
+from carservices.locks import cache_lock
+from services.models import Service, ServiceBay
+
+BAY_GROUPS_CACHE_KEY = "booking:bay-groups:v2"
+UNLIMITED = None # capacity of a service type without any bay: only the car's own bookings limit it
+
+# the bays a service books from, and the slot size its availability is shown in
+BayGroup = namedtuple("BayGroup", "service_type capacity slot_minutes", defaults=(defaults.SLOT_MINUTES,))
+
+
+def bay_groups():
+    """
+    ``{service_id: BayGroup}`` for every active service, cached. The capacity
+    is the sum of the type's active bays, or UNLIMITED when no bay was ever
+    configured for the type. Services of one type share the capacity but
+    each keeps its own slot size.
+    """
+    groups = cache.get(BAY_GROUPS_CACHE_KEY)
+    if groups is None:
+        capacities = {
+            service_type: total or 0
+            for service_type, total in ServiceBay.objects.values("service_type")
+            .annotate(total=Sum("capacity", filter=Q(is_active=True)))
+            .values_list("service_type", "total")
+        }
+        groups = {
+            service_id: BayGroup(service_type, capacities.get(service_type, UNLIMITED), slot_minutes)
+            for service_id, service_type, slot_minutes in Service.objects.filter(is_active=True).values_list(
+                "id", "service_type", "slot_minutes",
+            )
+        }
+        cache.set(BAY_GROUPS_CACHE_KEY, groups, timeout=None)
+    return groups
+
+
+def invalidate_bay_groups():
+    cache.delete(BAY_GROUPS_CACHE_KEY)
+
+
+def group_for_service(service_id):
+    return bay_groups().get(service_id)
+
+
+async def agroup_for_service(service_id):
+    groups = await cache.aget(BAY_GROUPS_CACHE_KEY)
+    if groups is None:
+        groups = await sync_to_async(bay_groups)()
+    return groups.get(service_id)
+
+
+NO_FREE_BAY = "No service bay is free in the selected time window."
+MAX_LENGTH = timedelta(minutes=defaults.MAX_BOOKING_MINUTES)
+
+
+def bay_lock_key(bay_id):
+    return f"booking:lock:bay:{bay_id}"
+
+
+def load_bays(service_types):
+    """Every bay of ``service_types``, active or not, in allocation order."""
+    return list(ServiceBay.objects.filter(service_type__in=set(service_types)).order_by("id"))
+
+
+def _merged_windows(windows):
+    """
+    ``windows`` sorted, with those whose booking lookups overlap merged: a
+    booking can then only match one of them, and each becomes one condition.
+    """
+    merged = []
+    for start_at, end_at in sorted(windows):
+        if merged and start_at - MAX_LENGTH < merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end_at)
+        else:
+            merged.append([start_at, end_at])
+    return merged
+
+
+def _full(intervals, start_at, end_at, capacity):
+    # fewer intervals than places can never fill them: skip the sweep
+    return len(intervals) >= capacity and peak_concurrency(intervals, start_at, end_at) >= capacity
+
+
+class BayAllocator:
+    """
+    Hands out bays for any number of bookings of the given service types
+    inside the ``[start_at, end_at)`` ``windows`` they may take. Loads the
+    bays (unless ``bays`` from load_bays are given) and their services with
+    one query each, and only the bookings overlapping those windows with one
+    query per ALLOCATOR_WINDOWS_PER_QUERY windows, so a year-long series
+    never reads the whole year. Remembers its own allocations so later calls see earlier
+    ones. Intervals are kept sorted by start, so each lookup bisects instead
+    of scanning the whole range.
+
+    Service types without any bay are not limited, as before bays existed.
+    The booking ``exclude`` (one being rescheduled) does not count. The
+    allocator takes no locks: callers hold the lock of every bay they may
+    write to (see reserved_bay).
+    """
+
+    def __init__(self, service_types, windows, active_statuses, bays=None, exclude=None):
+        self.configured = set()
+        self.bays = defaultdict(list)
+        for bay in load_bays(service_types) if bays is None else bays:
+            self.configured.add(bay.service_type)
+            if bay.is_active:
+                self.bays[bay.service_type].append(bay)
+
+        self.by_group = defaultdict(list)
+        self.by_bay = defaultdict(list)
+        if not self.configured:
+            return
+
+        # explicit ids (inactive services included) let every window use the
+        # (service, status, start_at) index instead of a join
+        service_types = dict(
+            Service.objects.filter(service_type__in=self.configured).values_list("id", "service_type")
+        )
+        active = Booking.objects.filter(service_id__in=service_types, status__in=active_statuses).values_list(
+            "start_at", "end_at", "service_id", "bay_id",
+        )
+        if exclude is not None:
+            active = active.exclude(pk=exclude)
+        merged = _merged_windows(windows)
+        for i in range(0, len(merged), defaults.ALLOCATOR_WINDOWS_PER_QUERY):
+            # one range scan per window, sent as a single UNION ALL; merged
+            # windows are disjoint, so no booking comes back twice
+            ranges = [
+                active.filter(start_at__gte=start_at - MAX_LENGTH, start_at__lt=end_at, end_at__gt=start_at)
+                for start_at, end_at in merged[i:i + defaults.ALLOCATOR_WINDOWS_PER_QUERY]
+            ]
+            rows = ranges[0].union(*ranges[1:], all=True) if len(ranges) > 1 else ranges[0]
+            # sorted chunks of sorted windows come back in start order
+            for b_start, b_end, service_id, bay_id in rows.order_by("start_at"):
+                self.by_group[service_types[service_id]].append((b_start, b_end))
+                if bay_id is not None:
+                    self.by_bay[bay_id].append((b_start, b_end))
+
+    def _overlapping(self, intervals, start_at, end_at):
+        lo = bisect_right(intervals, start_at - MAX_LENGTH, key=itemgetter(0))
+        hi = bisect_left(intervals, end_at, key=itemgetter(0))
+        return [(s, e) for s, e in intervals[lo:hi] if e > start_at]
+
+    def allocate(self, service_type, start_at, end_at, held=None, skip=()):
+        """
+        Return a bay of ``service_type`` with room in ``[start_at, end_at)``,
+        or ``None`` for service types without bays. ``held`` maps bay id to
+        slot hold intervals (see holds.held_by_bay); they count against their
+        bay and the group. Bays in ``skip`` are not handed out.
+        """
+        if service_type not in self.configured:
+            return None
+
+        held = held or {}
+        bays = self.bays[service_type]
+        group = self._overlapping(self.by_group[service_type], start_at, end_at)
+        group_held = [interval for intervals in held.values() for interval in intervals]
+        if _full([*group, *group_held], start_at, end_at, sum(bay.capacity for bay in bays)):
+            raise serializers.ValidationError(NO_FREE_BAY)
+
+        for bay in bays:
+            if bay.id in skip:
+                continue
+            taken = [*self._overlapping(self.by_bay[bay.id], start_at, end_at), *held.get(bay.id, ())]
+            if not _full(taken, start_at, end_at, bay.capacity):
+                insort(self.by_group[service_type], (start_at, end_at))
+                insort(self.by_bay[bay.id], (start_at, end_at))
+                return bay
+        raise serializers.ValidationError(NO_FREE_BAY)
+
+
+def bay_has_room(bay, start_at, end_at, active_statuses, held=(), exclude=None):
+    """
+    Check ``bay`` against the database, other than the booking ``exclude``,
+    and its ``held`` intervals; call it holding the bay's lock.
+    """
+    taken = Booking.objects.filter(
+        bay=bay,
+        status__in=active_statuses,
+        start_at__gte=start_at - MAX_LENGTH,
+        start_at__lt=end_at,
+        end_at__gt=start_at,
+    ).values_list("start_at", "end_at")
+    if exclude is not None:
+        taken = taken.exclude(pk=exclude)
+    return not _full([*taken, *held], start_at, end_at, bay.capacity)
+
+
+@contextmanager
+def reserved_bay(service_type, start_at, end_at, active_statuses, exclude_token=None, exclude=None):
+    """
+    Yield a bay of ``service_type`` with room in ``[start_at, end_at)`` while
+    holding its cache lock, or ``None`` for service types without bays. The
+    bay is picked without any lock and checked again once locked, so
+    creations on different bays run in parallel; a bay another worker filled
+    in between is skipped. Slot holds other than ``exclude_token`` count;
+    the booking ``exclude`` (one being rescheduled) does not.
+    """
+    days = holds.days_touched(start_at, end_at)
+    skipped = set()
+    while True:
+        allocator = BayAllocator([service_type], [(start_at, end_at)], active_statuses, exclude=exclude)
+        held = holds.held_by_bay(service_type, days, exclude_token)
+        bay = allocator.allocate(service_type, start_at, end_at, held, skip=skipped)
+        if bay is None:
+            yield None
+            return
+        with cache_lock(bay_lock_key(bay.id)):
+            held = holds.held_by_bay(service_type, days, exclude_token)
+            if bay_has_room(bay, start_at, end_at, active_statuses, held.get(bay.id, ()), exclude):
+                yield bay
+                return
+        skipped.add(bay.id)
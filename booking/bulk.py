@@ -0,0 +1,172 @@
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from rest_framework import serializers
+
+from booking import availability, defaults, events, holds, schedule
+from booking.bays import BayAllocator, bay_lock_key, load_bays
+from booking.intervals import IntervalIndex
+from booking.models import Booking
+from booking.serializers import (
+    ACTIVE_STATUSES,
+    BookingBulkItemSerializer,
+    car_lock_key,
+)
+from cars.models import Car
+from carservices.db import write_transaction
+from carservices.locks import cache_locks
+from services.models import Service
+
+CAR_NOT_OWNED = "You can only book services for your own car."
+CAR_BUSY = "This car already has a booking in the selected time window."
+
+Candidate = namedtuple("Candidate", "index data service start_at end_at duration")
+WriteBatch = namedtuple("WriteBatch", "cars existing allocator held")
+
+
+def _overlaps(intervals, start_at, end_at):
+    return any(s < end_at and e > start_at for s, e in intervals)
+
+
+@contextmanager
+def write_batch(car_ids, service_types, windows, owner=None):
+    """
+    Take everything a batch of bookings in ``windows`` is checked and
+    inserted under: the car locks, then the bay locks of ``service_types``
+    (the order single creations take them in), the write transaction and
+    the car rows. Yields a WriteBatch of the locked cars by id (only those
+    of ``owner`` when given), each car's active ``(start_at, end_at)`` near
+    the windows sorted by start, a BayAllocator over the windows and the
+    bay holds of each service type.
+    """
+    range_start = min(start_at for start_at, _ in windows)
+    range_end = max(end_at for _, end_at in windows)
+    service_bays = load_bays(service_types)
+    car_locks = [car_lock_key(car_id) for car_id in car_ids]
+    bay_locks = [bay_lock_key(bay.id) for bay in service_bays if bay.is_active]
+
+    with cache_locks(car_locks), cache_locks(bay_locks), write_transaction():
+        cars = Car.objects.select_for_update()
+        if owner is not None:
+            cars = cars.filter(owner=owner)
+        cars = cars.in_bulk(car_ids)
+
+        rows = Booking.objects.filter(
+            car_id__in=list(cars),
+            status__in=ACTIVE_STATUSES,
+            start_at__gte=range_start - timedelta(minutes=defaults.MAX_BOOKING_MINUTES),
+            start_at__lt=range_end,
+            end_at__gt=range_start,
+        ).order_by("start_at").values_list("car_id", "start_at", "end_at")
+        existing = defaultdict(list)
+        for car_id, b_start, b_end in rows:
+            existing[car_id].append((b_start, b_end))
+
+        days = sorted({day for start_at, end_at in windows for day in holds.days_touched(start_at, end_at)})
+        yield WriteBatch(
+            cars=cars,
+            existing=existing,
+            allocator=BayAllocator(service_types, windows, ACTIVE_STATUSES, service_bays),
+            held={service_type: holds.held_by_bay(service_type, days) for service_type in service_types},
+        )
+
+
+def insert_bookings(bookings):
+    """
+    Insert ``bookings`` with one ``bulk_create`` inside the write transaction
+    of a write_batch, invalidating their days and publishing them once it
+    commits.
+    """
+    Booking.objects.bulk_create(bookings)
+
+    # bulk_create sends no post_save, so invalidate the touched days here
+    touched = {day for b in bookings for day in holds.days_touched(b.start_at, b.end_at)}
+    transaction.on_commit(lambda: availability.invalidate_days(touched))
+    events.publish_on_commit([(b.service_id, b.start_at, b.end_at, events.BOOKED) for b in bookings])
+    return bookings
+
+
+def create_bookings(user, items):
+    """
+    Validate and insert a batch of bookings for ``user`` in one pass.
+
+    Ownership, services and existing conflicts are each read with a single
+    query for the whole batch; conflicts between items of the same batch are
+    checked in memory. Valid items are inserted with one ``bulk_create`` in a
+    single transaction, invalid ones are reported by index.
+
+    Returns ``(created_bookings, errors)`` where ``errors`` maps item index to
+    its validation errors.
+    """
+    errors = {}
+    parsed = []
+    for index, item in enumerate(items):
+        item_serializer = BookingBulkItemSerializer(data=item)
+        if item_serializer.is_valid():
+            parsed.append((index, item_serializer.validated_data))
+        else:
+            errors[index] = item_serializer.errors
+
+    services = Service.objects.filter(is_active=True).in_bulk({data["service"] for _, data in parsed})
+    candidates = []
+    for index, data in parsed:
+        service = services.get(data["service"])
+        if service is None:
+            errors[index] = {"service": ["Unknown service."]}
+            continue
+        duration = data.get("duration_minutes") or service.base_duration_minutes
+        if duration > defaults.MAX_BOOKING_MINUTES:
+            errors[index] = {"duration_minutes": [f"A booking may last at most {defaults.MAX_BOOKING_MINUTES} minutes."]}
+            continue
+        start_at = data["start_at"]
+        end_at = start_at + timedelta(minutes=duration)
+        error = schedule.window_error(start_at, end_at)
+        if error:
+            errors[index] = {"start_at": [error]}
+            continue
+        candidates.append(Candidate(index, data, service, start_at, end_at, duration))
+
+    if not candidates:
+        return [], errors
+
+    car_ids = {c.data["car"] for c in candidates}
+    service_types = {c.service.service_type for c in candidates}
+    windows = [(c.start_at, c.end_at) for c in candidates]
+    max_length = timedelta(minutes=defaults.MAX_BOOKING_MINUTES)
+
+    created = []
+    with write_batch(car_ids, service_types, windows, owner=user) as batch:
+        existing = {car_id: IntervalIndex(intervals, max_length) for car_id, intervals in batch.existing.items()}
+        accepted = defaultdict(list)
+        for index, data, service, start_at, end_at, duration in candidates:
+            car = batch.cars.get(data["car"])
+            if car is None:
+                errors[index] = {"car": [CAR_NOT_OWNED]}
+                continue
+            index_for_car = existing.get(car.id)
+            if (index_for_car and index_for_car.overlaps(start_at, end_at)) or _overlaps(accepted[car.id], start_at, end_at):
+                errors[index] = {"non_field_errors": [CAR_BUSY]}
+                continue
+            try:
+                bay = batch.allocator.allocate(service.service_type, start_at, end_at, batch.held[service.service_type])
+            except serializers.ValidationError as exc:
+                errors[index] = {"non_field_errors": exc.detail}
+                continue
+
+            accepted[car.id].append((start_at, end_at))
+            created.append(Booking(
+                user=user,
+                car=car,
+                service=service,
+                bay=bay,
+                start_at=start_at,
+                duration_minutes=duration,
+                end_at=end_at,
+                note=data.get("note"),
+            ))
+
+        insert_bookings(created)
+
+    return created, errors
@@ -0,0 +1,31 @@
+from datetime import time
+
+DAY_OPENS_AT = time(9, 0)
+DAY_CLOSES_AT = time(18, 0)
+SLOT_MINUTES = 30
+MAX_AVAILABILITY_RANGE_DAYS = 62 # longest date_from..date_to span served in one request
+AVAILABILITY_CACHE_SECONDS = 60 * 60 # cached free slots per day; bookings invalidate their own days
+AVAILABILITY_STALE_SECONDS = 30 # expired entries are served this long while one worker refreshes them
+MAX_BOOKING_MINUTES = 9 * 60 # longest allowed booking; bounds every overlap query window
+HOLD_SECONDS = 3 * 60 # how long a slot stays reserved between hold and confirm
+MAX_BULK_BOOKINGS = 100 # items accepted by one bulk create request
+MAX_SERIES_OCCURRENCES = 52 # bookings generated by one recurring series
+MAX_SERIES_INTERVAL_WEEKS = 52 # longest gap between two occurrences of a series
+MAX_TRANSITION_BOOKINGS = 1000 # ids accepted by one staff status transition request
+SWEEP_GRACE_MINUTES = 60 # how long after end_at an active booking is left alone by the sweeper
+SWEEP_BATCH_SIZE = 500 # bookings moved per sweeper transaction
+SWEEP_MAX_BATCHES = 200 # per rule per run; the next run picks up the rest
+ARCHIVE_AFTER_DAYS = 180 # finished bookings older than this move to the archive table
+ARCHIVE_BATCH_SIZE = 500 # bookings moved per archiver transaction
+ARCHIVE_MAX_BATCHES = 200 # per run; the next run picks up the rest
+EVENTS_KEEPALIVE_SECONDS = 15 # idle time before an availability stream sends a keep-alive comment
+NEXT_AVAILABLE_HORIZON_DAYS = 31 # days scanned by one next-available search, read with one range query
+NEXT_AVAILABLE_DEFAULT_COUNT = 5 # slots returned by next-available when no count is given
+NEXT_AVAILABLE_MAX_COUNT = 20 # largest count accepted by next-available
+CALENDAR_RECHECK_SECONDS = 5 # how stale a process's compiled working calendar may get after an admin edit
+CALENDAR_GRID_CACHE_DAYS = 1024 # slot grids kept per process
+ALLOCATOR_WINDOWS_PER_QUERY = 26 # booking windows a bay allocator reads with one query
+LOCK_RETRY_AFTER_SECONDS = 2 # Retry-After of a 503 sent when a booking lock could not be taken in time
+REMINDER_RETRY_BACKOFF_SECONDS = 30 # first wait before a failed reminder chunk is sent again; doubles per retry
+REMINDER_RETRY_BACKOFF_MAX_SECONDS = 30 * 60 # longest wait between two retries of a reminder chunk
+REMINDER_MAX_RETRIES = 10 # retries of one reminder chunk, a few hours in all
@@ -0,0 +1,88 @@
+import json
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from booking import availability, bays, defaults
+from booking.occupancy import MINUTE
+from carservices.broker import get_broker
+
+BOOKED = "booked"
+RELEASED = "released"
+
+
+def channel(service_type, slot_minutes=defaults.SLOT_MINUTES):
+    return f"availability:{service_type}:{slot_minutes}"
+
+
+def slot_deltas(start_at, end_at, slot_minutes=defaults.SLOT_MINUTES):
+    """
+    ``[(day, [slot indices])]`` of the ``slot_minutes`` slots covered by
+    ``[start_at, end_at)`` inside working hours.
+    """
+    deltas = []
+    for day in availability.days_between(timezone.localdate(start_at), timezone.localdate(end_at)):
+        opens, closes = availability.working_window(day)
+        if opens is None:
+            continue
+        start, end = max(start_at, opens), min(end_at, closes)
+        if start >= end:
+            continue
+        first = (start - opens) // MINUTE // slot_minutes
+        last = -((opens - end) // MINUTE // slot_minutes) - 1
+        deltas.append((day, list(range(first, last + 1))))
+    return deltas
+
+
+def publish(service_type, slot_minutes, start_at, end_at, change):
+    broker = get_broker()
+    for day, slots in slot_deltas(start_at, end_at, slot_minutes):
+        broker.publish(channel(service_type, slot_minutes), {
+            "service_type": service_type,
+            "slot_minutes": slot_minutes,
+            "day": day.isoformat(),
+            "slots": slots,
+            "change": change,
+        })
+
+
+def publish_on_commit(changes):
+    """
+    Publish ``[(service_id, start_at, end_at, change)]`` once the transaction
+    commits, so subscribers never see a booking that was rolled back.
+    """
+    if not changes:
+        return
+
+    def send():
+        groups = bays.bay_groups()
+        slot_sizes = defaultdict(set)
+        for group in groups.values():
+            slot_sizes[group.service_type].add(group.slot_minutes)
+        for service_id, start_at, end_at, change in changes:
+            group = groups.get(service_id)
+            if group is not None:
+                # the type's bays are shared, so the change reaches every slot size in use
+                for slot_minutes in sorted(slot_sizes[group.service_type]):
+                    publish(group.service_type, slot_minutes, start_at, end_at, change)
+
+    transaction.on_commit(send)
+
+
+async def stream(group, days=None):
+    """
+    Server-sent events for one ``bays.BayGroup``: an ``event: slots`` frame
+    per published delta in the group's slot size (limited to ``days`` when
+    given) and a comment line every EVENTS_KEEPALIVE_SECONDS so proxies keep
+    the connection open.
+    """
+    days = {day.isoformat() for day in days} if days is not None else None
+    async with get_broker().subscribe(channel(group.service_type, group.slot_minutes)) as subscription:
+        yield "retry: 3000\n\n"
+        while True:
+            message = await subscription.get(timeout=defaults.EVENTS_KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keep-alive\n\n"
+            elif days is None or message["day"] in days:
+                yield f"event: slots\ndata: {json.dumps(message)}\n\n"
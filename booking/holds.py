@@ -0,0 +1,127 @@
+import secrets
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from booking import defaults
+from carservices.locks import cache_lock
+
+
+def _hold_key(token):
+    return f"booking:hold:{token}"
+
+
+def _index_key(service_type, day):
+    return f"booking:holds:{service_type}:{day.isoformat()}"
+
+
+def days_touched(start_at, end_at):
+    """Every local day ``[start_at, end_at)`` runs into."""
+    first, last = timezone.localdate(start_at), timezone.localdate(end_at)
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def active_holds(service_type, days, exclude_token=None):
+    """
+    ``{day: [(start_at, end_at)]}`` of the unexpired holds of one bay group,
+    read with a single cache round trip.
+    """
+    keys = {_index_key(service_type, day): day for day in days}
+    return _unexpired(keys, cache.get_many(list(keys)), exclude_token)
+
+
+async def aactive_holds(service_type, days, exclude_token=None):
+    """Async form of :func:`active_holds`."""
+    keys = {_index_key(service_type, day): day for day in days}
+    return _unexpired(keys, await cache.aget_many(list(keys)), exclude_token)
+
+
+def _unexpired(keys, found, exclude_token):
+    now = timezone.now()
+    result = {day: [] for day in keys.values()}
+    for key, entries in found.items():
+        result[keys[key]] = [
+            (start_at, end_at)
+            for token, (start_at, end_at, expires_at, _) in entries.items()
+            if expires_at > now and token != exclude_token
+        ]
+    return result
+
+
+def held_by_bay(service_type, days, exclude_token=None):
+    """
+    ``{bay_id: [(start_at, end_at)]}`` of the unexpired holds of one bay group
+    indexed under ``days``, read with a single cache round trip. Holds of
+    service types without bays are under ``None``.
+    """
+    now = timezone.now()
+    found = {}
+    for entries in cache.get_many([_index_key(service_type, day) for day in days]).values():
+        for token, (start_at, end_at, expires_at, bay_id) in entries.items():
+            if expires_at > now and token != exclude_token:
+                found[token] = (bay_id, (start_at, end_at))
+    result = defaultdict(list)
+    for bay_id, interval in found.values():
+        result[bay_id].append(interval)
+    return dict(result)
+
+
+def _update_index(service_type, day, change):
+    key = _index_key(service_type, day)
+    with cache_lock(f"{key}:lock"):
+        now = timezone.now()
+        entries = {
+            token: entry
+            for token, entry in (cache.get(key) or {}).items()
+            if entry[2] > now
+        }
+        change(entries)
+        if entries:
+            last_expiry = max(entry[2] for entry in entries.values())
+            cache.set(key, entries, timeout=int((last_expiry - now).total_seconds()) + 1)
+        else:
+            cache.delete(key)
+
+
+def place_hold(user, car, service, start_at, duration_minutes, bay=None):
+    """
+    Reserve a slot in ``bay`` for ``HOLD_SECONDS``. The caller checks
+    capacity and holds the bay's lock (see bays.reserved_bay). The hold is
+    indexed under every day it runs into. Expiry is left to the cache TTLs;
+    the day index drops stale entries whenever it is read or rewritten.
+    """
+    token = secrets.token_urlsafe(16)
+    expires_at = timezone.now() + timezone.timedelta(seconds=defaults.HOLD_SECONDS)
+    end_at = start_at + timezone.timedelta(minutes=duration_minutes)
+    hold = {
+        "token": token,
+        "user_id": user.id,
+        "car_id": car.id,
+        "service_id": service.id,
+        "service_type": service.service_type,
+        "bay_id": bay.id if bay is not None else None,
+        "start_at": start_at,
+        "duration_minutes": duration_minutes,
+        "expires_at": expires_at,
+    }
+    cache.set(_hold_key(token), hold, timeout=defaults.HOLD_SECONDS)
+    for day in days_touched(start_at, end_at):
+        _update_index(
+            service.service_type,
+            day,
+            lambda entries: entries.__setitem__(token, (start_at, end_at, expires_at, hold["bay_id"])),
+        )
+    return hold
+
+
+def get_hold(token):
+    return cache.get(_hold_key(token))
+
+
+def release_hold(hold):
+    cache.delete(_hold_key(hold["token"]))
+    end_at = hold["start_at"] + timezone.timedelta(minutes=hold["duration_minutes"])
+    for day in days_touched(hold["start_at"], end_at):
+        _update_index(hold["service_type"], day, lambda entries: entries.pop(hold["token"], None))
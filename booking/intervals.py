@@ -0,0 +1,52 @@
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """
+    Intervals sorted by start, for overlap lookups when no interval is longer
+    than ``max_length``.
+
+    Anything overlapping ``[start, end)`` must begin inside
+    ``(start - max_length, end)``, so a lookup is two bisections plus a scan
+    of that slice: O(log n + k) however long the history is.
+    """
+
+    def __init__(self, intervals, max_length):
+        self.items = sorted(intervals, key=lambda item: item[0])
+        self.starts = [item[0] for item in self.items]
+        self.max_length = max_length
+
+    def __len__(self):
+        return len(self.items)
+
+    def overlapping(self, start, end):
+        lo = bisect_right(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return [item for item in self.items[lo:hi] if item[1] > start]
+
+    def overlaps(self, start, end):
+        lo = bisect_right(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return any(item[1] > start for item in self.items[lo:hi])
+
+
+def merge_overlaps(candidates, existing, max_length):
+    """
+    Positions in ``candidates`` that overlap any interval of ``existing``.
+
+    Both sequences hold ``(start, end, *extra)`` items sorted by start and no
+    existing interval is longer than ``max_length``, so one forward pass over
+    both is enough: O(n + m + k) instead of a lookup per candidate.
+    """
+    hits = []
+    lo = 0
+    for position, (start, end, *_) in enumerate(candidates):
+        while lo < len(existing) and existing[lo][0] <= start - max_length:
+            lo += 1
+        k = lo
+        while k < len(existing) and existing[k][0] < end:
+            if existing[k][1] > start:
+                hits.append(position)
+                break
+            k += 1
+    return hits
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+        ('services', '0002_servicebay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='bay',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='services.servicebay'),
+        ),
+    ]
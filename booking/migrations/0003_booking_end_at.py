@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-18 10:30
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def backfill_end_at(apps, schema_editor):
+    Booking = apps.get_model("booking", "Booking")
+    pending = Booking.objects.filter(end_at__isnull=True).order_by("pk")
+
+    last_pk = 0
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk).only("pk", "start_at", "duration_minutes")[:BATCH_SIZE])
+        if not batch:
+            break
+        for booking in batch:
+            booking.end_at = booking.start_at + timedelta(minutes=booking.duration_minutes)
+        Booking.objects.bulk_update(batch, ["end_at"])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_booking_bay'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='end_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_end_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='end_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['car', 'status', 'start_at', 'end_at'], name='booking_boo_car_id_8eb309_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 13:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_booking_series'),
+        ('cars', '0003_car_owner_created_at_index'),
+        ('services', '0002_servicebay'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'status', 'start_at'], name='booking_boo_user_id_ba588e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'service', 'start_at'], name='booking_boo_user_id_babee5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', [1, 2])), fields=['user', 'start_at'], name='booking_user_active_start_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 13:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_booking_list_filter_indexes'),
+        ('cars', '0003_car_owner_created_at_index'),
+        ('services', '0002_servicebay'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'end_at', 'id'], name='booking_boo_status_b7fd95_idx'),
+        ),
+    ]
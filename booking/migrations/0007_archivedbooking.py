@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 14:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_booking_status_end_at_index'),
+        ('cars', '0003_car_owner_created_at_index'),
+        ('services', '0002_servicebay'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_at', models.DateTimeField()),
+                ('duration_minutes', models.PositiveSmallIntegerField()),
+                ('end_at', models.DateTimeField()),
+                ('status', models.IntegerField(choices=[(1, 'Pending'), (2, 'Confirmed'), (3, 'Canceled'), (4, 'Done'), (5, 'No-show')])),
+                ('note', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('bay', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='services.servicebay')),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='cars.car')),
+                ('series', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_bookings', to='booking.bookingseries')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_bookings', to='services.service')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'start_at'], name='booking_arc_user_id_fe56c2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 15:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_archivedbooking'),
+        ('cars', '0003_car_owner_created_at_index'),
+        ('services', '0002_servicebay'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='reminded_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('reminded_at__isnull', True)), fields=['status', 'start_at'], name='booking_unreminded_start_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-18 16:00
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_booking_reminded_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('title', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkingCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')], unique=True)),
+                ('is_closed', models.BooleanField(default=False)),
+                ('opens_at', models.TimeField(default=datetime.time(9, 0))),
+                ('closes_at', models.TimeField(default=datetime.time(18, 0))),
+                ('break_starts_at', models.TimeField(blank=True, null=True)),
+                ('break_ends_at', models.TimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['weekday'],
+            },
+        ),
+    ]
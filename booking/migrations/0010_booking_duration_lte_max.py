@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+MAX_BOOKING_MINUTES = 540
+
+
+def check_durations(apps, schema_editor):
+    Booking = apps.get_model("booking", "Booking")
+    too_long = Booking.objects.filter(duration_minutes__gt=MAX_BOOKING_MINUTES)
+    count = too_long.count()
+    if count:
+        sample = list(too_long.order_by("pk").values_list("pk", flat=True)[:20])
+        raise RuntimeError(
+            f"{count} bookings last longer than {MAX_BOOKING_MINUTES} minutes (e.g. {sample}); overlap checks "
+            "would miss them. Shorten or split them before migrating."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_workingcalendar_holiday'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_durations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(('duration_minutes__lte', 540)), name='booking_duration_lte_max'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 15:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_booking_duration_lte_max'),
+        ('cars', '0003_car_owner_created_at_index'),
+        ('services', '0003_service_duration_bookable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['service', 'status', 'start_at'], name='booking_boo_service_8f9f1d_idx'),
+        ),
+    ]
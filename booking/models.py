@@ -1,37 +1,188 @@
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models import Q
 from django.utils import timezone
 
 from cars.models import Car
-from services.models import Service
+from services.models import Service, ServiceBay
 from users.models import User
 
+from booking import defaults
+
+
+class WorkingCalendar(models.Model):
+    """Opening hours of one weekday. Weekdays without a row use DAY_OPENS_AT..DAY_CLOSES_AT."""
+
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, "Monday"
+        TUESDAY = 1, "Tuesday"
+        WEDNESDAY = 2, "Wednesday"
+        THURSDAY = 3, "Thursday"
+        FRIDAY = 4, "Friday"
+        SATURDAY = 5, "Saturday"
+        SUNDAY = 6, "Sunday"
+
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices, unique=True)
+    is_closed = models.BooleanField(default=False)
+    opens_at = models.TimeField(default=defaults.DAY_OPENS_AT)
+    closes_at = models.TimeField(default=defaults.DAY_CLOSES_AT)
+    break_starts_at = models.TimeField(null=True,blank=True)
+    break_ends_at = models.TimeField(null=True,blank=True)
+
+    class Meta:
+        ordering = ["weekday"]
+
+    def clean(self):
+        if self.closes_at <= self.opens_at:
+            raise ValidationError({"closes_at": "Must be after opens_at."})
+        if (self.break_starts_at is None) != (self.break_ends_at is None):
+            raise ValidationError({"break_ends_at": "Set both ends of the break or neither."})
+        if self.break_starts_at is not None and not (
+            self.opens_at <= self.break_starts_at < self.break_ends_at <= self.closes_at
+        ):
+            raise ValidationError({"break_starts_at": "The break must lie inside opening hours."})
+
+    def __str__(self):
+        if self.is_closed:
+            return f"{self.get_weekday_display()}: closed"
+        return f"{self.get_weekday_display()}: {self.opens_at:%H:%M}-{self.closes_at:%H:%M}"
+
+
+class Holiday(models.Model):
+    date = models.DateField(unique=True)
+    title = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.date} {self.title}"
+
+
+class BookingSeries(models.Model):
+    user = models.ForeignKey(to=User,on_delete=models.CASCADE,related_name="booking_series",)
+    car = models.ForeignKey(Car,on_delete=models.CASCADE,related_name="booking_series",)
+    service = models.ForeignKey(Service,on_delete=models.PROTECT,related_name="booking_series",)
+
+    start_at = models.DateTimeField()
+    duration_minutes = models.PositiveSmallIntegerField()
+    interval_weeks = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(defaults.MAX_SERIES_INTERVAL_WEEKS)],
+    )
+    occurrences = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(defaults.MAX_SERIES_OCCURRENCES)],
+    )
+    note = models.TextField(null=True,blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"BookingSeries#{self.id} - every {self.interval_weeks}w x{self.occurrences} @ {self.start_at}"
+
+
+class BookingStatus(models.IntegerChoices):
+    PENDING = 1, "Pending"
+    CONFIRMED = 2, "Confirmed"
+    CANCELED = 3, "Canceled"
+    DONE = 4, "Done"
+    NO_SHOW = 5, "No-show"
+
+
+# statuses that hold a slot: overlap checks, bay capacity and "my upcoming bookings"
+ACTIVE_STATUSES = {
+    BookingStatus.PENDING,
+    BookingStatus.CONFIRMED,
+}
+
+
 class Booking(models.Model):
-    class Status(models.IntegerChoices):
-        PENDING = 1, "Pending"
-        CONFIRMED = 2, "Confirmed"
-        CANCELED = 3, "Canceled"
-        DONE = 4, "Done"
-        NO_SHOW = 5, "No-show"
+    Status = BookingStatus # module level so the index condition in Meta can use ACTIVE_STATUSES
 
     user = models.ForeignKey(to=User,on_delete=models.CASCADE,related_name="bookings",)
     car = models.ForeignKey(Car,on_delete=models.CASCADE,related_name="bookings",)
     service = models.ForeignKey(Service,on_delete=models.PROTECT,related_name="bookings",)
+    bay = models.ForeignKey(ServiceBay,on_delete=models.SET_NULL,null=True,blank=True,related_name="bookings",)
+    series = models.ForeignKey(BookingSeries,on_delete=models.SET_NULL,null=True,blank=True,related_name="bookings",)
 
     start_at = models.DateTimeField()
     duration_minutes = models.PositiveSmallIntegerField(default=30)
+    end_at = models.DateTimeField(editable=False)
 
     status = models.IntegerField(choices=Status.choices, default=Status.PENDING)
     note = models.TextField(null=True,blank=True)
+    reminded_at = models.DateTimeField(null=True,blank=True,editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
-            models.Index(fields=["car", "start_at"]),
-            models.Index(fields=["user", "start_at"]),
+            models.Index(fields=["car", "start_at"]), # a car's bookings in start order (list ?car=)
+            models.Index(fields=["user", "start_at"]), # booking list and its date range
+            models.Index(fields=["car", "status", "start_at", "end_at"]), # car overlap checks
+            models.Index(fields=["user", "status", "start_at"]), # booking list ?status=
+            models.Index(fields=["user", "service", "start_at"]), # booking list ?service=
+            models.Index(fields=["status", "end_at", "id"]), # stale-booking sweeper
+            models.Index(fields=["service", "status", "start_at"]), # bay allocator, one range per window
+            models.Index(
+                fields=["status", "start_at"],
+                condition=Q(reminded_at__isnull=True),
+                name="booking_unreminded_start_idx",
+            ),
+            # booking list ?upcoming, which filters on the same sorted ACTIVE_STATUSES
+            models.Index(
+                fields=["user", "start_at"],
+                condition=Q(status__in=sorted(ACTIVE_STATUSES)),
+                name="booking_user_active_start_idx",
+            ),
+        ]
+        constraints = [
+            # overlap queries only look MAX_BOOKING_MINUTES back from a window
+            models.CheckConstraint(
+                condition=Q(duration_minutes__lte=defaults.MAX_BOOKING_MINUTES),
+                name="booking_duration_lte_max",
+            ),
         ]
 
+    def save(self, *args, **kwargs):
+        self.end_at = self.start_at + timezone.timedelta(minutes=self.duration_minutes)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"start_at", "duration_minutes"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "end_at"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Booking#{self.id} - {self.user_id} - {self.service_id} @ {self.start_at}"
+
+
+class ArchivedBooking(models.Model):
+    """
+    A finished booking moved out of ``booking_booking`` by
+    booking.tasks.archive_finished_bookings. Keeps the original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(to=User,on_delete=models.CASCADE,related_name="archived_bookings",)
+    car = models.ForeignKey(Car,on_delete=models.CASCADE,related_name="archived_bookings",)
+    service = models.ForeignKey(Service,on_delete=models.PROTECT,related_name="archived_bookings",)
+    bay = models.ForeignKey(ServiceBay,on_delete=models.SET_NULL,null=True,blank=True,related_name="+",)
+    series = models.ForeignKey(BookingSeries,on_delete=models.SET_NULL,null=True,blank=True,related_name="archived_bookings",)
+
+    start_at = models.DateTimeField()
+    duration_minutes = models.PositiveSmallIntegerField()
+    end_at = models.DateTimeField()
+
+    status = models.IntegerField(choices=Booking.Status.choices)
+    note = models.TextField(null=True,blank=True)
+
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "start_at"]),
+        ]
+
+    def __str__(self):
+        return f"ArchivedBooking#{self.id} - {self.user_id} - {self.service_id} @ {self.start_at}"
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from itertools import accumulate
+
+MINUTE = timedelta(minutes=1)
+
+
+class DayOccupancy:
+    """
+    Minute-resolution occupancy counter for one working window.
+
+    Bookings are folded into a difference array of minute offsets from
+    ``window_start``. A single prefix pass then gives the number of
+    concurrent bookings at every minute, and each slot's headroom is
+    ``capacity`` minus the peak inside it.
+    """
+
+    def __init__(self, window_start, window_end, capacity=1):
+        self.window_start = window_start
+        self.minutes = max((window_end - window_start) // MINUTE, 0)
+        self.capacity = capacity
+        self._diff = [0] * (self.minutes + 1)
+
+    def add_offsets(self, start, end, count=1):
+        start = max(start, 0)
+        end = min(end, self.minutes)
+        if start >= end:
+            return
+        self._diff[start] += count
+        self._diff[end] -= count
+
+    def add(self, start_at, end_at, count=1):
+        self.add_offsets(
+            (start_at - self.window_start) // MINUTE,
+            -((self.window_start - end_at) // MINUTE),
+            count,
+        )
+
+    def slot_headroom(self, slot_minutes):
+        """Spare capacity of each slot: ``capacity`` minus the peak count inside it."""
+        counts = list(accumulate(self._diff[: self.minutes]))
+        return [
+            self.capacity - max(counts[offset:offset + slot_minutes])
+            for offset in range(0, self.minutes - slot_minutes + 1, slot_minutes)
+        ]
+
+
+def peak_concurrency(intervals, window_start, window_end):
+    """
+    Highest number of ``(start, end)`` intervals overlapping at any instant
+    inside ``[window_start, window_end)``, found with one sweep over the
+    sorted interval endpoints.
+    """
+    events = []
+    for start, end in intervals:
+        start = max(start, window_start)
+        end = min(end, window_end)
+        if start < end:
+            events.append((start, 1))
+            events.append((end, -1))
+
+    # at equal instants ends (-1) sort before starts (+1): back-to-back is not an overlap
+    events.sort()
+    peak = running = 0
+    for _, step in events:
+        running += step
+        if running > peak:
+            peak = running
+    return peak
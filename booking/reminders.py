@@ -0,0 +1,98 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from booking.models import Booking
+from carservices.db import write_transaction
+from third_parties.sms.backends import REMINDER, SMSRejected
+
+logger = logging.getLogger(__name__)
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def message_params(start_at):
+    local = timezone.localtime(start_at)
+    return {"date": local.date().isoformat(), "time": local.strftime("%H:%M")}
+
+
+def plan(day, chunk_size):
+    """
+    ``[(params, [booking ids])]`` for the CONFIRMED, not yet reminded bookings
+    starting on ``day``: one query on the unreminded (status, start_at)
+    index, grouped by message params so each group is one pattern send, then
+    split into chunks of at most ``chunk_size`` recipients.
+    """
+    start, end = day_bounds(day)
+    groups = defaultdict(list)
+    for pk, start_at in (
+        Booking.objects.filter(
+            status=Booking.Status.CONFIRMED,
+            reminded_at__isnull=True,
+            start_at__gte=start,
+            start_at__lt=end,
+        )
+        .order_by("start_at", "id")
+        .values_list("id", "start_at")
+    ):
+        groups[tuple(message_params(start_at).items())].append(pk)
+
+    return [
+        (dict(params), ids[i:i + chunk_size])
+        for params, ids in groups.items()
+        for i in range(0, len(ids), chunk_size)
+    ]
+
+
+def claim(ids):
+    """
+    Mark the still-unreminded CONFIRMED bookings among ``ids`` as reminded and
+    return ``[(id, phone_number)]`` for them. Rows already claimed by another
+    run are skipped, which is what keeps a rerun from sending twice.
+    """
+    with write_transaction():
+        claimed = list(
+            Booking.objects.select_for_update()
+            .filter(id__in=ids, status=Booking.Status.CONFIRMED, reminded_at__isnull=True)
+            .values_list("id", "user__phone_number")
+        )
+        Booking.objects.filter(id__in=[pk for pk, _ in claimed]).update(reminded_at=timezone.now())
+    return claimed
+
+
+def send_batch(backend, ids, params):
+    """
+    Claim ``ids`` and send them one pattern message. A chunk the provider
+    rejects is split in half until the refused numbers stand alone; those
+    stay claimed and are skipped, so one bad number does not hold back the
+    rest. Any other ValidationError (the send failed before reaching the
+    provider, or the circuit is open) releases everything not yet sent for
+    a retry and is raised; anything else (read timeouts) stays claimed, as
+    the message may have gone out.
+    """
+    claimed = claim(ids)
+    pending = [claimed] if claimed else []
+    sent = 0
+    while pending:
+        chunk = pending.pop()
+        try:
+            backend.send_pattern(REMINDER, [str(phone) for _, phone in chunk], params)
+        except SMSRejected as exc:
+            if len(chunk) == 1:
+                logger.warning("Reminder for booking %s rejected: %s", chunk[0][0], exc)
+                continue
+            middle = len(chunk) // 2
+            pending += [chunk[middle:], chunk[:middle]]
+            continue
+        except ValidationError:
+            unsent = [pk for part in (chunk, *pending) for pk, _ in part]
+            Booking.objects.filter(id__in=unsent).update(reminded_at=None)
+            raise
+        sent += len(chunk)
+    return sent
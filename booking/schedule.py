@@ -0,0 +1,131 @@
+import secrets
+import time as clock
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils import timezone
+
+from booking import defaults
+from booking.models import Holiday, WorkingCalendar
+
+CALENDAR_VERSION_KEY = "booking:calendar:version"
+
+Rules = namedtuple("Rules", "version hours holidays")
+# ``starts`` holds the start of every slot position from opening to closing
+# time; ``bookable`` is False for positions that overlap the break, which
+# runs over ``break_window`` (``(start, end)``, or ``None`` without a break)
+DayGrid = namedtuple("DayGrid", "day opens closes starts bookable break_window")
+
+CLOSED_DAY = "The shop is closed on the selected day."
+OUTSIDE_HOURS = "The selected time window is outside working hours."
+OVERLAPS_BREAK = "The selected time window overlaps the break."
+
+DEFAULT_HOURS = (defaults.DAY_OPENS_AT, defaults.DAY_CLOSES_AT, None, None)
+
+_loaded = {"rules": None, "checked_at": None}
+
+
+def _load(version):
+    hours = [DEFAULT_HOURS] * 7
+    for weekday, is_closed, opens_at, closes_at, break_starts_at, break_ends_at in WorkingCalendar.objects.values_list(
+        "weekday", "is_closed", "opens_at", "closes_at", "break_starts_at", "break_ends_at",
+    ):
+        hours[weekday] = None if is_closed else (opens_at, closes_at, break_starts_at, break_ends_at)
+    holidays = frozenset(Holiday.objects.values_list("date", flat=True))
+    return Rules(version, tuple(hours), holidays)
+
+
+def _due():
+    checked_at = _loaded["checked_at"]
+    return checked_at is None or clock.monotonic() - checked_at >= defaults.CALENDAR_RECHECK_SECONDS
+
+
+def rules():
+    """
+    The compiled calendar of this process. The shared version key is read at
+    most every CALENDAR_RECHECK_SECONDS; the tables are only read again when
+    an admin edit has changed it.
+    """
+    if _due():
+        version = cache.get(CALENDAR_VERSION_KEY)
+        if _loaded["rules"] is None or _loaded["rules"].version != version:
+            _loaded["rules"] = _load(version)
+        _loaded["checked_at"] = clock.monotonic()
+    return _loaded["rules"]
+
+
+async def arules():
+    if _due():
+        version = await cache.aget(CALENDAR_VERSION_KEY)
+        if _loaded["rules"] is None or _loaded["rules"].version != version:
+            _loaded["rules"] = await sync_to_async(_load)(version)
+        _loaded["checked_at"] = clock.monotonic()
+    return _loaded["rules"]
+
+
+def invalidate():
+    """Make every process recompile the calendar; runs after admin edits."""
+    cache.set(CALENDAR_VERSION_KEY, secrets.token_hex(8), timeout=None)
+    forget()
+
+
+def forget():
+    """Drop this process's compiled calendar."""
+    _loaded["rules"] = None
+    _loaded["checked_at"] = None
+
+
+@lru_cache(maxsize=defaults.CALENDAR_GRID_CACHE_DAYS)
+def _grid(day, calendar, slot_minutes):
+    hours = None if day in calendar.holidays else calendar.hours[day.weekday()]
+    if hours is None:
+        return DayGrid(day, None, None, (), (), None)
+
+    opens_at, closes_at, break_starts_at, break_ends_at = hours
+    opens = timezone.make_aware(datetime.combine(day, opens_at))
+    closes = timezone.make_aware(datetime.combine(day, closes_at))
+    slot = timedelta(minutes=slot_minutes)
+    starts = tuple(opens + i * slot for i in range((closes - opens) // slot))
+    if break_starts_at is None:
+        bookable = (True,) * len(starts)
+        break_window = None
+    else:
+        break_start = timezone.make_aware(datetime.combine(day, break_starts_at))
+        break_end = timezone.make_aware(datetime.combine(day, break_ends_at))
+        bookable = tuple(not (start < break_end and start + slot > break_start) for start in starts)
+        break_window = (break_start, break_end)
+    return DayGrid(day, opens, closes, starts, bookable, break_window)
+
+
+def day_grid(day, calendar=None, slot_minutes=defaults.SLOT_MINUTES):
+    """The grid of ``slot_minutes`` slots of ``day``; holidays and closed weekdays have no slots."""
+    return _grid(day, calendar or rules(), slot_minutes)
+
+
+def window_error(start_at, end_at, calendar=None):
+    """
+    Why ``[start_at, end_at)`` cannot be booked under the working calendar
+    (a closed day, outside the opening hours, across the break), or ``None``
+    when it fits.
+    """
+    grid = day_grid(timezone.localdate(start_at), calendar)
+    if grid.opens is None:
+        return CLOSED_DAY
+    if start_at < grid.opens or end_at > grid.closes:
+        return OUTSIDE_HOURS
+    if grid.break_window is not None and start_at < grid.break_window[1] and end_at > grid.break_window[0]:
+        return OVERLAPS_BREAK
+    return None
+
+
+def grids(days, slot_minutes=defaults.SLOT_MINUTES):
+    calendar = rules()
+    return {day: _grid(day, calendar, slot_minutes) for day in days}
+
+
+async def agrids(days, slot_minutes=defaults.SLOT_MINUTES):
+    calendar = await arules()
+    return {day: _grid(day, calendar, slot_minutes) for day in days}
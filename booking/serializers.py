@@ -1,13 +1,26 @@
+from contextlib import contextmanager
+
 from django.utils import timezone
-from rest_framework import serializers
-from django.db import transaction
-from booking.models import Booking
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+from booking.models import ACTIVE_STATUSES, Booking, BookingSeries
+from booking import bays, defaults, holds, schedule
+from cars.models import Car
+from carservices.db import write_transaction
+from carservices.locks import LockTimeout, cache_lock
+
+
+def car_lock_key(car_id):
+    return f"booking:lock:car:{car_id}"
+
 
+class SlotBusy(APIException):
+    """A booking lock could not be taken in time; DRF sends ``wait`` as Retry-After."""
 
-ACTIVE_STATUSES = {
-    Booking.Status.PENDING,
-    Booking.Status.CONFIRMED,
-}
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The selected time window is busy, please try again."
+    default_code = "slot_busy"
+    wait = defaults.LOCK_RETRY_AFTER_SECONDS
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -20,13 +33,14 @@ class BookingSerializer(serializers.ModelSerializer):
             "user",
             "car",
             "service",
+            "bay",
             "start_at",
             "duration_minutes",
             "status",
             "note",
             "created_at",
         )
-        read_only_fields = ("status", "created_at")
+        read_only_fields = ("status", "bay", "created_at")
 
     def validate_start_at(self, value):
         if value <= timezone.now():
@@ -37,8 +51,9 @@ class BookingSerializer(serializers.ModelSerializer):
         request = self.context["request"]
         user = request.user
 
-        car = attrs.get("car")
-        start_at = attrs.get("start_at")
+        # a partial update falls back to the booking's current values
+        car = attrs.get("car", getattr(self.instance, "car", None))
+        start_at = attrs.get("start_at", getattr(self.instance, "start_at", None))
         duration = attrs.get("duration_minutes")
 
         if car.owner_id != user.id:
@@ -48,28 +63,196 @@ class BookingSerializer(serializers.ModelSerializer):
         if duration is None and service:
             attrs["duration_minutes"] = service.base_duration_minutes
             duration = attrs["duration_minutes"]
+        elif duration is None:
+            duration = self.instance.duration_minutes
+
+        if duration > defaults.MAX_BOOKING_MINUTES:
+            raise serializers.ValidationError(
+                {"duration_minutes": f"A booking may last at most {defaults.MAX_BOOKING_MINUTES} minutes."}
+            )
 
         end_at = start_at + timezone.timedelta(minutes=duration)
+        error = schedule.window_error(start_at, end_at)
+        if error:
+            raise serializers.ValidationError({"start_at": error})
+        self.check_car_is_free(car, start_at, end_at)
+
+        return attrs
 
-        qs = Booking.objects.filter(
+    def check_car_is_free(self, car, start_at, end_at):
+        conflicts = Booking.objects.filter(
             car=car,
             status__in=ACTIVE_STATUSES,
+            start_at__gte=start_at - timezone.timedelta(minutes=defaults.MAX_BOOKING_MINUTES),
+            start_at__lt=end_at,
+            end_at__gt=start_at,
         )
+        if self.instance is not None:
+            conflicts = conflicts.exclude(pk=self.instance.pk)
 
-        possible = qs.filter(start_at__lt=end_at).exclude(start_at__gte=end_at)
-
-        for b in possible:
-            b_end = b.start_at + timezone.timedelta(minutes=b.duration_minutes)
-            if b.start_at < end_at and b_end > start_at:
-                raise serializers.ValidationError("This car already has a booking in the selected time window.")
-
-        return attrs
-
+        if conflicts.exists():
+            raise serializers.ValidationError("This car already has a booking in the selected time window.")
 
     def create(self, validated_data):
         user = self.context["request"].user
         validated_data["user"] = user
 
-        with transaction.atomic():
-            booking = super().create(validated_data)
-            return booking
\ No newline at end of file
+        car = validated_data["car"]
+        service = validated_data["service"]
+        start_at = validated_data["start_at"]
+        end_at = start_at + timezone.timedelta(minutes=validated_data["duration_minutes"])
+
+        # validate() ran outside any lock, so the car check is repeated inside the
+        # critical section. The cache locks serialise creations per car and per
+        # bay across workers; on databases with row locks the car row is locked
+        # as well.
+        with self.critical_section(car):
+            with bays.reserved_bay(
+                service.service_type, start_at, end_at, ACTIVE_STATUSES, self.context.get("hold_token"),
+            ) as bay, write_transaction():
+                Car.objects.select_for_update().values_list("pk", flat=True).get(pk=car.pk)
+                self.check_car_is_free(car, start_at, end_at)
+                validated_data["bay"] = bay
+                return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        car = validated_data.get("car", instance.car)
+        service = validated_data.get("service", instance.service)
+        start_at = validated_data.get("start_at", instance.start_at)
+        end_at = start_at + timezone.timedelta(
+            minutes=validated_data.get("duration_minutes", instance.duration_minutes),
+        )
+
+        # a reschedule takes the same locks as a creation and picks its bay
+        # again, with the booking's own current place left out
+        with self.critical_section(car):
+            with bays.reserved_bay(
+                service.service_type, start_at, end_at, ACTIVE_STATUSES, exclude=instance.pk,
+            ) as bay, write_transaction():
+                Car.objects.select_for_update().values_list("pk", flat=True).get(pk=car.pk)
+                self.check_car_is_free(car, start_at, end_at)
+                validated_data["bay"] = bay
+                return super().update(instance, validated_data)
+
+    def hold(self):
+        """Reserve the validated slot in the cache instead of creating a booking."""
+        data = self.validated_data
+        car = data["car"]
+        service = data["service"]
+        start_at = data["start_at"]
+        end_at = start_at + timezone.timedelta(minutes=data["duration_minutes"])
+
+        with self.critical_section(car):
+            with bays.reserved_bay(service.service_type, start_at, end_at, ACTIVE_STATUSES) as bay:
+                return holds.place_hold(
+                    self.context["request"].user, car, service, start_at, data["duration_minutes"], bay,
+                )
+
+    @contextmanager
+    def critical_section(self, car):
+        try:
+            with cache_lock(car_lock_key(car.pk)):
+                yield
+        except LockTimeout:
+            raise SlotBusy()
+
+
+class BookingFilterSerializer(serializers.Serializer):
+    """Query parameters of the booking list."""
+
+    start_from = serializers.DateTimeField(required=False)
+    start_to = serializers.DateTimeField(required=False)
+    status = serializers.CharField(required=False)
+    car = serializers.IntegerField(required=False)
+    service = serializers.IntegerField(required=False)
+    upcoming = serializers.BooleanField(required=False, default=False)
+    history = serializers.BooleanField(required=False, default=False)
+
+    def validate_status(self, value):
+        try:
+            statuses = {int(part) for part in value.split(",")}
+        except ValueError:
+            raise serializers.ValidationError("status must be a comma separated list of status codes.")
+        if not statuses <= set(Booking.Status.values):
+            raise serializers.ValidationError(f"Unknown status; choose from {sorted(Booking.Status.values)}.")
+        return sorted(statuses)
+
+    def filter(self, queryset):
+        data = self.validated_data
+        if data["upcoming"]:
+            queryset = queryset.filter(start_at__gte=timezone.now(), status__in=sorted(ACTIVE_STATUSES))
+        if "start_from" in data:
+            queryset = queryset.filter(start_at__gte=data["start_from"])
+        if "start_to" in data:
+            queryset = queryset.filter(start_at__lt=data["start_to"])
+        if "status" in data:
+            queryset = queryset.filter(status__in=data["status"])
+        if "car" in data:
+            queryset = queryset.filter(car_id=data["car"])
+        if "service" in data:
+            queryset = queryset.filter(service_id=data["service"])
+        return queryset
+
+
+class BookingTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=defaults.MAX_TRANSITION_BOOKINGS,
+    )
+    status = serializers.ChoiceField(choices=Booking.Status.choices)
+
+    def validate_status(self, value):
+        return Booking.Status(value)
+
+
+class BookingBulkItemSerializer(serializers.Serializer):
+    car = serializers.IntegerField()
+    service = serializers.IntegerField()
+    start_at = serializers.DateTimeField()
+    duration_minutes = serializers.IntegerField(
+        required=False, min_value=1, max_value=defaults.MAX_BOOKING_MINUTES,
+    )
+    note = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_start_at(self, value):
+        if value <= timezone.now():
+            raise serializers.ValidationError("start_at must be in the future.")
+        return value
+
+
+class BookingSeriesSerializer(serializers.ModelSerializer):
+    user = serializers.StringRelatedField(read_only=True)
+    duration_minutes = serializers.IntegerField(
+        required=False, min_value=1, max_value=defaults.MAX_BOOKING_MINUTES,
+    )
+
+    class Meta:
+        model = BookingSeries
+        fields = (
+            "id",
+            "user",
+            "car",
+            "service",
+            "start_at",
+            "duration_minutes",
+            "interval_weeks",
+            "occurrences",
+            "note",
+            "created_at",
+        )
+        read_only_fields = ("created_at",)
+
+    def validate_start_at(self, value):
+        if value <= timezone.now():
+            raise serializers.ValidationError("start_at must be in the future.")
+        return value
+
+    def validate(self, attrs):
+        if attrs["car"].owner_id != self.context["request"].user.id:
+            raise serializers.ValidationError({"car": "You can only book services for your own car."})
+        if attrs.get("duration_minutes") is None:
+            attrs["duration_minutes"] = attrs["service"].base_duration_minutes
+        if attrs["duration_minutes"] > defaults.MAX_BOOKING_MINUTES:
+            raise serializers.ValidationError(
+                {"duration_minutes": f"A booking may last at most {defaults.MAX_BOOKING_MINUTES} minutes."}
+            )
+        return attrs
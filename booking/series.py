@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from booking import defaults, schedule
+from booking.bulk import insert_bookings, write_batch
+from booking.intervals import merge_overlaps
+from booking.models import Booking, BookingSeries
+
+CAR_BUSY = "This car already has a booking at this occurrence."
+
+
+def occurrence_starts(start_at, interval_weeks, occurrences):
+    """
+    Start of every occurrence, keeping the local wall-clock time of
+    ``start_at`` even when a UTC offset change falls between occurrences.
+    """
+    local = timezone.localtime(start_at).replace(tzinfo=None)
+    step = timedelta(weeks=interval_weeks)
+    return [timezone.make_aware(local + step * i) for i in range(occurrences)]
+
+
+def create_series(user, data):
+    """
+    Create a BookingSeries and all of its bookings, or nothing at all.
+
+    Every occurrence is checked, under the same write_batch as bulk
+    creation, against the car's existing bookings with a single merge pass
+    over both sorted lists, and against bay capacity with its BayAllocator.
+    Rows go in with one ``bulk_create``.
+
+    Raises ValidationError listing the conflicting occurrences when any of
+    them cannot be booked.
+    """
+    car = data["car"]
+    service = data["service"]
+    duration = timedelta(minutes=data["duration_minutes"])
+    planned = [
+        (start_at, start_at + duration)
+        for start_at in occurrence_starts(data["start_at"], data["interval_weeks"], data["occurrences"])
+    ]
+    max_length = timedelta(minutes=defaults.MAX_BOOKING_MINUTES)
+
+    with write_batch([car.pk], [service.service_type], planned) as batch:
+        existing = batch.existing.get(car.pk, [])
+        conflicts = {planned[position][0]: CAR_BUSY for position in merge_overlaps(planned, existing, max_length)}
+        calendar = schedule.rules()
+        for start_at, end_at in planned:
+            error = schedule.window_error(start_at, end_at, calendar)
+            if error:
+                conflicts[start_at] = error
+
+        bays = []
+        for start_at, end_at in planned:
+            if start_at in conflicts:
+                continue
+            try:
+                bays.append(batch.allocator.allocate(service.service_type, start_at, end_at, batch.held[service.service_type]))
+            except serializers.ValidationError as exc:
+                conflicts[start_at] = exc.detail[0]
+
+        if conflicts:
+            raise serializers.ValidationError({
+                "conflicts": [
+                    {"start_at": start_at.isoformat(), "error": conflicts[start_at]} for start_at in sorted(conflicts)
+                ],
+            })
+
+        series = BookingSeries.objects.create(user=user, **data)
+        bookings = insert_bookings([
+            Booking(
+                user=user,
+                car=car,
+                service=service,
+                bay=bay,
+                series=series,
+                start_at=start_at,
+                duration_minutes=data["duration_minutes"],
+                end_at=end_at,
+                note=data.get("note"),
+            )
+            for (start_at, end_at), bay in zip(planned, bays)
+        ])
+
+    return series, bookings
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from booking import availability, bays, events, schedule
+from booking.models import Booking, Holiday, WorkingCalendar
+from booking.serializers import ACTIVE_STATUSES
+from services.models import Service, ServiceBay
+
+TRACKED_FIELDS = ("start_at", "duration_minutes", "status")
+
+
+def _snapshot(instance):
+    # read straight from __dict__ so deferred fields are never loaded here
+    return tuple(instance.__dict__.get(field) for field in TRACKED_FIELDS)
+
+
+def _days_of(start_at, duration_minutes):
+    if start_at is None:
+        return set()
+    first = timezone.localdate(start_at)
+    last = timezone.localdate(start_at + timezone.timedelta(minutes=duration_minutes or 0))
+    return set(availability.days_between(first, last))
+
+
+def _active_window(snapshot):
+    start_at, duration_minutes, status = snapshot
+    if start_at is None or status not in ACTIVE_STATUSES:
+        return None
+    return start_at, start_at + timezone.timedelta(minutes=duration_minutes)
+
+
+def _invalidate_on_commit(days):
+    if days:
+        transaction.on_commit(lambda: availability.invalidate_days(days))
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_window(sender, instance, **kwargs):
+    instance._availability_snapshot = _snapshot(instance)
+
+
+@receiver(post_save, sender=Booking)
+def invalidate_availability_on_save(sender, instance, created, **kwargs):
+    previous = instance._availability_snapshot
+    current = _snapshot(instance)
+    if not created and previous == current:
+        return
+
+    days = _days_of(instance.start_at, instance.duration_minutes)
+    if not created:
+        days |= _days_of(previous[0], previous[1])
+    instance._availability_snapshot = current
+    _invalidate_on_commit(days)
+
+    old = _active_window(previous) if not created else None
+    new = _active_window(current)
+    if old != new:
+        changes = []
+        if old:
+            changes.append((instance.service_id, *old, events.RELEASED))
+        if new:
+            changes.append((instance.service_id, *new, events.BOOKED))
+        events.publish_on_commit(changes)
+
+
+@receiver(post_delete, sender=Booking)
+def invalidate_availability_on_delete(sender, instance, **kwargs):
+    # finished and canceled bookings hold no slots, e.g. when they are archived
+    if instance.status in ACTIVE_STATUSES:
+        _invalidate_on_commit(_days_of(instance.start_at, instance.duration_minutes))
+        events.publish_on_commit([(instance.service_id, instance.start_at, instance.end_at, events.RELEASED)])
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=ServiceBay)
+@receiver(post_delete, sender=ServiceBay)
+def invalidate_bay_groups(sender, **kwargs):
+    transaction.on_commit(bays.invalidate_bay_groups)
+
+
+@receiver(post_save, sender=WorkingCalendar)
+@receiver(post_delete, sender=WorkingCalendar)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def invalidate_calendar(sender, **kwargs):
+    transaction.on_commit(schedule.invalidate)
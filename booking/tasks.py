@@ -0,0 +1,184 @@
+import logging
+import time
+
+from celery import shared_task
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from booking import availability, defaults, reminders, transitions
+from booking.models import ArchivedBooking, Booking
+from carservices.db import write_transaction
+from third_parties.sms.backends import get_sms_backend
+
+logger = logging.getLogger(__name__)
+
+# (status of a finished booking, status the sweeper moves it to)
+SWEEP_RULES = (
+    (Booking.Status.CONFIRMED, Booking.Status.DONE),
+    (Booking.Status.PENDING, Booking.Status.NO_SHOW),
+)
+
+
+# statuses a booking never leaves; these are archived once old enough
+TERMINAL_STATUSES = (
+    Booking.Status.DONE,
+    Booking.Status.CANCELED,
+    Booking.Status.NO_SHOW,
+)
+
+ARCHIVED_FIELDS = (
+    "id", "user_id", "car_id", "service_id", "bay_id", "series_id",
+    "start_at", "duration_minutes", "end_at", "status", "note", "created_at",
+)
+
+
+def _ended_before(status, cutoff, after, batch_size):
+    """Next chunk of ``status`` bookings that ended before ``cutoff``, walking the (status, end_at) index."""
+    queryset = Booking.objects.filter(status=status, end_at__lt=cutoff)
+    if after is not None:
+        end_at, pk = after
+        queryset = queryset.filter(Q(end_at__gt=end_at) | Q(end_at=end_at, id__gt=pk))
+    return list(queryset.order_by("end_at", "id").values_list("end_at", "id")[:batch_size])
+
+
+@shared_task
+def sweep_stale_bookings(batch_size=defaults.SWEEP_BATCH_SIZE, max_batches=defaults.SWEEP_MAX_BATCHES):
+    """
+    Close bookings that ended more than SWEEP_GRACE_MINUTES ago but are still
+    PENDING or CONFIRMED, so they drop out of every ACTIVE_STATUSES query.
+
+    Works in keyset chunks of ``batch_size``, each its own short transaction,
+    and stops each rule after ``max_batches`` so one run never holds locks
+    for long and a backlog under one rule never starves the other.
+    """
+    started = time.monotonic()
+    cutoff = timezone.now() - timezone.timedelta(minutes=defaults.SWEEP_GRACE_MINUTES)
+    moved = {}
+    batches = {}
+
+    for source, target in SWEEP_RULES:
+        moved[target.label] = 0
+        batches[target.label] = 0
+        after = None
+        while batches[target.label] < max_batches:
+            rows = _ended_before(source, cutoff, after, batch_size)
+            if not rows:
+                break
+            batches[target.label] += 1
+            after = rows[-1]
+            updated, _ = transitions.transition([pk for _, pk in rows], target)
+            moved[target.label] += len(updated)
+            if len(rows) < batch_size:
+                break
+
+    metrics = {
+        "moved": moved,
+        "batches": batches,
+        "exhausted": [label for label, count in batches.items() if count >= max_batches],
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    logger.info("Booking sweep: %s", metrics)
+    return metrics
+
+
+def _archive(status, ids):
+    with write_transaction():
+        rows = list(
+            Booking.objects.select_for_update().filter(id__in=ids, status=status).values(*ARCHIVED_FIELDS)
+        )
+        ArchivedBooking.objects.bulk_create([ArchivedBooking(**row) for row in rows])
+        Booking.objects.filter(id__in=[row["id"] for row in rows]).delete()
+        # the delete signal skips terminal rows, which hold no slots, but
+        # cached days are dropped all the same
+        days = {
+            day
+            for row in rows
+            for day in availability.days_between(timezone.localdate(row["start_at"]), timezone.localdate(row["end_at"]))
+        }
+        if days:
+            transaction.on_commit(lambda: availability.invalidate_days(days))
+    return len(rows)
+
+
+@shared_task
+def archive_finished_bookings(batch_size=defaults.ARCHIVE_BATCH_SIZE, max_batches=defaults.ARCHIVE_MAX_BATCHES):
+    """
+    Move bookings in a terminal status that ended more than
+    ARCHIVE_AFTER_DAYS ago into ArchivedBooking, keeping ``booking_booking``
+    and its indexes small. Each keyset chunk is copied and deleted in one
+    short transaction; a run stops after ``max_batches`` chunks.
+    """
+    started = time.monotonic()
+    cutoff = timezone.now() - timezone.timedelta(days=defaults.ARCHIVE_AFTER_DAYS)
+    moved = {}
+    batches = 0
+
+    for status in TERMINAL_STATUSES:
+        moved[status.label] = 0
+        after = None
+        while batches < max_batches:
+            rows = _ended_before(status, cutoff, after, batch_size)
+            if not rows:
+                break
+            batches += 1
+            after = rows[-1]
+            moved[status.label] += _archive(status, [pk for _, pk in rows])
+            if len(rows) < batch_size:
+                break
+
+    metrics = {
+        "moved": moved,
+        "batches": batches,
+        "exhausted": batches >= max_batches,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    logger.info("Booking archive: %s", metrics)
+    return metrics
+
+
+@shared_task
+def schedule_booking_reminders():
+    """
+    Queue one send_booking_reminders task per message group and recipient
+    chunk for tomorrow's confirmed bookings.
+    """
+    started = time.monotonic()
+    day = timezone.localdate() + timezone.timedelta(days=1)
+    batches = reminders.plan(day, get_sms_backend().MAX_RECIPIENTS_PER_REQUEST)
+    for params, ids in batches:
+        send_booking_reminders.delay(ids, params)
+
+    metrics = {
+        "day": day.isoformat(),
+        "bookings": sum(len(ids) for _, ids in batches),
+        "batches": len(batches),
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    logger.info("Booking reminders scheduled: %s", metrics)
+    return metrics
+
+
+@shared_task(
+    autoretry_for=(ValidationError,),
+    retry_backoff=defaults.REMINDER_RETRY_BACKOFF_SECONDS,
+    retry_backoff_max=defaults.REMINDER_RETRY_BACKOFF_MAX_SECONDS,
+    max_retries=defaults.REMINDER_MAX_RETRIES,
+)
+def send_booking_reminders(ids, params):
+    """
+    Send one reminder chunk. A provider failure or an open circuit releases
+    the chunk and raises, and Celery sends it again with backoff: the planner
+    only runs once a day, so nothing else would.
+    """
+    try:
+        sent = reminders.send_batch(get_sms_backend(), ids, params)
+    except ValidationError as e:
+        logger.warning(f"Booking reminders will be retried: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Failed to send booking reminders: {e}")
+        return 0
+    logger.info("Booking reminders sent: %s of %s", sent, len(ids))
+    return sent
@@ -0,0 +1,65 @@
+import itertools
+
+import pytest
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from booking.tests.test import auth_client, make_car, make_category, make_user
+from services.models import Service
+
+
+@pytest.fixture
+def owner():
+    return make_user()
+
+
+@pytest.fixture
+def category():
+    return make_category()
+
+
+@pytest.fixture
+def car(owner, category):
+    return make_car(owner, category)
+
+
+@pytest.fixture
+def make_cars(owner, category):
+    """Make ``count`` more cars of ``owner``."""
+    numbers = itertools.count()
+
+    def make(count):
+        return [
+            make_car(owner, category, name=f"Car{i}", pelak=f"{i}P", vin=f"VINP{i}")
+            for i in itertools.islice(numbers, count)
+        ]
+
+    return make
+
+
+@pytest.fixture
+def make_owner(category):
+    """Make another user with a car of their own, returned as ``(user, car)``."""
+    numbers = itertools.count(1)
+
+    def make():
+        n = next(numbers)
+        user = make_user(f"+98912200{n:04d}")
+        return user, make_car(user, category, name=f"Car{n}", pelak=f"{n}O", vin=f"VINO{n}")
+
+    return make
+
+
+@pytest.fixture
+def service():
+    # no bays, so the service type takes any number of bookings at once
+    return Service.objects.create(title="Wash", service_type=Service.Type.Detailing, is_active=True)
+
+
+@pytest.fixture
+def token(owner):
+    return str(RefreshToken.for_user(owner).access_token)
+
+
+@pytest.fixture
+def client(api_client, owner):
+    return auth_client(api_client, owner)
@@ -5,7 +5,7 @@ from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from cars.models import Car, Category
-from services.models import Service
+from services.models import Service, ServiceBay
 from booking.models import Booking
 
 User = get_user_model()
@@ -45,10 +45,20 @@ def make_car(owner, category, name="MyCar", pelak="11A111", vin="VIN111", model_
     )
 
 
+def working_time(days, hour=10, minute=0):
+    """Local ``hour:minute`` in ``days`` days, inside the default working hours."""
+    day = timezone.localdate() + timezone.timedelta(days=days)
+    return timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time())).replace(
+        hour=hour, minute=minute,
+    )
+
+
 def make_service(title="Detailing", service_type=None, minutes=45):
     # اگر اسم choices تو مدل Service فرق داره، اینجا فقط همین خط رو تغییر بده
     if service_type is None:
         service_type = Service.Type.Detailing
+    # one bay, so a slot is taken by the first booking of the service type
+    ServiceBay.objects.get_or_create(title="Bay", service_type=service_type)
     return Service.objects.create(
         title=title,
         service_type=service_type,
@@ -106,7 +116,7 @@ class TestBookingEndpoints:
         payload = {
             "car": other_car.id,
             "service": service.id,
-            "start_at": (timezone.now() + timezone.timedelta(days=1)).isoformat(),
+            "start_at": working_time(1).isoformat(),
             "duration_minutes": 30,
             "note": "test",
         }
@@ -123,7 +133,7 @@ class TestBookingEndpoints:
 
         service = make_service(title="Mechanical", service_type=Service.Type.Mechanical, minutes=60)
 
-        start = timezone.now() + timezone.timedelta(days=1, hours=2)
+        start = working_time(1, 11)
 
         Booking.objects.create(
             user=user,
@@ -154,7 +164,7 @@ class TestBookingEndpoints:
 
         service = make_service(title="Detailing", service_type=Service.Type.Detailing, minutes=45)
 
-        start = timezone.now() + timezone.timedelta(days=1, hours=2)
+        start = working_time(1, 11)
 
         Booking.objects.create(
             user=user,
@@ -0,0 +1,85 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import availability
+from booking.models import ArchivedBooking, Booking
+from booking.tasks import archive_finished_bookings
+
+pytestmark = pytest.mark.django_db
+
+NOW = timezone.now().replace(microsecond=0)
+
+
+@pytest.fixture
+def make_booking(owner, car, service):
+    def make(days_ago, status):
+        start_at = NOW - timezone.timedelta(days=days_ago)
+        return Booking.objects.create(
+            user=owner, car=car, service=service, status=status, start_at=start_at, duration_minutes=30,
+        )
+
+    return make
+
+
+class TestArchiveFinishedBookings:
+    def test_moves_old_terminal_bookings(self, make_booking):
+        old_done = make_booking(400, Booking.Status.DONE)
+        old_canceled = make_booking(300, Booking.Status.CANCELED)
+        old_pending = make_booking(300, Booking.Status.PENDING)
+        recent_done = make_booking(10, Booking.Status.DONE)
+
+        metrics = archive_finished_bookings(batch_size=1)
+
+        assert metrics["moved"] == {"Done": 1, "Canceled": 1, "No-show": 0}
+        assert set(Booking.objects.values_list("id", flat=True)) == {old_pending.id, recent_done.id}
+        archived = ArchivedBooking.objects.get(pk=old_done.pk)
+        assert (archived.start_at, archived.end_at, archived.status) == (
+            old_done.start_at, old_done.end_at, Booking.Status.DONE,
+        )
+        assert archived.created_at == old_done.created_at
+        assert ArchivedBooking.objects.filter(pk=old_canceled.pk).exists()
+
+    def test_deletes_the_copied_rows_and_invalidates_the_days(
+        self, make_booking, monkeypatch, django_capture_on_commit_callbacks,
+    ):
+        bookings = [make_booking(days_ago, Booking.Status.DONE) for days_ago in (400, 300)]
+        kept = make_booking(10, Booking.Status.DONE)
+        invalidated = []
+        monkeypatch.setattr(availability, "invalidate_days", lambda days: invalidated.extend(days))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            archive_finished_bookings()
+
+        assert list(Booking.objects.all()) == [kept]
+        assert set(invalidated) == {timezone.localdate(b.start_at) for b in bookings}
+
+
+class TestHistoryList:
+    def test_history_merges_archived_rows_in_order(self, client, make_booking):
+        bookings = [
+            make_booking(days_ago, Booking.Status.DONE) for days_ago in (500, 400, 300, 200, 20, 10)
+        ]
+        archive_finished_bookings()
+        assert ArchivedBooking.objects.count() == 4
+
+        res = client.get(reverse("book-list"))
+        assert [item["id"] for item in res.json()["results"]] == [b.id for b in bookings[4:]]
+
+        url = reverse("book-list") + "?history=true&page_size=4"
+        ids = []
+        while url:
+            body = client.get(url).json()
+            ids += [item["id"] for item in body["results"]]
+            url = body["next"]
+        assert ids == [b.id for b in bookings]
+
+    def test_history_applies_filters(self, client, make_booking):
+        make_booking(400, Booking.Status.DONE)
+        canceled = make_booking(300, Booking.Status.CANCELED)
+        make_booking(10, Booking.Status.DONE)
+        archive_finished_bookings()
+
+        res = client.get(reverse("book-list"), {"history": "true", "status": "3"})
+
+        assert [item["id"] for item in res.json()["results"]] == [canceled.id]
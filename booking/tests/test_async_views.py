@@ -0,0 +1,62 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import availability
+from booking.models import Booking
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+DAY = timezone.localdate() + timezone.timedelta(days=3)
+
+
+@pytest.fixture
+def setup(client, owner, car, service):
+    opens, _ = availability.working_window(DAY)
+    Booking.objects.create(
+        user=owner, car=car, service=service, start_at=opens + timezone.timedelta(hours=1), duration_minutes=60,
+    )
+    return client, service
+
+
+class TestAsyncAvailable:
+    def test_single_day_matches_sync_view(self, setup):
+        client, service = setup
+        params = {"service_id": service.id, "date": DAY.isoformat()}
+
+        res = client.get(reverse("async-available"), params)
+
+        assert res.status_code == 200
+        assert res.json() == client.get(reverse("book-available"), params).json()
+
+    def test_range_matches_sync_view_from_warm_cache(self, setup):
+        client, service = setup
+        params = {
+            "service_id": service.id,
+            "date_from": DAY.isoformat(),
+            "date_to": (DAY + timezone.timedelta(days=6)).isoformat(),
+        }
+        expected = client.get(reverse("book-available"), params).json()
+        misses = availability.cache_stats()["misses"]
+
+        res = client.get(reverse("async-available"), params)
+
+        assert res.json() == expected
+        assert availability.cache_stats()["misses"] == misses
+
+    def test_validation_and_auth(self, setup, api_client):
+        client, service = setup
+        assert client.get(reverse("async-available"), {"service_id": service.id}).status_code == 400
+        assert client.get(reverse("async-available"), {"service_id": 0, "date": DAY.isoformat()}).status_code == 400
+        api_client.cookies.clear()
+        assert api_client.get(reverse("async-available"), {"service_id": service.id}).status_code == 401
+
+    def test_deactivated_user_is_turned_away(self, setup):
+        client, service = setup
+        User.objects.update(is_active=False)
+
+        res = client.get(reverse("async-available"), {"service_id": service.id, "date": DAY.isoformat()})
+
+        assert res.status_code == 401
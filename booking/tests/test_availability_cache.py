@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+from django.utils import timezone
+
+from booking import availability, schedule
+from booking.bays import BayGroup
+from booking.models import Booking
+from booking.occupancy import DayOccupancy
+from services.models import Service
+
+pytestmark = pytest.mark.django_db
+
+DAY = timezone.datetime(2031, 3, 10).date()
+OTHER_DAY = DAY + timezone.timedelta(days=1)
+
+
+@pytest.fixture
+def booking_kwargs(owner, car, service):
+    return {"user": owner, "car": car, "service": service, "duration_minutes": 30}
+
+
+def at(day, hour):
+    return timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time()).replace(hour=hour))
+
+
+class TestAvailabilityCache:
+    def test_second_read_is_a_hit(self, booking_kwargs, django_assert_num_queries):
+        group = BayGroup(booking_kwargs["service"].service_type, 1)
+        schedule.rules()
+        with django_assert_num_queries(1):
+            availability.free_offsets_by_day(group, DAY, OTHER_DAY)
+        with django_assert_num_queries(0):
+            availability.free_offsets_by_day(group, DAY, OTHER_DAY)
+
+        assert availability.cache_stats() == {"hits": 2, "misses": 2}
+
+    def test_create_invalidates_only_its_day(self, booking_kwargs, django_capture_on_commit_callbacks):
+        group = BayGroup(booking_kwargs["service"].service_type, 1)
+        availability.free_offsets_by_day(group, DAY, OTHER_DAY)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Booking.objects.create(start_at=at(DAY, 10), **booking_kwargs)
+
+        result = availability.free_offsets_by_day(group, DAY, OTHER_DAY)
+
+        assert availability.cache_stats() == {"hits": 1, "misses": 3}
+        assert 60 not in result[DAY]
+        assert 60 in result[OTHER_DAY]
+
+    def test_reschedule_invalidates_old_and_new_day(self, booking_kwargs, django_capture_on_commit_callbacks):
+        group = BayGroup(booking_kwargs["service"].service_type, 1)
+        with django_capture_on_commit_callbacks(execute=True):
+            booking = Booking.objects.create(start_at=at(DAY, 10), **booking_kwargs)
+        availability.free_offsets_by_day(group, DAY, OTHER_DAY)
+
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.start_at = at(OTHER_DAY, 11)
+        with django_capture_on_commit_callbacks(execute=True):
+            booking.save()
+
+        result = availability.free_offsets_by_day(group, DAY, OTHER_DAY)
+        assert 60 in result[DAY]
+        assert 120 not in result[OTHER_DAY]
+
+    def test_unrelated_edit_keeps_cache(self, booking_kwargs, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            booking = Booking.objects.create(start_at=at(DAY, 10), **booking_kwargs)
+
+        booking.note = "bring the spare key"
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            booking.save()
+
+        assert callbacks == []
+
+    def test_concurrent_misses_run_one_computation(self, monkeypatch):
+        calls = []
+
+        def slow_occupancy_by_day(group, day_from, day_to, calendar=None):
+            calls.append((day_from, day_to))
+            time.sleep(0.2)
+            return {
+                day: DayOccupancy(*availability.working_window(day))
+                for day in availability.days_between(day_from, day_to)
+            }
+
+        monkeypatch.setattr(availability, "occupancy_by_day", slow_occupancy_by_day)
+        schedule.rules()
+        barrier = threading.Barrier(20)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(availability.free_offsets_by_day(BayGroup(Service.Type.Detailing, 1), DAY, DAY)[DAY])
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [(DAY, DAY)]
+        assert len(results) == 20
+        assert all(len(offsets) == 18 for offsets in results)
@@ -0,0 +1,82 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import availability, schedule
+from booking.bays import BayGroup
+from booking.models import Booking
+from booking.tests.test import auth_client, make_car, make_category, make_service, make_user
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAvailableEndpoints:
+    def test_available_excludes_busy_slots(self, api_client):
+        user = make_user("+989121111111")
+        cat = make_category()
+        car = make_car(owner=user, category=cat)
+        service = make_service(minutes=60)
+
+        day = (timezone.localtime() + timezone.timedelta(days=2)).date()
+        start = timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time())).replace(hour=10)
+        Booking.objects.create(user=user, car=car, service=service, start_at=start, duration_minutes=60)
+
+        client = auth_client(api_client, user)
+        res = client.get(reverse("book-available"), {"service_id": service.id, "date": day.isoformat()})
+
+        assert res.status_code == 200
+        free = res.json()["free_slots"]
+        assert len(free) == 16
+        assert start.isoformat() not in free
+        assert (start + timezone.timedelta(hours=1)).isoformat() in free
+
+    def test_available_range_returns_slot_masks_from_one_query(self, api_client, django_assert_num_queries):
+        user = make_user("+989121111111")
+        cat = make_category()
+        car = make_car(owner=user, category=cat)
+        service = make_service(minutes=30)
+
+        first = (timezone.localtime() + timezone.timedelta(days=2)).date()
+        start = timezone.make_aware(timezone.datetime.combine(first, timezone.datetime.min.time())).replace(hour=9)
+        Booking.objects.create(user=user, car=car, service=service, start_at=start, duration_minutes=30)
+        Booking.objects.create(
+            user=user, car=car, service=service,
+            start_at=start + timezone.timedelta(days=1, hours=1), duration_minutes=60,
+        )
+
+        schedule.rules()
+        with django_assert_num_queries(1):
+            masks = availability.free_slot_masks(BayGroup(service.service_type, 1), first, first + timezone.timedelta(days=2))
+        assert len(masks) == 3
+
+        client = auth_client(api_client, user)
+        res = client.get(reverse("book-available"), {
+            "service_id": service.id,
+            "date_from": first.isoformat(),
+            "date_to": (first + timezone.timedelta(days=2)).isoformat(),
+        })
+
+        assert res.status_code == 200
+        days = res.json()["days"]
+        assert days[first.isoformat()] == "0" + "1" * 17
+        assert days[(first + timezone.timedelta(days=1)).isoformat()] == "11" + "00" + "1" * 14
+        assert days[(first + timezone.timedelta(days=2)).isoformat()] == "1" * 18
+
+    def test_heatmap_counts_free_slots_per_day(self, api_client):
+        user = make_user("+989121111111")
+        cat = make_category()
+        car = make_car(owner=user, category=cat)
+        service = make_service(minutes=90)
+
+        start = timezone.make_aware(timezone.datetime(2031, 2, 10, 12, 0))
+        Booking.objects.create(user=user, car=car, service=service, start_at=start, duration_minutes=90)
+
+        client = auth_client(api_client, user)
+        res = client.get(reverse("book-heatmap"), {"service_id": service.id, "month": "2031-02"})
+
+        assert res.status_code == 200
+        body = res.json()
+        assert body["slots_per_day"] == 18
+        assert len(body["days"]) == 28
+        assert body["days"]["2031-02-10"] == 15
+        assert body["days"]["2031-02-11"] == 18
@@ -0,0 +1,126 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import Booking
+from services.models import Service, ServiceBay
+
+pytestmark = pytest.mark.django_db
+
+DAY = timezone.datetime(2031, 4, 14).date()
+
+
+def at(hour, minute=0):
+    return timezone.make_aware(timezone.datetime.combine(DAY, timezone.datetime.min.time()).replace(hour=hour, minute=minute))
+
+
+@pytest.fixture
+def cars(make_cars):
+    return make_cars(3)
+
+
+@pytest.fixture
+def detailing():
+    return Service.objects.create(
+        title="Detailing", service_type=Service.Type.Detailing, is_active=True, base_duration_minutes=60,
+    )
+
+
+def book(client, car, service, start):
+    return client.post(
+        reverse("book-list"),
+        data={"car": car.id, "service": service.id, "start_at": start.isoformat()},
+        format="json",
+    )
+
+
+class TestServiceBays:
+    def test_creation_spreads_bookings_over_bays(self, client, cars, detailing):
+        first = ServiceBay.objects.create(title="Bay 1", service_type=Service.Type.Detailing)
+        second = ServiceBay.objects.create(title="Bay 2", service_type=Service.Type.Detailing)
+
+        res1 = book(client, cars[0], detailing, at(10))
+        res2 = book(client, cars[1], detailing, at(10, 30))
+        res3 = book(client, cars[2], detailing, at(10, 15))
+
+        assert res1.status_code == 201
+        assert res2.status_code == 201
+        assert {res1.json()["bay"], res2.json()["bay"]} == {first.id, second.id}
+        assert res3.status_code == 400
+
+    def test_bay_with_capacity_takes_concurrent_bookings(self, client, cars, detailing):
+        bay = ServiceBay.objects.create(title="Wash line", service_type=Service.Type.Detailing, capacity=2)
+
+        assert book(client, cars[0], detailing, at(10)).json()["bay"] == bay.id
+        assert book(client, cars[1], detailing, at(10)).json()["bay"] == bay.id
+        assert book(client, cars[2], detailing, at(10)).status_code == 400
+
+    def test_without_bays_a_service_type_is_unlimited(self, client, cars, detailing):
+        assert book(client, cars[0], detailing, at(10)).status_code == 201
+        assert book(client, cars[1], detailing, at(10, 30)).status_code == 201
+        assert book(client, cars[0], detailing, at(10, 30)).status_code == 400
+
+        res = client.get(reverse("book-available"), {"service_id": detailing.id, "date": DAY.isoformat()})
+        assert at(10, 30).isoformat() in res.json()["free_slots"]
+
+    def test_only_inactive_bays_leave_no_capacity(self, client, cars, detailing):
+        ServiceBay.objects.create(title="Bay 1", service_type=Service.Type.Detailing, is_active=False)
+
+        assert book(client, cars[0], detailing, at(10)).status_code == 400
+
+    def test_available_counts_concurrency_per_service_type(
+        self, client, owner, cars, detailing, django_capture_on_commit_callbacks
+    ):
+        mechanical = Service.objects.create(
+            title="Engine", service_type=Service.Type.Mechanical, is_active=True, base_duration_minutes=60,
+        )
+        ServiceBay.objects.create(title="Bay 1", service_type=Service.Type.Detailing)
+        ServiceBay.objects.create(title="Bay 2", service_type=Service.Type.Detailing)
+        ServiceBay.objects.create(title="Lift", service_type=Service.Type.Mechanical)
+        Booking.objects.create(user=owner, car=cars[0], service=detailing, start_at=at(10), duration_minutes=60)
+
+        def free(service):
+            res = client.get(reverse("book-available"), {"service_id": service.id, "date": DAY.isoformat()})
+            return res.json()["free_slots"]
+
+        assert at(10).isoformat() in free(detailing)
+        assert at(10).isoformat() in free(mechanical)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Booking.objects.create(user=owner, car=cars[1], service=detailing, start_at=at(10), duration_minutes=60)
+            Booking.objects.create(user=owner, car=cars[2], service=mechanical, start_at=at(12), duration_minutes=30)
+
+        assert at(10).isoformat() not in free(detailing)
+        assert at(12).isoformat() in free(detailing)
+        assert at(12).isoformat() not in free(mechanical)
+        assert at(10).isoformat() in free(mechanical)
+
+    def test_unknown_service_is_rejected(self, client):
+        res = client.get(reverse("book-available"), {"service_id": 999, "date": DAY.isoformat()})
+        assert res.status_code == 400
+
+    def test_reschedule_respects_bay_capacity(self, client, cars, detailing):
+        bay = ServiceBay.objects.create(title="Bay 1", service_type=Service.Type.Detailing)
+        book(client, cars[0], detailing, at(10))
+        moved = book(client, cars[1], detailing, at(12)).json()
+
+        def move(start):
+            return client.put(
+                reverse("book-detail", args=[moved["id"]]),
+                data={"car": cars[1].id, "service": detailing.id, "start_at": start.isoformat()},
+                format="json",
+            ).status_code
+
+        assert move(at(10)) == 400
+        assert move(at(12, 30)) == 200 # overlaps only its own current place
+        assert move(at(11)) == 200
+        assert Booking.objects.filter(start_at=at(10)).count() == 1
+        assert Booking.objects.get(pk=moved["id"]).bay_id == bay.id
+
+    def test_partial_update_keeps_the_current_values(self, client, cars, detailing):
+        created = book(client, cars[0], detailing, at(10)).json()
+
+        res = client.patch(reverse("book-detail", args=[created["id"]]), data={"note": "Call first"}, format="json")
+
+        assert res.status_code == 200
+        assert (res.json()["note"], res.json()["start_at"]) == ("Call first", created["start_at"])
@@ -0,0 +1,77 @@
+import pytest
+from django.db import IntegrityError
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import defaults
+from booking.models import Booking
+from booking.tests.test import auth_client, make_car, make_category, make_service, make_user, working_time
+
+pytestmark = pytest.mark.django_db
+
+
+class TestBookingValidation:
+    def test_overlap_with_booking_that_started_earlier_is_rejected(self, api_client):
+        user = make_user("+989121111111")
+        cat = make_category()
+        car = make_car(owner=user, category=cat)
+        service = make_service(minutes=30)
+
+        start = working_time(1)
+        Booking.objects.create(user=user, car=car, service=service, start_at=start, duration_minutes=240)
+
+        client = auth_client(api_client, user)
+        payload = {
+            "car": car.id,
+            "service": service.id,
+            "start_at": (start + timezone.timedelta(hours=3)).isoformat(),
+            "duration_minutes": 30,
+        }
+
+        res = client.post(reverse("book-list"), data=payload, format="json")
+        assert res.status_code == 400
+
+    def test_too_long_booking_is_rejected(self, api_client):
+        user = make_user("+989121111111")
+        cat = make_category()
+        car = make_car(owner=user, category=cat)
+        service = make_service(minutes=30)
+
+        client = auth_client(api_client, user)
+        payload = {
+            "car": car.id,
+            "service": service.id,
+            "start_at": working_time(1).isoformat(),
+            "duration_minutes": 24 * 60,
+        }
+
+        res = client.post(reverse("book-list"), data=payload, format="json")
+        assert res.status_code == 400
+        assert "duration_minutes" in res.json()
+
+
+class TestBookingModel:
+    def test_end_at_follows_start_and_duration(self):
+        user = make_user("+989121111111")
+        car = make_car(owner=user, category=make_category())
+        start = working_time(1)
+
+        booking = Booking.objects.create(
+            user=user, car=car, service=make_service(), start_at=start, duration_minutes=45,
+        )
+        assert booking.end_at == start + timezone.timedelta(minutes=45)
+
+        booking.duration_minutes = 90
+        booking.save(update_fields=["duration_minutes"])
+        booking.refresh_from_db()
+        assert booking.end_at == start + timezone.timedelta(minutes=90)
+
+    def test_database_rejects_bookings_longer_than_the_maximum(self):
+        user = make_user("+989121111111")
+        car = make_car(owner=user, category=make_category())
+
+        with pytest.raises(IntegrityError):
+            Booking.objects.create(
+                user=user, car=car, service=make_service(), start_at=timezone.now() + timezone.timedelta(days=1),
+                duration_minutes=defaults.MAX_BOOKING_MINUTES + 1,
+            )
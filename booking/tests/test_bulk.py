@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import schedule
+from booking.models import Booking
+from services.models import Service, ServiceBay
+
+pytestmark = pytest.mark.django_db
+
+START = timezone.localtime(timezone.now() + timezone.timedelta(days=5)).replace(
+    hour=10, minute=0, second=0, microsecond=0,
+)
+
+
+@pytest.fixture
+def fleet(owner, make_cars):
+    service = Service.objects.create(
+        title="Periodic", service_type=Service.Type.Periodic, is_active=True, base_duration_minutes=30,
+    )
+    ServiceBay.objects.create(title="Lift line", service_type=Service.Type.Periodic, capacity=50)
+    return owner, make_cars(20), service
+
+
+def item(car, service, start, **extra):
+    return {"car": car.id, "service": service.id, "start_at": start.isoformat(), **extra}
+
+
+class TestBulkBooking:
+    def test_valid_batch_is_created(self, client, fleet):
+        _, cars, service = fleet
+
+        res = client.post(
+            reverse("book-bulk"),
+            data={"bookings": [item(car, service, START) for car in cars[:5]]},
+            format="json",
+        )
+
+        assert res.status_code == 201
+        body = res.json()
+        assert body["errors"] == []
+        assert len(body["created"]) == 5
+        assert Booking.objects.filter(start_at=START).count() == 5
+        assert all(b.end_at == START + timezone.timedelta(minutes=30) for b in Booking.objects.all())
+
+    def test_errors_are_reported_per_item(self, client, fleet, make_owner):
+        owner, cars, service = fleet
+        _, foreign_car = make_owner()
+        Booking.objects.create(user=owner, car=cars[1], service=service, start_at=START, duration_minutes=30)
+
+        res = client.post(reverse("book-bulk"), data={"bookings": [
+            item(cars[0], service, START),
+            item(foreign_car, service, START),
+            item(cars[1], service, START + timezone.timedelta(minutes=15)),
+            item(cars[0], service, START + timezone.timedelta(minutes=10)),
+            {"car": cars[2].id, "service": 999, "start_at": START.isoformat()},
+            {"car": cars[3].id, "service": service.id, "start_at": "yesterday"},
+            item(cars[4], service, START, duration_minutes=45),
+        ]}, format="json")
+
+        assert res.status_code == 201
+        body = res.json()
+        assert len(body["created"]) == 2
+        assert [error["index"] for error in body["errors"]] == [1, 2, 3, 4, 5]
+        assert "car" in body["errors"][0]["errors"]
+        assert Booking.objects.count() == 3
+
+    def test_query_count_does_not_grow_with_batch_size(self, client, fleet):
+        _, cars, service = fleet
+
+        def post(batch):
+            with CaptureQueriesContext(connection) as queries:
+                res = client.post(reverse("book-bulk"), data={"bookings": batch}, format="json")
+            assert res.status_code == 201
+            return len(queries)
+
+        schedule.rules() # the calendar is compiled once per process
+        small = post([item(car, service, START) for car in cars[:2]])
+        large = post([item(car, service, START + timezone.timedelta(hours=2)) for car in cars[2:]])
+
+        assert small == large
+
+    def test_all_invalid_batch_is_rejected(self, client, fleet):
+        _, cars, service = fleet
+        res = client.post(
+            reverse("book-bulk"),
+            data={"bookings": [{"car": cars[0].id, "service": 999, "start_at": START.isoformat()}]},
+            format="json",
+        )
+        assert res.status_code == 400
+        assert Booking.objects.count() == 0
@@ -0,0 +1,179 @@
+import threading
+import time
+from itertools import combinations
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking import bays, bulk, defaults, serializers
+from booking.models import Booking
+from carservices.locks import LockTimeout
+from services.models import Service, ServiceBay
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+START = timezone.localtime(timezone.now() + timezone.timedelta(days=3)).replace(
+    hour=10, minute=0, second=0, microsecond=0,
+)
+
+
+def run_concurrently(jobs):
+    barrier = threading.Barrier(len(jobs))
+    results = [None] * len(jobs)
+
+    def worker(i, job):
+        barrier.wait()
+        try:
+            results[i] = job()
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i, job)) for i, job in enumerate(jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def poster(token, car, service, start):
+    def post():
+        client = APIClient()
+        client.cookies["accessToken"] = token
+        res = client.post(
+            reverse("book-list"),
+            data={"car": car.id, "service": service.id, "start_at": start.isoformat()},
+            format="json",
+        )
+        return res.status_code
+    return post
+
+
+@pytest.fixture
+def service():
+    return Service.objects.create(
+        title="Detailing", service_type=Service.Type.Detailing, is_active=True, base_duration_minutes=60,
+    )
+
+
+class TestConcurrentBookingCreation:
+    def test_same_car_never_double_booked(self, token, service, make_cars):
+        ServiceBay.objects.create(title="Wash line", service_type=service.service_type, capacity=50)
+        cars = make_cars(3)
+
+        jobs = [
+            poster(token, car, service, START + timezone.timedelta(minutes=5 * attempt))
+            for car in cars
+            for attempt in range(8)
+        ]
+        statuses = run_concurrently(jobs)
+
+        assert statuses.count(201) == len(cars)
+        assert set(statuses) == {201, 400}
+        for car in cars:
+            windows = list(Booking.objects.filter(car=car).values_list("start_at", "end_at"))
+            assert len(windows) == 1
+            for (s1, e1), (s2, e2) in combinations(windows, 2):
+                assert not (s1 < e2 and s2 < e1)
+
+    def test_concurrent_reschedules_never_double_book_a_car(self, token, service, make_cars):
+        (car,) = make_cars(1)
+        bookings = [
+            Booking.objects.create(
+                user=car.owner, car=car, service=service, start_at=START + timezone.timedelta(hours=2 * i),
+                duration_minutes=60,
+            )
+            for i in range(1, 4)
+        ]
+
+        def mover(booking):
+            def patch():
+                client = APIClient()
+                client.cookies["accessToken"] = token
+                res = client.patch(
+                    reverse("book-detail", args=[booking.id]), data={"start_at": START.isoformat()}, format="json",
+                )
+                return res.status_code
+            return patch
+
+        statuses = run_concurrently([mover(booking) for booking in bookings])
+
+        assert sorted(statuses) == [200, 400, 400]
+        assert Booking.objects.filter(car=car, start_at=START).count() == 1
+
+    def test_different_bays_insert_in_parallel(self, token, make_cars, monkeypatch):
+        services = []
+        for service_type in Service.Type.values:
+            ServiceBay.objects.create(title=f"Bay {service_type}", service_type=service_type, capacity=5)
+            services.append(Service.objects.create(
+                title=f"Service {service_type}", service_type=service_type, is_active=True, base_duration_minutes=60,
+            ))
+        cars = make_cars(len(services) * 3)
+
+        # bay_has_room runs while the bay's lock is held; count how many run at once
+        inside, peak, guard = [], [], threading.Lock()
+        has_room = bays.bay_has_room
+
+        def slow_has_room(*args, **kwargs):
+            with guard:
+                inside.append(None)
+                peak.append(len(inside))
+            time.sleep(0.05)
+            with guard:
+                inside.pop()
+            return has_room(*args, **kwargs)
+
+        monkeypatch.setattr(bays, "bay_has_room", slow_has_room)
+        statuses = run_concurrently([
+            poster(token, car, services[i % len(services)], START) for i, car in enumerate(cars)
+        ])
+
+        assert statuses == [201] * len(cars)
+        assert Booking.objects.filter(start_at=START).count() == len(cars)
+        assert max(peak) > 1
+
+    def test_bay_capacity_holds_under_contention(self, token, service, make_cars):
+        ServiceBay.objects.create(title="Bay 1", service_type=service.service_type)
+        ServiceBay.objects.create(title="Bay 2", service_type=service.service_type)
+        cars = make_cars(10)
+
+        statuses = run_concurrently([poster(token, car, service, START) for car in cars])
+
+        assert statuses.count(201) == 2
+        assert set(Booking.objects.values_list("bay__title", flat=True)) == {"Bay 1", "Bay 2"}
+
+
+def raise_lock_timeout(*args, **kwargs):
+    raise LockTimeout("busy")
+
+
+class TestLockTimeouts:
+    def test_single_creation_answers_503_with_retry_after(self, client, service, make_cars, monkeypatch):
+        (car,) = make_cars(1)
+        monkeypatch.setattr(serializers, "cache_lock", raise_lock_timeout)
+
+        res = client.post(
+            reverse("book-list"),
+            data={"car": car.id, "service": service.id, "start_at": START.isoformat()},
+            format="json",
+        )
+
+        assert res.status_code == 503
+        assert res["Retry-After"] == str(defaults.LOCK_RETRY_AFTER_SECONDS)
+        assert not Booking.objects.exists()
+
+    def test_bulk_creation_answers_503_with_retry_after(self, client, service, make_cars, monkeypatch):
+        (car,) = make_cars(1)
+        monkeypatch.setattr(bulk, "cache_locks", raise_lock_timeout)
+
+        res = client.post(
+            reverse("book-bulk"),
+            data={"bookings": [{"car": car.id, "service": service.id, "start_at": START.isoformat()}]},
+            format="json",
+        )
+
+        assert res.status_code == 503
+        assert res["Retry-After"] == str(defaults.LOCK_RETRY_AFTER_SECONDS)
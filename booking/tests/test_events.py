@@ -0,0 +1,106 @@
+from datetime import datetime
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import events
+from booking.models import Booking
+from booking.tests.test import auth_client
+from carservices.broker import get_broker
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+DAY = timezone.localdate() + timezone.timedelta(days=3)
+START = timezone.make_aware(datetime.combine(DAY, datetime.min.time()).replace(hour=10))
+
+
+class TestSlotDeltas:
+    def test_covers_touched_slots_only(self):
+        assert events.slot_deltas(START, START + timezone.timedelta(minutes=45)) == [(DAY, [2, 3])]
+
+    def test_counts_in_the_given_slot_size(self):
+        assert events.slot_deltas(START, START + timezone.timedelta(minutes=45), 60) == [(DAY, [1])]
+
+    def test_clips_to_working_hours(self):
+        late = START.replace(hour=17, minute=30)
+        assert events.slot_deltas(late, late + timezone.timedelta(hours=3)) == [(DAY, [17])]
+
+
+class TestBookingEvents:
+    def test_save_and_cancel_publish_after_commit(self, owner, car, service, django_capture_on_commit_callbacks):
+        def book_then_cancel():
+            with django_capture_on_commit_callbacks(execute=True):
+                booking = Booking.objects.create(
+                    user=owner, car=car, service=service, start_at=START, duration_minutes=60,
+                )
+            with django_capture_on_commit_callbacks(execute=True):
+                booking.note = "no change to the slots"
+                booking.save()
+            with django_capture_on_commit_callbacks(execute=True):
+                booking.status = Booking.Status.CANCELED
+                booking.save()
+
+        async def scenario():
+            async with get_broker().subscribe(events.channel(service.service_type)) as subscription:
+                await sync_to_async(book_then_cancel)()
+                return [await subscription.get(timeout=1) for _ in range(2)], await subscription.get(timeout=0.05)
+
+        received, extra = async_to_sync(scenario)()
+
+        assert [(m["day"], m["slots"], m["change"]) for m in received] == [
+            (DAY.isoformat(), [2, 3], events.BOOKED),
+            (DAY.isoformat(), [2, 3], events.RELEASED),
+        ]
+        assert extra is None
+
+    def test_stream_pushes_deltas(self, owner, car, service, django_capture_on_commit_callbacks):
+        client = auth_client(AsyncClient(), owner)
+
+        def book():
+            with django_capture_on_commit_callbacks(execute=True):
+                Booking.objects.create(user=owner, car=car, service=service, start_at=START, duration_minutes=30)
+
+        async def scenario():
+            response = await client.get(
+                reverse("availability-events"),
+                {"service_id": service.id, "date_from": DAY.isoformat(), "date_to": DAY.isoformat()},
+            )
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            await sync_to_async(book)()
+            second = await anext(chunks)
+            await chunks.aclose()
+            return response, first, second
+
+        response, first, second = async_to_sync(scenario)()
+
+        assert response["Content-Type"] == "text/event-stream"
+        assert first.startswith(b"retry:")
+        assert second.startswith(b"event: slots\ndata: ")
+        assert b'"change": "booked"' in second
+
+    def test_stream_requires_auth(self):
+        async def scenario():
+            return await AsyncClient().get(reverse("availability-events"), {"service_id": 1})
+
+        assert async_to_sync(scenario)().status_code == 401
+
+    def test_stream_turns_away_deactivated_users(self, owner, token, service):
+        User.objects.filter(pk=owner.pk).update(is_active=False)
+
+        async def scenario():
+            client = AsyncClient()
+            client.cookies["accessToken"] = token
+            return await client.get(reverse("availability-events"), {"service_id": service.id})
+
+        assert async_to_sync(scenario)().status_code == 401
+
+    def test_stream_is_not_served_over_wsgi(self, client, service):
+        res = client.get(reverse("availability-events"), {"service_id": service.id})
+
+        assert res.status_code == 501
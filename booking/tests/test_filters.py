@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import Booking
+from booking.serializers import BookingFilterSerializer
+from services.models import Service
+
+pytestmark = pytest.mark.django_db
+
+NOW = timezone.now().replace(microsecond=0)
+
+
+@pytest.fixture
+def history(owner, make_cars):
+    car1, car2 = make_cars(2)
+    wash = Service.objects.create(title="Wash", service_type=Service.Type.Detailing, is_active=True)
+    oil = Service.objects.create(title="Oil", service_type=Service.Type.Periodic, is_active=True)
+
+    def book(car, service, days, status):
+        start_at = NOW + timezone.timedelta(days=days)
+        return Booking.objects.create(
+            user=owner, car=car, service=service, start_at=start_at, duration_minutes=30, status=status,
+        )
+
+    bookings = {
+        "past_done": book(car1, wash, -10, Booking.Status.DONE),
+        "past_pending": book(car1, oil, -2, Booking.Status.PENDING),
+        "next_pending": book(car1, wash, 2, Booking.Status.PENDING),
+        "next_confirmed": book(car2, oil, 5, Booking.Status.CONFIRMED),
+        "next_canceled": book(car2, wash, 7, Booking.Status.CANCELED),
+    }
+    return owner, car1, car2, wash, oil, bookings
+
+
+def ids(client, **params):
+    res = client.get(reverse("book-list"), params)
+    assert res.status_code == 200, res.json()
+    return [item["id"] for item in res.json()["results"]]
+
+
+class TestBookingListFilters:
+    def test_upcoming_returns_future_active_bookings(self, client, history):
+        bookings = history[-1]
+        assert ids(client, upcoming="true") == [bookings["next_pending"].id, bookings["next_confirmed"].id]
+
+    def test_start_range(self, client, history):
+        bookings = history[-1]
+        found = ids(
+            client,
+            start_from=(NOW - timezone.timedelta(days=3)).isoformat(),
+            start_to=(NOW + timezone.timedelta(days=5)).isoformat(),
+        )
+        assert found == [bookings["past_pending"].id, bookings["next_pending"].id]
+
+    def test_status_car_and_service(self, client, history):
+        _, car1, car2, wash, oil, bookings = history
+        assert ids(client, status="3,4") == [bookings["past_done"].id, bookings["next_canceled"].id]
+        assert ids(client, car=car2.id) == [bookings["next_confirmed"].id, bookings["next_canceled"].id]
+        assert ids(client, service=oil.id, status="1") == [bookings["past_pending"].id]
+
+    def test_invalid_filters_return_400(self, client):
+        assert client.get(reverse("book-list"), {"status": "9"}).status_code == 400
+        assert client.get(reverse("book-list"), {"status": "x"}).status_code == 400
+        assert client.get(reverse("book-list"), {"start_from": "yesterday"}).status_code == 400
+
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="reads the SQLite query plan")
+    def test_upcoming_is_an_index_range_search(self, history):
+        owner, car1, _, wash, _, _ = history
+        Booking.objects.bulk_create([
+            Booking(
+                user=owner, car=car1, service=wash, status=Booking.Status.DONE,
+                start_at=NOW - timezone.timedelta(days=i), end_at=NOW - timezone.timedelta(days=i, minutes=-30),
+            )
+            for i in range(11, 1000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        filters = BookingFilterSerializer(data={"upcoming": "true"})
+        filters.is_valid(raise_exception=True)
+        queryset = filters.filter(Booking.objects.filter(user=history[0])).order_by("start_at", "id")
+
+        plan = queryset.explain()
+        assert "SCAN" not in plan
+        assert "user_id=? AND start_at>?" in plan
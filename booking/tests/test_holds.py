@@ -0,0 +1,133 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache.backends import locmem
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from booking import availability, defaults, holds
+from booking.bays import BayGroup
+from booking.models import Booking
+from booking.tests.test import auth_client
+from services.models import Service, ServiceBay
+
+pytestmark = pytest.mark.django_db
+
+DAY = (timezone.localtime() + timezone.timedelta(days=3)).date()
+
+
+def at(hour, minute=0):
+    return timezone.make_aware(timezone.datetime.combine(DAY, timezone.datetime.min.time()).replace(hour=hour, minute=minute))
+
+
+def client_for(user):
+    return auth_client(APIClient(), user)
+
+
+@pytest.fixture
+def service():
+    ServiceBay.objects.create(title="Bay", service_type=Service.Type.Detailing)
+    return Service.objects.create(
+        title="Detailing", service_type=Service.Type.Detailing, is_active=True, base_duration_minutes=60,
+    )
+
+
+@pytest.fixture
+def advance_clock(monkeypatch):
+    """Move timezone.now() and the test cache's expiry clock forward by the given seconds."""
+    offset = [0]
+    real_now, real_time = timezone.now, time.time
+    monkeypatch.setattr(timezone, "now", lambda: real_now() + timezone.timedelta(seconds=offset[0]))
+    monkeypatch.setattr(locmem, "time", SimpleNamespace(time=lambda: real_time() + offset[0]))
+
+    def advance(seconds):
+        offset[0] += seconds
+
+    return advance
+
+
+def hold(client, car, service, start):
+    return client.post(
+        reverse("book-hold"),
+        data={"car": car.id, "service": service.id, "start_at": start.isoformat()},
+        format="json",
+    )
+
+
+class TestSlotHolds:
+    def test_held_slot_is_busy_without_touching_the_database(
+        self, service, make_owner, django_assert_num_queries
+    ):
+        user, car = make_owner()
+        group = BayGroup(service.service_type, 1)
+        availability.free_offsets_by_day(group, DAY, DAY)
+
+        res = hold(client_for(user), car, service, at(10))
+        assert res.status_code == 201
+        assert res.json()["hold_token"]
+
+        with django_assert_num_queries(0):
+            free = availability.free_offsets_by_day(group, DAY, DAY)[DAY]
+        assert 60 not in free
+        assert 90 not in free
+        assert 120 in free
+        assert Booking.objects.count() == 0
+
+    def test_others_cannot_book_or_hold_a_held_slot(self, service, make_owner):
+        user, car = make_owner()
+        other, other_car = make_owner()
+        assert hold(client_for(user), car, service, at(10)).status_code == 201
+
+        assert hold(client_for(other), other_car, service, at(10, 30)).status_code == 400
+        res = client_for(other).post(
+            reverse("book-list"),
+            data={"car": other_car.id, "service": service.id, "start_at": at(10, 30).isoformat()},
+            format="json",
+        )
+        assert res.status_code == 400
+
+    def test_confirm_turns_hold_into_booking(self, service, make_owner):
+        user, car = make_owner()
+        client = client_for(user)
+        token = hold(client, car, service, at(10)).json()["hold_token"]
+
+        res = client.post(reverse("book-confirm"), data={"hold_token": token, "note": "hi"}, format="json")
+
+        assert res.status_code == 201
+        booking = Booking.objects.get()
+        assert booking.start_at == at(10)
+        assert booking.note == "hi"
+        assert client.post(reverse("book-confirm"), data={"hold_token": token}, format="json").status_code == 404
+
+    def test_only_the_holder_can_confirm(self, service, make_owner):
+        user, car = make_owner()
+        other, _ = make_owner()
+        token = hold(client_for(user), car, service, at(10)).json()["hold_token"]
+
+        res = client_for(other).post(reverse("book-confirm"), data={"hold_token": token}, format="json")
+        assert res.status_code == 404
+
+    def test_hold_expires_on_its_own(self, service, make_owner, advance_clock):
+        user, car = make_owner()
+        client = client_for(user)
+        token = hold(client, car, service, at(10)).json()["hold_token"]
+
+        advance_clock(defaults.HOLD_SECONDS + 1)
+
+        assert 60 in availability.free_offsets_by_day(BayGroup(service.service_type, 1), DAY, DAY)[DAY]
+        assert client.post(reverse("book-confirm"), data={"hold_token": token}, format="json").status_code == 404
+
+    def test_hold_running_past_midnight_is_indexed_under_both_days(self, service, make_owner):
+        user, car = make_owner()
+        late = at(23, 30)
+        next_day = DAY + timezone.timedelta(days=1)
+
+        placed = holds.place_hold(user, car, service, late, 90)
+
+        held = holds.active_holds(service.service_type, [DAY, next_day])
+        assert held[DAY] == held[next_day] == [(late, late + timezone.timedelta(minutes=90))]
+
+        holds.release_hold(placed)
+        assert holds.active_holds(service.service_type, [DAY, next_day]) == {DAY: [], next_day: []}
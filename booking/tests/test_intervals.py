@@ -0,0 +1,57 @@
+import random
+from datetime import datetime, timedelta
+
+from booking.intervals import IntervalIndex, merge_overlaps
+
+ORIGIN = datetime(2030, 1, 1, 9, 0)
+
+
+def brute_force(items, start, end):
+    return [item for item in sorted(items) if item[0] < end and item[1] > start]
+
+
+class TestIntervalIndex:
+    def test_overlapping_matches_brute_force(self):
+        rnd = random.Random(3)
+        items = []
+        for i in range(500):
+            start = ORIGIN + timedelta(minutes=rnd.randrange(0, 10_000))
+            items.append((start, start + timedelta(minutes=rnd.randrange(5, 240)), i))
+        index = IntervalIndex(items, timedelta(minutes=240))
+
+        for _ in range(200):
+            start = ORIGIN + timedelta(minutes=rnd.randrange(-300, 10_300))
+            end = start + timedelta(minutes=rnd.randrange(1, 300))
+            assert sorted(index.overlapping(start, end)) == brute_force(items, start, end)
+            assert index.overlaps(start, end) == bool(brute_force(items, start, end))
+
+    def test_touching_intervals_do_not_overlap(self):
+        index = IntervalIndex([(ORIGIN, ORIGIN + timedelta(minutes=30))], timedelta(minutes=60))
+
+        assert not index.overlaps(ORIGIN + timedelta(minutes=30), ORIGIN + timedelta(minutes=60))
+        assert not index.overlaps(ORIGIN - timedelta(minutes=30), ORIGIN)
+        assert index.overlaps(ORIGIN + timedelta(minutes=29), ORIGIN + timedelta(minutes=31))
+
+    def test_extra_columns_are_kept(self):
+        index = IntervalIndex([(ORIGIN, ORIGIN + timedelta(minutes=30), "bay-1")], timedelta(minutes=60))
+
+        assert index.overlapping(ORIGIN, ORIGIN + timedelta(minutes=5)) == [
+            (ORIGIN, ORIGIN + timedelta(minutes=30), "bay-1")
+        ]
+
+
+class TestMergeOverlaps:
+    def test_matches_brute_force(self):
+        rnd = random.Random(5)
+        existing = sorted(
+            (start, start + timedelta(minutes=rnd.randrange(5, 240)))
+            for start in (ORIGIN + timedelta(minutes=rnd.randrange(0, 50_000)) for _ in range(400))
+        )
+        starts = [ORIGIN + timedelta(days=i, minutes=rnd.randrange(0, 600)) for i in range(40)]
+        candidates = [(start, start + timedelta(minutes=90)) for start in starts]
+
+        expected = [
+            position for position, (start, end) in enumerate(candidates)
+            if brute_force(existing, start, end)
+        ]
+        assert merge_overlaps(candidates, existing, timedelta(minutes=240)) == expected
@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import availability, defaults, schedule
+from booking.bays import BayGroup
+from booking.models import Booking
+from booking.tests.test import auth_client, make_car, make_category, make_service, make_user
+
+pytestmark = pytest.mark.django_db
+
+
+class TestNextAvailable:
+    def test_next_available_scans_weeks_ahead_with_one_query(self, api_client, django_assert_num_queries):
+        user = make_user("+989121111111")
+        cat = make_category()
+        car = make_car(owner=user, category=cat)
+        service = make_service(minutes=30)
+
+        first = (timezone.localtime() + timezone.timedelta(days=2)).date()
+        for i in range(21):
+            opens, _ = availability.working_window(first + timezone.timedelta(days=i))
+            Booking.objects.create(user=user, car=car, service=service, start_at=opens, duration_minutes=9 * 60)
+        free_day = first + timezone.timedelta(days=21)
+        opens, _ = availability.working_window(free_day)
+        Booking.objects.create(user=user, car=car, service=service, start_at=opens, duration_minutes=90)
+
+        schedule.rules()
+        with django_assert_num_queries(1):
+            slots, searched_to = availability.next_free_slots(BayGroup(service.service_type, 1), first, 2)
+        assert slots == [opens + timezone.timedelta(minutes=90), opens + timezone.timedelta(minutes=120)]
+        assert searched_to == free_day
+
+        client = auth_client(api_client, user)
+        res = client.get(reverse("book-next-available"), {
+            "service_id": service.id,
+            "date": first.isoformat(),
+            "time_from": "14:00",
+            "time_to": "15:00",
+            "count": 3,
+        })
+
+        assert res.status_code == 200
+        body = res.json()
+        assert body["free_slots"] == [
+            (opens + timezone.timedelta(hours=5)).isoformat(),
+            (opens + timezone.timedelta(hours=5, minutes=30)).isoformat(),
+            (opens + timezone.timedelta(days=1, hours=5)).isoformat(),
+        ]
+        assert body["searched_to"] == (free_day + timezone.timedelta(days=1)).isoformat()
+
+    def test_next_available_stops_at_the_horizon(self, api_client):
+        user = make_user("+989121111111")
+        service = make_service(minutes=30)
+        first = (timezone.localtime() + timezone.timedelta(days=2)).date()
+
+        client = auth_client(api_client, user)
+        res = client.get(reverse("book-next-available"), {
+            "service_id": service.id, "date": first.isoformat(), "time_from": "18:00",
+        })
+
+        assert res.status_code == 200
+        assert res.json()["free_slots"] == []
+        horizon = first + timezone.timedelta(days=defaults.NEXT_AVAILABLE_HORIZON_DAYS - 1)
+        assert res.json()["searched_to"] == horizon.isoformat()
+
+        res = client.get(reverse("book-next-available"), {"service_id": service.id, "date": first.isoformat(), "count": 0})
+        assert res.status_code == 400
@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta
+
+from booking.occupancy import DayOccupancy, peak_concurrency
+
+DAY_START = datetime(2030, 1, 1, 9, 0)
+DAY_END = datetime(2030, 1, 1, 18, 0)
+
+
+def legacy_free_slots(busy, slot_minutes=30):
+    free = []
+    cur = DAY_START
+    while cur + timedelta(minutes=slot_minutes) <= DAY_END:
+        e = cur + timedelta(minutes=slot_minutes)
+        if not any(bs < e and be > cur for bs, be in busy):
+            free.append(cur)
+        cur = e
+    return free
+
+
+def free_offsets(occupancy, slot_minutes):
+    return [i * slot_minutes for i, headroom in enumerate(occupancy.slot_headroom(slot_minutes)) if headroom > 0]
+
+
+class TestDayOccupancy:
+    def test_empty_day_is_all_free(self):
+        occupancy = DayOccupancy(DAY_START, DAY_END)
+        assert occupancy.slot_headroom(30) == [1] * 18
+
+    def test_booking_blocks_overlapping_slots_only(self):
+        occupancy = DayOccupancy(DAY_START, DAY_END)
+        occupancy.add(DAY_START + timedelta(minutes=45), DAY_START + timedelta(minutes=75))
+
+        free = free_offsets(occupancy, 30)
+        assert 30 not in free
+        assert 60 not in free
+        assert 0 in free
+        assert 90 in free
+
+    def test_bookings_outside_window_are_clipped(self):
+        occupancy = DayOccupancy(DAY_START, DAY_END)
+        occupancy.add(DAY_START - timedelta(hours=2), DAY_START + timedelta(minutes=10))
+        occupancy.add(DAY_END - timedelta(minutes=5), DAY_END + timedelta(hours=1))
+
+        free = free_offsets(occupancy, 30)
+        assert free[0] == 30
+        assert free[-1] == 480
+
+    def test_partial_minutes_round_outwards(self):
+        occupancy = DayOccupancy(DAY_START, DAY_END)
+        occupancy.add(DAY_START + timedelta(minutes=29, seconds=30), DAY_START + timedelta(minutes=30, seconds=1))
+
+        assert occupancy.slot_headroom(30)[:2] == [0, 0]
+
+    def test_capacity_allows_concurrent_bookings(self):
+        occupancy = DayOccupancy(DAY_START, DAY_END, capacity=2)
+        occupancy.add(DAY_START, DAY_START + timedelta(minutes=30))
+        assert occupancy.slot_headroom(30)[0] == 1
+
+        occupancy.add(DAY_START + timedelta(minutes=15), DAY_START + timedelta(minutes=45))
+        assert occupancy.slot_headroom(30)[:2] == [0, 1]
+
+    def test_matches_legacy_overlap_loop(self):
+        rnd = random.Random(7)
+        busy = []
+        for _ in range(40):
+            start = DAY_START + timedelta(minutes=rnd.randrange(-60, 9 * 60))
+            busy.append((start, start + timedelta(minutes=rnd.choice((15, 30, 45, 60, 90)))))
+
+        occupancy = DayOccupancy(DAY_START, DAY_END)
+        for start, end in busy:
+            occupancy.add(start, end)
+
+        free = [DAY_START + timedelta(minutes=offset) for offset in free_offsets(occupancy, 30)]
+        assert free == legacy_free_slots(busy)
+
+
+class TestPeakConcurrency:
+    def test_back_to_back_intervals_do_not_overlap(self):
+        a = (DAY_START, DAY_START + timedelta(minutes=30))
+        b = (DAY_START + timedelta(minutes=30), DAY_START + timedelta(minutes=60))
+        assert peak_concurrency([a, b], DAY_START, DAY_END) == 1
+
+    def test_counts_overlaps_inside_window_only(self):
+        intervals = [
+            (DAY_START, DAY_START + timedelta(minutes=60)),
+            (DAY_START + timedelta(minutes=30), DAY_START + timedelta(minutes=90)),
+            (DAY_START + timedelta(minutes=45), DAY_START + timedelta(minutes=50)),
+        ]
+        assert peak_concurrency(intervals, DAY_START, DAY_END) == 3
+        assert peak_concurrency(intervals, DAY_START + timedelta(minutes=60), DAY_END) == 1
@@ -0,0 +1,113 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from booking import reminders, tasks
+from booking.models import Booking
+from third_parties.sms.backends import BaseBackend, SMSRejected, SMSUnavailable
+
+pytestmark = pytest.mark.django_db
+
+TOMORROW = timezone.localdate() + timezone.timedelta(days=1)
+
+
+class FakeBackend(BaseBackend):
+    MAX_RECIPIENTS_PER_REQUEST = 2
+
+    def __init__(self, error=None, rejected=()):
+        self.calls = []
+        self.error = error
+        self.rejected = set(rejected)
+
+    def send_pattern(self, pattern, recipients, params):
+        if self.error is not None:
+            raise self.error
+        if self.rejected & set(recipients):
+            raise SMSRejected("rejected")
+        self.calls.append((pattern, recipients, params))
+
+
+@pytest.fixture
+def make_booking(make_owner, service):
+    def make(day, hour, status=Booking.Status.CONFIRMED):
+        owner, car = make_owner()
+        start_at = timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time())).replace(hour=hour)
+        return Booking.objects.create(user=owner, car=car, service=service, start_at=start_at, status=status)
+
+    return make
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(tasks, "get_sms_backend", lambda: backend)
+    monkeypatch.setattr(tasks.send_booking_reminders, "delay", lambda ids, params: tasks.send_booking_reminders(ids, params))
+    return backend
+
+
+class TestReminderPlan:
+    def test_groups_by_message_and_chunks(self, make_booking):
+        ten = [make_booking(TOMORROW, 10) for _ in range(3)]
+        eleven = make_booking(TOMORROW, 11)
+        make_booking(TOMORROW, 12, status=Booking.Status.PENDING)
+        make_booking(TOMORROW + timezone.timedelta(days=1), 10)
+
+        batches = reminders.plan(TOMORROW, chunk_size=2)
+
+        assert batches == [
+            ({"date": TOMORROW.isoformat(), "time": "10:00"}, [ten[0].id, ten[1].id]),
+            ({"date": TOMORROW.isoformat(), "time": "10:00"}, [ten[2].id]),
+            ({"date": TOMORROW.isoformat(), "time": "11:00"}, [eleven.id]),
+        ]
+
+
+class TestReminderTasks:
+    def test_sends_each_group_once(self, make_booking, queued):
+        bookings = [make_booking(TOMORROW, 10) for _ in range(3)] + [make_booking(TOMORROW, 11)]
+
+        metrics = tasks.schedule_booking_reminders()
+
+        assert metrics["bookings"] == 4
+        assert len(queued.calls) == 3
+        assert sorted(len(recipients) for _, recipients, _ in queued.calls) == [1, 1, 2]
+        assert all(b.reminded_at for b in Booking.objects.filter(id__in=[b.id for b in bookings]))
+
+    def test_rerun_never_double_sends(self, make_booking, queued):
+        make_booking(TOMORROW, 10)
+        tasks.schedule_booking_reminders()
+        tasks.schedule_booking_reminders()
+
+        assert len(queued.calls) == 1
+
+    def test_stale_batch_is_skipped_after_claim(self, make_booking):
+        booking = make_booking(TOMORROW, 10)
+        backend = FakeBackend()
+        params = reminders.message_params(booking.start_at)
+
+        assert reminders.send_batch(backend, [booking.id], params) == 1
+        assert reminders.send_batch(backend, [booking.id], params) == 0
+        assert len(backend.calls) == 1
+
+    def test_rejected_numbers_are_split_out(self, make_booking):
+        bookings = [make_booking(TOMORROW, 10) for _ in range(3)]
+        backend = FakeBackend(rejected={str(bookings[1].user.phone_number)})
+        params = reminders.message_params(bookings[0].start_at)
+
+        assert reminders.send_batch(backend, [b.id for b in bookings], params) == 2
+
+        assert sorted(phone for _, recipients, _ in backend.calls for phone in recipients) == sorted(
+            str(bookings[i].user.phone_number) for i in (0, 2)
+        )
+        assert Booking.objects.filter(reminded_at__isnull=True).count() == 0 # the rejected one is not retried
+
+    def test_provider_failure_is_released_and_retried(self, make_booking, monkeypatch):
+        booking = make_booking(TOMORROW, 10)
+        params = reminders.message_params(booking.start_at)
+        monkeypatch.setattr(tasks, "get_sms_backend", lambda: FakeBackend(error=SMSUnavailable("circuit open")))
+
+        with pytest.raises(ValidationError):
+            tasks.send_booking_reminders([booking.id], params)
+
+        booking.refresh_from_db()
+        assert booking.reminded_at is None
+        assert ValidationError in tasks.send_booking_reminders.autoretry_for
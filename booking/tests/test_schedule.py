@@ -0,0 +1,185 @@
+from datetime import time
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import availability, schedule
+from booking.bays import BayGroup
+from booking.models import Booking, Holiday, WorkingCalendar
+from booking.tests.test import auth_client, make_car, make_category, make_service, make_user
+from services.models import Service
+
+pytestmark = pytest.mark.django_db
+
+MONDAY = timezone.datetime(2031, 3, 10).date()
+TUESDAY = MONDAY + timezone.timedelta(days=1)
+FRIDAY = MONDAY + timezone.timedelta(days=4)
+GROUP = BayGroup(Service.Type.Detailing, 1)
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(timezone.datetime.combine(day, time(hour, minute)))
+
+
+@pytest.fixture
+def calendar(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        WorkingCalendar.objects.create(
+            weekday=WorkingCalendar.Weekday.MONDAY,
+            opens_at=time(8, 0),
+            closes_at=time(12, 0),
+            break_starts_at=time(10, 0),
+            break_ends_at=time(10, 30),
+        )
+        WorkingCalendar.objects.create(weekday=WorkingCalendar.Weekday.FRIDAY, is_closed=True)
+        Holiday.objects.create(date=TUESDAY, title="Nowruz")
+
+
+class TestDayGrid:
+    def test_days_without_a_row_use_default_hours(self):
+        grid = schedule.day_grid(MONDAY)
+
+        assert (grid.opens, grid.closes) == (at(MONDAY, 9), at(MONDAY, 18))
+        assert len(grid.starts) == 18
+        assert all(grid.bookable)
+
+    def test_weekday_hours_break_and_closed_days(self, calendar):
+        grid = schedule.day_grid(MONDAY)
+
+        assert grid.starts[0] == at(MONDAY, 8)
+        assert grid.bookable == (True, True, True, True, False, True, True, True)
+        assert schedule.day_grid(TUESDAY).starts == ()
+        assert schedule.day_grid(FRIDAY).opens is None
+
+    def test_grid_is_compiled_once(self, calendar, django_assert_num_queries):
+        schedule.day_grid(MONDAY)
+        with django_assert_num_queries(0):
+            assert schedule.day_grid(MONDAY) is schedule.day_grid(MONDAY)
+
+    def test_admin_edit_recompiles(self, calendar, django_capture_on_commit_callbacks):
+        assert schedule.day_grid(FRIDAY).opens is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            WorkingCalendar.objects.filter(weekday=WorkingCalendar.Weekday.FRIDAY).get().delete()
+
+        assert schedule.day_grid(FRIDAY).opens == at(FRIDAY, 9)
+
+    def test_break_must_lie_inside_opening_hours(self):
+        hours = WorkingCalendar(
+            weekday=WorkingCalendar.Weekday.MONDAY, break_starts_at=time(17, 30), break_ends_at=time(19, 0),
+        )
+        with pytest.raises(ValidationError):
+            hours.full_clean()
+
+
+class TestCalendarAvailability:
+    def test_break_slots_are_never_free(self, calendar):
+        masks = availability.free_slot_masks(GROUP, MONDAY, MONDAY)
+
+        assert masks[MONDAY] == "11110111"
+        assert at(MONDAY, 10) not in availability.free_slots(GROUP, MONDAY)
+
+    def test_closed_days_skip_the_cache_and_bookings(self, calendar, django_assert_num_queries):
+        schedule.rules()
+        with django_assert_num_queries(0):
+            masks = availability.free_slot_masks(GROUP, TUESDAY, TUESDAY)
+
+        assert masks == {TUESDAY: ""}
+        assert availability.cache_stats() == {"hits": 0, "misses": 0}
+
+    def test_range_reports_each_days_opening_time(self, calendar, api_client):
+        service = make_service()
+        client = auth_client(api_client, make_user())
+        res = client.get(reverse("book-available"), {
+            "service_id": service.id, "date_from": MONDAY.isoformat(), "date_to": TUESDAY.isoformat(),
+        })
+
+        assert res.status_code == 200
+        assert res.json()["opens_at"] == {MONDAY.isoformat(): "08:00", TUESDAY.isoformat(): None}
+        assert res.json()["days"] == {MONDAY.isoformat(): "11110111", TUESDAY.isoformat(): ""}
+
+
+@pytest.fixture
+def booking_client(calendar, api_client):
+    user = make_user()
+    car = make_car(owner=user, category=make_category())
+    return auth_client(api_client, user), car, make_service()
+
+
+class TestCalendarEnforcement:
+    @pytest.mark.parametrize("start_at, end_at, error", [
+        (at(MONDAY, 8), at(MONDAY, 10), None),
+        (at(MONDAY, 10, 30), at(MONDAY, 12), None),
+        (at(MONDAY, 7, 30), at(MONDAY, 8, 30), schedule.OUTSIDE_HOURS),
+        (at(MONDAY, 11, 30), at(MONDAY, 12, 30), schedule.OUTSIDE_HOURS),
+        (at(MONDAY, 9, 30), at(MONDAY, 10, 15), schedule.OVERLAPS_BREAK),
+        (at(TUESDAY, 10), at(TUESDAY, 11), schedule.CLOSED_DAY),
+        (at(FRIDAY, 10), at(FRIDAY, 11), schedule.CLOSED_DAY),
+    ])
+    def test_window_error(self, calendar, start_at, end_at, error):
+        assert schedule.window_error(start_at, end_at) == error
+
+    @pytest.mark.parametrize("url", ["book-list", "book-hold"])
+    def test_create_and_hold_reject_closed_times(self, booking_client, url):
+        client, car, service = booking_client
+        for start_at in (at(MONDAY, 10), at(TUESDAY, 10), at(MONDAY, 7)):
+            res = client.post(reverse(url), data={
+                "car": car.id, "service": service.id, "start_at": start_at.isoformat(), "duration_minutes": 30,
+            }, format="json")
+            assert res.status_code == 400
+            assert "start_at" in res.json()
+
+        res = client.post(reverse(url), data={
+            "car": car.id, "service": service.id, "start_at": at(MONDAY, 9).isoformat(), "duration_minutes": 30,
+        }, format="json")
+        assert res.status_code == 201
+
+    def test_series_reports_occurrences_on_closed_days(self, booking_client):
+        client, car, service = booking_client
+        res = client.post(reverse("book-series"), data={
+            "car": car.id, "service": service.id, "start_at": at(TUESDAY - timezone.timedelta(weeks=1), 9).isoformat(),
+            "duration_minutes": 30, "interval_weeks": 1, "occurrences": 2,
+        }, format="json")
+
+        assert res.status_code == 400
+        assert res.json()["conflicts"] == [{"start_at": at(TUESDAY, 9).isoformat(), "error": schedule.CLOSED_DAY}]
+
+    def test_bulk_reports_items_outside_working_hours(self, booking_client):
+        client, car, service = booking_client
+        res = client.post(reverse("book-bulk"), data={"bookings": [
+            {"car": car.id, "service": service.id, "start_at": at(MONDAY, 8).isoformat(), "duration_minutes": 30},
+            {"car": car.id, "service": service.id, "start_at": at(MONDAY, 10).isoformat(), "duration_minutes": 30},
+        ]}, format="json")
+
+        assert res.status_code == 201
+        assert len(res.json()["created"]) == 1
+        assert res.json()["errors"] == [{"index": 1, "errors": {"start_at": [schedule.OVERLAPS_BREAK]}}]
+
+
+class TestSlotSizes:
+    def test_grid_follows_the_slot_size(self, calendar):
+        grid = schedule.day_grid(MONDAY, slot_minutes=60)
+
+        assert grid.starts == (at(MONDAY, 8), at(MONDAY, 9), at(MONDAY, 10), at(MONDAY, 11))
+        assert grid.bookable == (True, True, False, True)
+
+    def test_services_of_one_type_share_bays_but_not_slots(
+        self, booking_client, django_capture_on_commit_callbacks,
+    ):
+        client, car, short = booking_client
+        long = Service.objects.create(title="Full detail", service_type=short.service_type, slot_minutes=60)
+
+        def masks(service):
+            body = client.get(reverse("book-available"), {
+                "service_id": service.id, "date_from": MONDAY.isoformat(), "date_to": MONDAY.isoformat(),
+            }).json()
+            return body["slot_minutes"], body["days"][MONDAY.isoformat()]
+
+        assert (masks(short), masks(long)) == ((30, "11110111"), (60, "1101"))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Booking.objects.create(user=car.owner, car=car, service=short, start_at=at(MONDAY, 9), duration_minutes=30)
+
+        assert (masks(short), masks(long)) == ((30, "11010111"), (60, "1001"))
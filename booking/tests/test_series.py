@@ -0,0 +1,109 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import Booking, BookingSeries
+from services.models import Service, ServiceBay
+
+pytestmark = pytest.mark.django_db
+
+START = timezone.localtime(timezone.now() + timezone.timedelta(days=3)).replace(
+    hour=10, minute=0, second=0, microsecond=0,
+)
+
+
+@pytest.fixture
+def service():
+    ServiceBay.objects.create(title="Lift", service_type=Service.Type.Periodic, capacity=1)
+    return Service.objects.create(
+        title="Oil change", service_type=Service.Type.Periodic, is_active=True, base_duration_minutes=60,
+    )
+
+
+def payload(car, service, **extra):
+    return {"car": car.id, "service": service.id, "start_at": START.isoformat(), **extra}
+
+
+class TestBookingSeries:
+    def test_creates_every_occurrence(self, client, car, service, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            res = client.post(
+                reverse("book-series"), data=payload(car, service, interval_weeks=2, occurrences=4), format="json",
+            )
+
+        assert res.status_code == 201
+        body = res.json()
+        assert len(body["bookings"]) == 4
+        series = BookingSeries.objects.get(pk=body["id"])
+        starts = list(series.bookings.order_by("start_at").values_list("start_at", flat=True))
+        assert starts == [START + timezone.timedelta(weeks=2 * i) for i in range(4)]
+        assert all(b.end_at == b.start_at + timezone.timedelta(minutes=60) for b in series.bookings.all())
+        assert all(b.bay_id is not None for b in series.bookings.all())
+
+    def test_conflicting_occurrence_rejects_the_whole_series(self, client, owner, car, service):
+        clash = START + timezone.timedelta(weeks=3, minutes=30)
+        Booking.objects.create(user=owner, car=car, service=service, start_at=clash, duration_minutes=30)
+
+        res = client.post(
+            reverse("book-series"), data=payload(car, service, interval_weeks=1, occurrences=6), format="json",
+        )
+
+        assert res.status_code == 400
+        conflicts = res.json()["conflicts"]
+        assert len(conflicts) == 1
+        assert conflicts[0]["start_at"] == (START + timezone.timedelta(weeks=3)).isoformat()
+        assert not BookingSeries.objects.exists()
+        assert Booking.objects.count() == 1
+
+    def test_full_bay_is_reported_as_conflict(self, client, owner, car, service, make_cars):
+        (other,) = make_cars(1)
+        Booking.objects.create(
+            user=owner, car=other, service=service, start_at=START + timezone.timedelta(weeks=1), duration_minutes=60,
+        )
+
+        res = client.post(
+            reverse("book-series"), data=payload(car, service, interval_weeks=1, occurrences=3), format="json",
+        )
+
+        assert res.status_code == 400
+        assert len(res.json()["conflicts"]) == 1
+
+    def test_cannot_book_foreign_car(self, client, service, make_owner):
+        _, foreign = make_owner()
+
+        res = client.post(
+            reverse("book-series"), data=payload(foreign, service, interval_weeks=1, occurrences=2), format="json",
+        )
+
+        assert res.status_code == 400
+        assert "car" in res.json()
+
+    def test_occurrence_limit(self, client, car, service):
+        res = client.post(
+            reverse("book-series"), data=payload(car, service, interval_weeks=1, occurrences=53), format="json",
+        )
+
+        assert res.status_code == 400
+        assert "occurrences" in res.json()
+
+    def test_year_long_series_uses_constant_queries(self, client, owner, car, service):
+        Booking.objects.bulk_create([
+            Booking(
+                user=owner, car=car, service=service,
+                start_at=START + timezone.timedelta(days=d, hours=3),
+                end_at=START + timezone.timedelta(days=d, hours=4),
+                duration_minutes=60,
+            )
+            for d in range(365)
+        ])
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.post(
+                reverse("book-series"), data=payload(car, service, interval_weeks=1, occurrences=52), format="json",
+            )
+
+        assert res.status_code == 201
+        assert Booking.objects.filter(series__isnull=False).count() == 52
+        assert len(ctx.captured_queries) <= 15
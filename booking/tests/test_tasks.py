@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from booking.models import Booking
+from booking.tasks import sweep_stale_bookings
+
+pytestmark = pytest.mark.django_db
+
+NOW = timezone.now().replace(microsecond=0)
+
+
+@pytest.fixture
+def make_booking(owner, car, service):
+    def make(hours_ago, status, count=1):
+        start_at = NOW - timezone.timedelta(hours=hours_ago)
+        return Booking.objects.bulk_create([
+            Booking(
+                user=owner, car=car, service=service, status=status,
+                start_at=start_at, end_at=start_at + timezone.timedelta(minutes=30),
+            )
+            for _ in range(count)
+        ])
+
+    return make
+
+
+class TestSweepStaleBookings:
+    def test_moves_finished_bookings(self, make_booking):
+        done = make_booking(48, Booking.Status.CONFIRMED, count=3)
+        no_show = make_booking(48, Booking.Status.PENDING, count=2)
+        recent = make_booking(0.5, Booking.Status.CONFIRMED)
+        future = make_booking(-24, Booking.Status.PENDING)
+        canceled = make_booking(48, Booking.Status.CANCELED)
+
+        metrics = sweep_stale_bookings(batch_size=2)
+
+        assert metrics["moved"] == {"Done": 3, "No-show": 2}
+        assert not metrics["exhausted"]
+
+        def statuses(rows):
+            return set(Booking.objects.filter(id__in=[b.id for b in rows]).values_list("status", flat=True))
+
+        assert statuses(done) == {Booking.Status.DONE}
+        assert statuses(no_show) == {Booking.Status.NO_SHOW}
+        assert statuses(recent) == {Booking.Status.CONFIRMED}
+        assert statuses(future) == {Booking.Status.PENDING}
+        assert statuses(canceled) == {Booking.Status.CANCELED}
+
+    def test_stops_after_max_batches(self, make_booking):
+        make_booking(48, Booking.Status.CONFIRMED, count=10)
+
+        first = sweep_stale_bookings(batch_size=3, max_batches=2)
+        assert first["moved"]["Done"] == 6
+        assert first["exhausted"]
+
+        second = sweep_stale_bookings(batch_size=3, max_batches=10)
+        assert second["moved"]["Done"] == 4
+        assert not Booking.objects.filter(status=Booking.Status.CONFIRMED).exists()
+
+    def test_each_rule_gets_its_own_budget(self, make_booking):
+        make_booking(48, Booking.Status.CONFIRMED, count=10)
+        make_booking(48, Booking.Status.PENDING, count=2)
+
+        metrics = sweep_stale_bookings(batch_size=3, max_batches=2)
+
+        assert metrics["moved"] == {"Done": 6, "No-show": 2}
+        assert metrics["batches"] == {"Done": 2, "No-show": 1}
+        assert metrics["exhausted"] == ["Done"]
+
+    def test_chunk_query_is_bounded(self, make_booking):
+        make_booking(48, Booking.Status.CONFIRMED, count=5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            sweep_stale_bookings(batch_size=5)
+
+        chunk = next(q["sql"] for q in ctx.captured_queries if "LIMIT 5" in q["sql"])
+        assert '"end_at" <' in chunk
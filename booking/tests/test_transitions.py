@@ -0,0 +1,96 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking import availability
+from booking.bays import BayGroup
+from booking.models import Booking
+from booking.tests.test import auth_client
+from booking.transitions import transition
+
+User = get_user_model()
+pytestmark = pytest.mark.django_db
+
+START = timezone.localtime(timezone.now() + timezone.timedelta(days=2)).replace(
+    hour=10, minute=0, second=0, microsecond=0,
+)
+
+
+@pytest.fixture
+def bookings(owner, car, service):
+    return [
+        Booking.objects.create(
+            user=owner, car=car, service=service, duration_minutes=30,
+            start_at=START + timezone.timedelta(hours=i), status=status,
+        )
+        for i, status in enumerate([
+            Booking.Status.PENDING,
+            Booking.Status.PENDING,
+            Booking.Status.CONFIRMED,
+            Booking.Status.CANCELED,
+        ])
+    ]
+
+
+@pytest.fixture
+def staff_client(api_client):
+    staff = User.objects.create_user(phone_number="+989129999999", password="x12345678", is_staff=True)
+    return auth_client(api_client, staff)
+
+
+class TestBookingTransition:
+    def test_confirms_pending_bookings_in_one_update(self, staff_client, bookings):
+        ids = [b.id for b in bookings] + [999999]
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = staff_client.post(reverse("book-transition"), data={"ids": ids, "status": 2}, format="json")
+
+        assert res.status_code == 200
+        body = res.json()
+        assert body["updated"] == [bookings[0].id, bookings[1].id]
+        assert {item["id"] for item in body["skipped"]} == {bookings[2].id, bookings[3].id, 999999}
+        assert list(Booking.objects.order_by("id").values_list("status", flat=True)) == [2, 2, 2, 3]
+        assert len([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]) == 1
+
+    def test_reports_only_the_rows_it_changed(self, bookings, monkeypatch):
+        real_update = QuerySet.update
+
+        def racing_update(queryset, **kwargs):
+            # another writer cancels a booking between the status read and the update
+            real_update(Booking.objects.filter(pk=bookings[1].pk), status=Booking.Status.CANCELED)
+            return real_update(queryset, **kwargs)
+
+        monkeypatch.setattr(QuerySet, "update", racing_update)
+        updated, skipped = transition([bookings[0].id, bookings[1].id], Booking.Status.CONFIRMED)
+
+        assert updated == [bookings[0].id]
+        assert skipped == {bookings[1].id: "Booking status changed meanwhile."}
+        assert Booking.objects.get(pk=bookings[1].pk).status == Booking.Status.CANCELED
+
+    def test_cancel_frees_the_slots(self, staff_client, bookings, django_capture_on_commit_callbacks):
+        service = bookings[0].service
+        group = BayGroup(service.service_type, 1)
+        day = timezone.localdate(START)
+        before = availability.free_slots(group, day)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            res = staff_client.post(
+                reverse("book-transition"), data={"ids": [bookings[0].id], "status": 3}, format="json",
+            )
+
+        assert res.json()["updated"] == [bookings[0].id]
+        assert len(availability.free_slots(group, day)) == len(before) + 1
+
+    def test_requires_staff(self, client, bookings):
+        res = client.post(reverse("book-transition"), data={"ids": [bookings[0].id], "status": 2}, format="json")
+
+        assert res.status_code == 403
+        assert Booking.objects.get(pk=bookings[0].pk).status == Booking.Status.PENDING
+
+    def test_rejects_unknown_status(self, staff_client, bookings):
+        res = staff_client.post(reverse("book-transition"), data={"ids": [bookings[0].id], "status": 9}, format="json")
+        assert res.status_code == 400
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.utils import timezone
+
+from booking import availability, events
+from booking.models import Booking
+from booking.serializers import ACTIVE_STATUSES
+from carservices.db import write_transaction
+
+Status = Booking.Status
+
+# target status -> statuses a booking may move to it from
+ALLOWED_TRANSITIONS = {
+    Status.PENDING: set(),
+    Status.CONFIRMED: {Status.PENDING},
+    Status.CANCELED: {Status.PENDING, Status.CONFIRMED},
+    Status.DONE: {Status.CONFIRMED},
+    Status.NO_SHOW: {Status.PENDING, Status.CONFIRMED},
+}
+
+
+def transition(ids, target):
+    """
+    Move the bookings in ``ids`` to ``target`` where the transition is allowed.
+
+    Reads the current statuses with one query and applies the change with one
+    ``UPDATE ... WHERE id IN (...) AND status IN (...)``; the status condition
+    keeps a row that changed in between from being overwritten, and such a
+    row is reported as skipped rather than updated.
+
+    Returns ``(updated_ids, skipped)`` where ``skipped`` maps id to reason.
+    """
+    sources = ALLOWED_TRANSITIONS[target]
+    ids = set(ids)
+
+    with write_transaction():
+        current = {
+            pk: (status, start_at, end_at, service_id)
+            for pk, status, start_at, end_at, service_id in Booking.objects.select_for_update()
+            .filter(id__in=ids)
+            .values_list("id", "status", "start_at", "end_at", "service_id")
+        }
+        skipped = {pk: "Booking not found." for pk in ids - set(current)}
+        eligible = []
+        for pk, (status, *_) in current.items():
+            if status in sources:
+                eligible.append(pk)
+            else:
+                skipped[pk] = f"Cannot change status from {Status(status).label} to {target.label}."
+
+        updated = []
+        if eligible:
+            count = Booking.objects.filter(id__in=eligible, status__in=sources).update(status=target)
+            updated = sorted(eligible)
+            if count < len(eligible):
+                # some rows left ``sources`` in between: report only those this update moved
+                updated = sorted(
+                    Booking.objects.filter(id__in=eligible, status=target).values_list("id", flat=True)
+                )
+                for pk in set(eligible) - set(updated):
+                    skipped[pk] = "Booking status changed meanwhile."
+
+        # update() sends no post_save; only leaving the active set frees slots
+        if target not in ACTIVE_STATUSES:
+            days = set()
+            released = []
+            for pk in updated:
+                _, start_at, end_at, service_id = current[pk]
+                days.update(availability.days_between(timezone.localdate(start_at), timezone.localdate(end_at)))
+                released.append((service_id, start_at, end_at, events.RELEASED))
+            if days:
+                transaction.on_commit(lambda: availability.invalidate_days(days))
+            events.publish_on_commit(released)
+
+    return updated, skipped
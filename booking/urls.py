@@ -1,7 +1,11 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from booking.views import BookingViewSet
+from booking.views import BookingViewSet, availability_events, available_async
 
 router = DefaultRouter()
 router.register("book", BookingViewSet, basename="book")
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path("events/", availability_events, name="availability-events"),
+    path("async/available/", available_async, name="async-available"),
+] + router.urls
\ No newline at end of file
@@ -1,58 +1,389 @@
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views.decorators.http import require_GET
+from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
-from booking.serializers import BookingSerializer
+from booking.serializers import (
+    BookingFilterSerializer,
+    BookingSerializer,
+    BookingSeriesSerializer,
+    BookingTransitionSerializer,
+    SlotBusy,
+)
+from booking import availability, bays, bulk, defaults, events, holds, schedule, series, transitions
+from carservices.locks import LockTimeout
+from carservices.pagination import KeysetPagination
+from users.authentications import atoken_user_id
+
+from booking.models import ArchivedBooking, Booking
+
+
+def _service_group(service_id):
+    try:
+        return bays.group_for_service(int(service_id))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _aservice_group(service_id):
+    try:
+        return await bays.agroup_for_service(int(service_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_available(params):
+    """
+    Validate the ``available`` query: ``service_id`` plus either ``date`` or
+    ``date_from``/``date_to``. Returns ``(query, error)``.
+    """
+    service_id = params.get("service_id")
+    date_str = params.get("date")
+    date_from_str = params.get("date_from")
+    date_to_str = params.get("date_to")
+
+    if date_from_str or date_to_str:
+        if not service_id or not date_from_str or not date_to_str:
+            return None, "service_id, date_from and date_to are required"
+        try:
+            day_from = date.fromisoformat(date_from_str)
+            day_to = date.fromisoformat(date_to_str)
+        except ValueError:
+            return None, "date_from and date_to must be YYYY-MM-DD"
+        if day_to < day_from:
+            return None, "date_to must not be before date_from"
+        if (day_to - day_from).days >= defaults.MAX_AVAILABILITY_RANGE_DAYS:
+            return None, f"date range may span at most {defaults.MAX_AVAILABILITY_RANGE_DAYS} days"
+        return {
+            "service_id": service_id,
+            "date_from": date_from_str,
+            "date_to": date_to_str,
+            "day_from": day_from,
+            "day_to": day_to,
+        }, None
+
+    if not service_id or not date_str:
+        return None, "service_id and date are required"
+    try:
+        day = datetime.fromisoformat(date_str).date()
+    except ValueError:
+        return None, "date must be YYYY-MM-DD"
+    return {"service_id": service_id, "date": date_str, "day": day}, None
+
+
+def _parse_next_available(params):
+    """
+    Validate the ``next-available`` query: ``service_id`` and ``date``, plus
+    optional ``time_from``/``time_to`` (HH:MM) and ``count``. Returns
+    ``(query, error)``.
+    """
+    service_id = params.get("service_id")
+    date_str = params.get("date")
+    if not service_id or not date_str:
+        return None, "service_id and date are required"
+    try:
+        day = date.fromisoformat(date_str)
+    except ValueError:
+        return None, "date must be YYYY-MM-DD"
+
+    try:
+        time_from = time.fromisoformat(params["time_from"]) if params.get("time_from") else None
+        time_to = time.fromisoformat(params["time_to"]) if params.get("time_to") else None
+    except ValueError:
+        return None, "time_from and time_to must be HH:MM"
+    if time_from and time_to and time_to <= time_from:
+        return None, "time_to must be after time_from"
+
+    try:
+        count = int(params.get("count", defaults.NEXT_AVAILABLE_DEFAULT_COUNT))
+    except ValueError:
+        return None, "count must be a number"
+    if not 1 <= count <= defaults.NEXT_AVAILABLE_MAX_COUNT:
+        return None, f"count must be between 1 and {defaults.NEXT_AVAILABLE_MAX_COUNT}"
 
-from booking.models import Booking
+    return {
+        "service_id": service_id,
+        # the past has no free slots worth scanning
+        "day": max(day, timezone.localdate()),
+        "time_from": time_from,
+        "time_to": time_to,
+        "count": count,
+    }, None
+
+
+def _day_payload(query, slots):
+    return {"date": query["date"], "free_slots": [s.isoformat() for s in slots]}
+
+
+def _range_payload(query, masks, grids, slot_minutes):
+    return {
+        "date_from": query["date_from"],
+        "date_to": query["date_to"],
+        # masks start at each day's opening time; closed days have none
+        "opens_at": {
+            day.isoformat(): grid.opens and timezone.localtime(grid.opens).strftime("%H:%M")
+            for day, grid in grids.items()
+        },
+        "slot_minutes": slot_minutes,
+        "days": {day.isoformat(): mask for day, mask in masks.items()},
+    }
+
+
+class BookingPagination(KeysetPagination):
+    ordering = ("start_at", "id") # served by the (user, start_at) index
 
 
 class BookingViewSet(ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BookingPagination
 
     def get_queryset(self):
-        return Booking.objects.select_related("car", "service").filter(user=self.request.user)
+        queryset = Booking.objects.select_related("user", "car", "service").filter(user=self.request.user)
+        if self.action == "list":
+            queryset = self.list_filters.filter(queryset)
+        return queryset
+
+    @property
+    def list_filters(self):
+        if not hasattr(self, "_list_filters"):
+            self._list_filters = BookingFilterSerializer(data=self.request.query_params)
+            self._list_filters.is_valid(raise_exception=True)
+        return self._list_filters
+
+    def list(self, request, *args, **kwargs):
+        if not self.list_filters.validated_data["history"]:
+            return super().list(request, *args, **kwargs)
+
+        # archived bookings are only read when the client asks for history
+        archived = self.list_filters.filter(
+            ArchivedBooking.objects.select_related("user", "car", "service").filter(user=request.user)
+        )
+        page = self.paginator.paginate_querysets([self.get_queryset(), archived], request, view=self)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated], url_path="bulk")
+    def bulk(self, request):
+        items = request.data.get("bookings") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "bookings must be a non-empty list"}, status=400)
+        if len(items) > defaults.MAX_BULK_BOOKINGS:
+            return Response(
+                {"error": f"at most {defaults.MAX_BULK_BOOKINGS} bookings per request"}, status=400,
+            )
+
+        try:
+            created, errors = bulk.create_bookings(request.user, items)
+        except LockTimeout:
+            raise SlotBusy()
+
+        return Response({
+            "created": self.get_serializer(created, many=True).data,
+            "errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)],
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated], url_path="series", url_name="series")
+    def create_series(self, request):
+        serializer = BookingSeriesSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            created_series, created = series.create_series(request.user, serializer.validated_data)
+        except LockTimeout:
+            raise SlotBusy()
+
+        return Response({
+            **BookingSeriesSerializer(created_series, context=self.get_serializer_context()).data,
+            "bookings": self.get_serializer(created, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAdminUser], url_path="transition")
+    def transition(self, request):
+        serializer = BookingTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updated, skipped = transitions.transition(
+            serializer.validated_data["ids"], serializer.validated_data["status"],
+        )
+        return Response({
+            "status": serializer.validated_data["status"],
+            "updated": updated,
+            "skipped": [{"id": pk, "error": skipped[pk]} for pk in sorted(skipped)],
+        })
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated], url_path="hold")
+    def hold(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        hold = serializer.hold()
+
+        return Response({
+            "hold_token": hold["token"],
+            "expires_at": hold["expires_at"],
+            "car": hold["car_id"],
+            "service": hold["service_id"],
+            "start_at": hold["start_at"],
+            "duration_minutes": hold["duration_minutes"],
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated], url_path="confirm")
+    def confirm(self, request):
+        token = request.data.get("hold_token")
+        hold = holds.get_hold(token) if token else None
+        if hold is None or hold["user_id"] != request.user.id:
+            return Response({"error": "Hold not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = self.get_serializer(
+            data={
+                "car": hold["car_id"],
+                "service": hold["service_id"],
+                "start_at": hold["start_at"],
+                "duration_minutes": hold["duration_minutes"],
+                "note": request.data.get("note"),
+            },
+        )
+        serializer.context["hold_token"] = token
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        holds.release_hold(hold)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated], url_path="available")
     def available(self, request):
+        query, error = _parse_available(request.query_params)
+        if error:
+            return Response({"error": error}, status=400)
+
+        group = _service_group(query["service_id"])
+        if group is None:
+            return Response({"error": "Unknown service"}, status=400)
+
+        if "day" in query:
+            return Response(_day_payload(query, availability.free_slots(group, query["day"])))
+        masks = availability.free_slot_masks(group, query["day_from"], query["day_to"])
+        grids = schedule.grids(masks, group.slot_minutes)
+        return Response(_range_payload(query, masks, grids, group.slot_minutes))
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated], url_path="next-available", url_name="next-available")
+    def next_available(self, request):
+        query, error = _parse_next_available(request.query_params)
+        if error:
+            return Response({"error": error}, status=400)
+
+        group = _service_group(query["service_id"])
+        if group is None:
+            return Response({"error": "Unknown service"}, status=400)
+
+        slots, searched_to = availability.next_free_slots(
+            group, query["day"], query["count"], query["time_from"], query["time_to"],
+        )
+        return Response({
+            "date_from": query["day"].isoformat(),
+            "searched_to": searched_to.isoformat(),
+            "free_slots": [slot.isoformat() for slot in slots],
+        })
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated], url_path="heatmap")
+    def heatmap(self, request):
         service_id = request.query_params.get("service_id")
-        date_str = request.query_params.get("date")
+        month_str = request.query_params.get("month")
 
-        if not service_id or not date_str:
-            return Response({"error": "service_id and date are required"}, status=400)
+        if not service_id or not month_str:
+            return Response({"error": "service_id and month are required"}, status=400)
 
-        day = datetime.fromisoformat(date_str).date()
-        start_day = timezone.make_aware(datetime.combine(day, time(9, 0)))
-        end_day = timezone.make_aware(datetime.combine(day, time(18, 0)))
-
-        slot_minutes = 30 
-        slots = []
-        cur = start_day
-        while cur + timedelta(minutes=slot_minutes) <= end_day:
-            slots.append(cur)
-            cur += timedelta(minutes=slot_minutes)
-
-        active = Booking.objects.filter(
-            status__in=[Booking.Status.PENDING, Booking.Status.CONFIRMED],
-            start_at__lt=end_day,
-            start_at__gte=start_day,
-        ).only("start_at", "duration_minutes")
-
-        busy = []
-        for b in active:
-            busy.append((b.start_at, b.start_at + timedelta(minutes=b.duration_minutes)))
-
-        free = []
-        for s in slots:
-            e = s + timedelta(minutes=slot_minutes)
-            overlap = any(bs < e and be > s for bs, be in busy)
-            if not overlap:
-                free.append(s.isoformat())
-
-        return Response({"date": date_str, "free_slots": free})
+        try:
+            first_day = datetime.strptime(month_str, "%Y-%m").date()
+        except ValueError:
+            return Response({"error": "month must be YYYY-MM"}, status=400)
+
+        group = _service_group(service_id)
+        if group is None:
+            return Response({"error": "Unknown service"}, status=400)
+
+        next_month = (first_day + timedelta(days=32)).replace(day=1)
+        counts = availability.free_slot_counts(group, first_day, next_month - timedelta(days=1))
+
+        return Response({
+            "month": month_str,
+            # the busiest calendar day of the month, as the heatmap's scale
+            "slots_per_day": max(availability.slots_per_day(day, group.slot_minutes) for day in counts),
+            "days": {day.isoformat(): count for day, count in counts.items()},
+        })
+
+
+@require_GET
+async def availability_events(request):
+    """
+    Live slot changes of one service's bay group as server-sent events, for
+    an open booking screen instead of polling ``available``. Optional
+    ``date_from``/``date_to`` limit the stream to those days. Needs an ASGI
+    server: under WSGI the endless stream would hold a worker without ever
+    sending a byte.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Live events need the ASGI server."}, status=501)
+    if await atoken_user_id(request) is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    service_id = request.GET.get("service_id")
+    date_from_str = request.GET.get("date_from")
+    date_to_str = request.GET.get("date_to")
+    if not service_id:
+        return JsonResponse({"error": "service_id is required"}, status=400)
+
+    days = None
+    if date_from_str or date_to_str:
+        try:
+            day_from = date.fromisoformat(date_from_str or date_to_str)
+            day_to = date.fromisoformat(date_to_str or date_from_str)
+        except ValueError:
+            return JsonResponse({"error": "date_from and date_to must be YYYY-MM-DD"}, status=400)
+        if day_to < day_from or (day_to - day_from).days >= defaults.MAX_AVAILABILITY_RANGE_DAYS:
+            return JsonResponse({"error": "invalid date range"}, status=400)
+        days = availability.days_between(day_from, day_to)
+
+    group = await sync_to_async(_service_group)(service_id)
+    if group is None:
+        return JsonResponse({"error": "Unknown service"}, status=400)
+
+    return StreamingHttpResponse(
+        events.stream(group, days),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@require_GET
+async def available_async(request):
+    """
+    Async twin of ``BookingViewSet.available`` for ASGI deployments: the
+    token and user are checked with one async query and a warm availability
+    cache is read with the async cache API, so no worker thread is held.
+    """
+    if await atoken_user_id(request) is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    query, error = _parse_available(request.GET)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+
+    group = await _aservice_group(query["service_id"])
+    if group is None:
+        return JsonResponse({"error": "Unknown service"}, status=400)
+
+    if "day" in query:
+        return JsonResponse(_day_payload(query, await availability.afree_slots(group, query["day"])))
+    masks = await availability.afree_slot_masks(group, query["day_from"], query["day_to"])
+    grids = await schedule.agrids(masks, group.slot_minutes)
+    return JsonResponse(_range_payload(query, masks, grids, group.slot_minutes))
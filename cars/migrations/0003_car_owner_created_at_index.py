@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 12:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0002_remove_car_model_remove_car_shomare_shasi_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['owner', 'created_at', 'id'], name='cars_car_owner_i_b107b9_idx'),
+        ),
+    ]
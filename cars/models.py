@@ -18,6 +18,10 @@ class Car(models.Model):
     model_year = models.PositiveSmallIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "created_at", "id"]),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.pelak}"
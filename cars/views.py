@@ -5,6 +5,7 @@ from cars.serializers import CarSerializer, CarCreateSerializer, CategorySeriali
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.mixins import ListModelMixin, DestroyModelMixin, RetrieveModelMixin, CreateModelMixin
 from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet
+from carservices.pagination import KeysetPagination
 
 class CategoryViewSet(ReadOnlyModelViewSet):
     queryset = Category.objects.filter(is_active=True)
@@ -12,8 +13,13 @@ class CategoryViewSet(ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
 
 
+class CarPagination(KeysetPagination):
+    ordering = ("created_at", "id") # served by the (owner, created_at) index
+
+
 class CarView(CreateModelMixin, ListModelMixin, DestroyModelMixin, RetrieveModelMixin, GenericViewSet):
     permission_classes = [IsAuthenticated]
+    pagination_class = CarPagination
 
     def get_queryset(self):
         return Car.objects.select_related("category").filter(owner=self.request.user)
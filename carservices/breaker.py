@@ -0,0 +1,79 @@
+import time
+
+from django.core.cache import cache
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker whose state lives in the shared
+    cache, so every worker stops calling a failing dependency together.
+
+    ``failure_threshold`` errors in a row, or calls slower than
+    ``latency_threshold`` seconds, open the circuit for ``open_seconds``;
+    calls made meanwhile raise CircuitOpen without running. After that one
+    caller at a time gets a trial call: a success closes the circuit, a
+    failure opens it again. Failures older than ``failure_window`` seconds
+    without a new one are forgotten. Exceptions in ``healthy_errors`` (say, a
+    request the dependency rejected) pass through and count as successes.
+    """
+
+    def __init__(
+        self, name, failure_threshold=5, latency_threshold=None, open_seconds=30, failure_window=60, healthy_errors=(),
+    ):
+        self.name = name
+        self.healthy_errors = tuple(healthy_errors)
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.open_seconds = open_seconds
+        self.failure_window = failure_window
+
+    def _key(self, part):
+        return f"breaker:{self.name}:{part}"
+
+    def allow(self):
+        if cache.get(self._key("open")) is not None:
+            return False
+        if cache.get(self._key("failures"), 0) < self.failure_threshold:
+            return True
+        # half open: a single trial call per open period
+        return cache.add(self._key("trial"), True, timeout=self.open_seconds)
+
+    def record_success(self):
+        cache.delete_many([self._key("failures"), self._key("trial")])
+
+    def record_failure(self):
+        key = self._key("failures")
+        cache.add(key, 0, timeout=self.failure_window)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            # expired between add and incr
+            cache.set(key, 1, timeout=self.failure_window)
+            failures = 1
+        cache.touch(key, timeout=self.failure_window)
+        if failures >= self.failure_threshold:
+            cache.set(self._key("open"), True, timeout=self.open_seconds)
+            cache.delete(self._key("trial"))
+
+    def call(self, func, *args, **kwargs):
+        """Run ``func`` through the breaker; raises CircuitOpen while the circuit is open."""
+        if not self.allow():
+            raise CircuitOpen(self.name)
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except self.healthy_errors:
+            self.record_success()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        if self.latency_threshold is not None and time.monotonic() - started > self.latency_threshold:
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
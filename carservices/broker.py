@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "events:"
+QUEUE_SIZE = 256 # messages buffered per subscriber; a slower reader loses the oldest
+RECONNECT_SECONDS = 1
+REDIS_TIMEOUT_SECONDS = 2 # connect and publish timeout, so a hung Redis never stalls a request
+
+
+class Subscription:
+    """
+    One subscriber's queue on a channel. Use as an async context manager:
+    ``async with broker.subscribe(channel) as subscription: ...``.
+    """
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = None
+        self.queue = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.broker._add(self)
+        await self.broker._listen(self.loop)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove(self)
+
+    def offer(self, message):
+        # runs on the subscriber's loop
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        """Next message, or ``None`` when ``timeout`` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker(ABC):
+    """
+    In-process fan-out of JSON messages to async subscribers. Publishing is
+    synchronous and safe from any thread (signal handlers, Celery tasks);
+    every subscriber gets messages on its own event loop.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        return Subscription(self, channel)
+
+    @abstractmethod
+    def publish(self, channel, message):
+        """Send ``message`` to every subscriber of ``channel``; never raises for a broker outage."""
+
+    def _add(self, subscription):
+        with self._lock:
+            self._subscriptions.setdefault(subscription.channel, set()).add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.channel, None)
+
+    def _deliver(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # the subscriber's loop is already closed
+                self._remove(subscription)
+
+    async def _listen(self, loop):
+        pass
+
+
+class MemoryBroker(Broker):
+    """Single-process broker for tests and development."""
+
+    def publish(self, channel, message):
+        # round-trip through JSON like the Redis backend does
+        self._deliver(channel, json.loads(json.dumps(message)))
+
+
+class RedisBroker(Broker):
+    """
+    Publishes through Redis pub/sub so every process sees every message. Each
+    event loop keeps one pattern subscription to Redis and fans messages out
+    to its local subscribers. The first subscriber of a loop waits until
+    Redis confirmed that subscription, so nothing published after
+    ``subscribe()`` returns is missed.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self._client = None
+        self._listeners = {}
+
+    def publish(self, channel, message):
+        try:
+            if self._client is None:
+                self._client = redis.Redis.from_url(
+                    self.url, socket_timeout=REDIS_TIMEOUT_SECONDS, socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+                )
+            self._client.publish(CHANNEL_PREFIX + channel, json.dumps(message))
+        except Exception as exc:
+            # events are best effort: a broker outage must not fail the write that published them
+            logger.warning("Could not publish to %s: %s", channel, exc)
+
+    async def _listen(self, loop):
+        self._listeners = {known: listener for known, listener in self._listeners.items() if not known.is_closed()}
+        listener = self._listeners.get(loop)
+        if listener is None or listener[0].done():
+            subscribed = asyncio.Event()
+            listener = self._listeners[loop] = (loop.create_task(self._run(subscribed)), subscribed)
+        try:
+            await asyncio.wait_for(listener[1].wait(), REDIS_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # stream anyway; the listener keeps reconnecting in the background
+            logger.warning("Event subscription not confirmed within %ss", REDIS_TIMEOUT_SECONDS)
+
+    async def _run(self, subscribed):
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url, socket_connect_timeout=REDIS_TIMEOUT_SECONDS)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                    # Redis routes messages to us once it has confirmed the subscription
+                    if await pubsub.get_message(timeout=REDIS_TIMEOUT_SECONDS) is None:
+                        raise redis.TimeoutError("psubscribe was not confirmed")
+                    subscribed.set()
+                    async for item in pubsub.listen():
+                        if item["type"] != "pmessage":
+                            continue
+                        channel = item["channel"].decode()[len(CHANNEL_PREFIX):]
+                        self._deliver(channel, json.loads(item["data"]))
+            except Exception as exc:
+                logger.warning("Event subscription lost: %s", exc)
+                await asyncio.sleep(RECONNECT_SECONDS)
+            finally:
+                await client.aclose()
+
+
+_brokers = {}
+
+
+def get_broker():
+    """The process-wide broker for ``settings.EVENTS_BROKER_URL`` (``memory://`` or a Redis URL)."""
+    url = settings.EVENTS_BROKER_URL
+    if url not in _brokers:
+        _brokers[url] = MemoryBroker() if url.startswith("memory://") else RedisBroker(url)
+    return _brokers[url]
@@ -1,8 +1,28 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'carservices.settings')
 
 app = Celery('carservices')
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+app.conf.beat_schedule = {
+    'sweep-stale-bookings': {
+        'task': 'booking.tasks.sweep_stale_bookings',
+        'schedule': crontab(minute='*/15'),
+    },
+    'archive-finished-bookings': {
+        'task': 'booking.tasks.archive_finished_bookings',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'dispatch-sms-outbox': {
+        'task': 'users.tasks.dispatch_sms_outbox',
+        'schedule': crontab(minute='*'),
+    },
+    'schedule-booking-reminders': {
+        'task': 'booking.tasks.schedule_booking_reminders',
+        'schedule': crontab(hour=17, minute=0),
+    },
+}
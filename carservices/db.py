@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def write_transaction(using=None):
+    """
+    ``transaction.atomic`` for a block that reads and then writes. On SQLite
+    the write lock is taken at BEGIN (``BEGIN IMMEDIATE``), so concurrent
+    writers queue on the busy timeout instead of failing with "database is
+    locked" when their read turns into a write. Other databases, and blocks
+    nested in an outer transaction, get a plain ``atomic``.
+    """
+    connection = transaction.get_connection(using)
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    connection.ensure_connection()
+    mode = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
@@ -0,0 +1,65 @@
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+
+from django.core.cache import cache
+
+DEFAULT_LOCK_SECONDS = 10
+DEFAULT_WAIT_SECONDS = 5
+POLL_INTERVAL_SECONDS = 0.005
+
+# delete the key only while it still holds our token, in one round trip
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LockTimeout(Exception):
+    pass
+
+
+def release(key, token):
+    """
+    Delete the lock ``key`` if it still holds ``token``. On Redis the check
+    and the delete run as one script, so a lock that expired and was taken by
+    another worker in between is never released by mistake; other caches
+    only live in one process and fall back to a get then delete.
+    """
+    client = getattr(cache, "client", None)
+    if hasattr(client, "get_client"):
+        client.get_client(write=True).eval(RELEASE_SCRIPT, 1, client.make_key(key), client.encode(token))
+        return
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+@contextmanager
+def cache_lock(key, timeout=DEFAULT_LOCK_SECONDS, wait=DEFAULT_WAIT_SECONDS):
+    """
+    Mutual exclusion across workers on ``cache.add`` (``SET NX EX`` on Redis).
+
+    ``timeout`` bounds how long a crashed holder can keep the lock; ``wait``
+    bounds how long we queue for it before raising LockTimeout.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    while not cache.add(key, token, timeout=timeout):
+        if time.monotonic() >= deadline:
+            raise LockTimeout(key)
+        time.sleep(POLL_INTERVAL_SECONDS)
+    try:
+        yield
+    finally:
+        release(key, token)
+
+
+@contextmanager
+def cache_locks(keys, **kwargs):
+    """Hold several cache locks at once, always taken in sorted order to avoid deadlocks."""
+    with ExitStack() as stack:
+        for key in sorted(set(keys)):
+            stack.enter_context(cache_lock(key, **kwargs))
+        yield
@@ -0,0 +1,133 @@
+import base64
+import binascii
+import heapq
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over ``ordering``, which must end with a
+    unique field (normally ``id``) and use one direction for every field.
+
+    The cursor holds the ordering values of the last row of the page, and the
+    next page is ``WHERE (a, b) > (last_a, last_b) ORDER BY a, b LIMIT n``.
+    Backed by an index on the filtered columns plus ``ordering``, every page
+    costs the same however deep the client scrolls, unlike OFFSET.
+
+    Null values sort first ascending and last descending on every backend.
+
+    :meth:`paginate_querysets` pages several querysets with the same ordering
+    fields as one list, e.g. a hot table and its archive.
+    """
+
+    ordering = ("id",)
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        self.request = request
+        self.fields = [name.lstrip("-") for name in self.ordering]
+        self.descending = self.ordering[0].startswith("-")
+
+        order_by = [
+            F(name).desc(nulls_last=True) if self.descending else F(name).asc(nulls_first=True)
+            for name in self.fields
+        ]
+        cursor = self.decode_cursor(request, querysets[0].model)
+        page_size = self.get_page_size(request)
+
+        pages = []
+        for queryset in querysets:
+            queryset = queryset.order_by(*order_by)
+            if cursor is not None:
+                queryset = queryset.filter(self.after(cursor))
+            pages.append(list(queryset[:page_size + 1]))
+        rows = pages[0] if len(pages) == 1 else list(
+            heapq.merge(*pages, key=self.sort_key, reverse=self.descending)
+        )
+
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last = [getattr(rows[-1], name) for name in self.fields] if rows else None
+        return rows
+
+    def sort_key(self, row):
+        # matches the SQL order: nulls first ascending, last descending
+        return tuple((value is not None, value) for value in (getattr(row, name) for name in self.fields))
+
+    def after(self, cursor):
+        """Rows strictly after ``cursor`` in the pagination order."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for name, value in zip(self.fields, cursor):
+            if value is None:
+                # nulls come first ascending, so every non-null value follows;
+                # descending they come last and nothing follows them
+                if not self.descending:
+                    condition |= equal & Q(**{f"{name}__isnull": False})
+                equal &= Q(**{f"{name}__isnull": True})
+            else:
+                beyond = Q(**{f"{name}__lt" if self.descending else f"{name}__gt": value})
+                if self.descending:
+                    beyond |= Q(**{f"{name}__isnull": True})
+                condition |= equal & beyond
+                equal &= Q(**{name: value})
+        return condition
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [
+                None if value is None else model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values):
+        values = [value.isoformat() if hasattr(value, "isoformat") else value for value in values]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -69,6 +69,14 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # how long a writer waits for the write lock; transactions that read
+        # and then write take it up front (carservices.db.write_transaction)
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -123,11 +131,20 @@ CACHES = {
     }
 }
 
+# Live booking events (booking.events); "memory://" keeps them in one process
+EVENTS_BROKER_URL = os.getenv("EVENTS_BROKER_URL", "redis://127.0.0.1:6379/2")
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://127.0.0.1:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://127.0.0.1:6379/0")
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_TIMEZONE = TIME_ZONE # beat crontabs are in local time
+
+# SMS (third_parties.sms.backends); the fallback takes over while the primary's circuit is open
+SMS_BACKEND = os.getenv("SMS_BACKEND", "third_parties.sms.faraz_sms.SMSHandler")
+SMS_FALLBACK_BACKEND = os.getenv("SMS_FALLBACK_BACKEND") or None
+SMS_FILE_PATH = os.getenv("SMS_FILE_PATH", BASE_DIR / "sms.log")
 
 
 # Swager Settings
@@ -0,0 +1,144 @@
+import hashlib
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from carservices.locks import release
+
+DEFAULT_STALE_SECONDS = 30
+DEFAULT_LOCK_SECONDS = 10
+DEFAULT_WAIT_SECONDS = 5
+POLL_INTERVAL_SECONDS = 0.02
+
+
+def bump_stat(key, amount=1):
+    if not amount:
+        return
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+
+
+async def abump_stat(key, amount=1):
+    if not amount:
+        return
+    try:
+        await cache.aincr(key, amount)
+    except ValueError:
+        if not await cache.aadd(key, amount, timeout=None):
+            await cache.aincr(key, amount)
+
+
+def _lock_key(keys):
+    digest = hashlib.sha1("|".join(sorted(keys)).encode()).hexdigest()
+    return f"singleflight:lock:{digest}"
+
+
+def _store(values, timeout, stale_timeout):
+    fresh_until = time.time() + timeout
+    cache.set_many(
+        {key: {"value": value, "fresh_until": fresh_until} for key, value in values.items()},
+        timeout=timeout + stale_timeout,
+    )
+
+
+def _wait_for(keys, wait_timeout):
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL_SECONDS)
+        found = cache.get_many(keys)
+        if len(found) == len(keys):
+            return {key: envelope["value"] for key, envelope in found.items()}
+    return None
+
+
+def get_many_or_compute(
+    keys,
+    compute,
+    timeout,
+    stale_timeout=DEFAULT_STALE_SECONDS,
+    lock_timeout=DEFAULT_LOCK_SECONDS,
+    wait_timeout=DEFAULT_WAIT_SECONDS,
+    stats_prefix=None,
+):
+    """
+    Read ``keys`` from the cache and recompute the missing ones with at most
+    one ``compute(keys)`` call in flight per set of keys across all workers.
+
+    Entries stay fresh for ``timeout`` seconds and are then served stale for
+    up to ``stale_timeout`` more while a single caller refreshes them. The
+    caller holding the lock runs ``compute``; callers with nothing to serve
+    wait for its result, and compute it themselves if ``wait_timeout`` passes
+    (for example when the lock holder died).
+
+    ``compute`` receives the list of keys to build and returns ``{key: value}``.
+    """
+    keys = list(keys)
+    envelopes = cache.get_many(keys)
+    now = time.time()
+
+    values = {}
+    stale = []
+    missing = []
+    for key in keys:
+        envelope = envelopes.get(key)
+        if envelope is None:
+            missing.append(key)
+            continue
+        values[key] = envelope["value"]
+        if envelope["fresh_until"] <= now:
+            stale.append(key)
+
+    if stats_prefix:
+        bump_stat(f"{stats_prefix}:hits", len(keys) - len(missing))
+        bump_stat(f"{stats_prefix}:misses", len(missing))
+
+    todo = missing + stale
+    if not todo:
+        return values
+
+    lock_key = _lock_key(todo)
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, timeout=lock_timeout):
+        try:
+            computed = compute(todo)
+            _store(computed, timeout, stale_timeout)
+        finally:
+            release(lock_key, token)
+        values.update(computed)
+        return values
+
+    if not missing:
+        return values
+
+    waited = _wait_for(missing, wait_timeout)
+    if waited is None:
+        waited = compute(missing)
+        _store(waited, timeout, stale_timeout)
+    values.update(waited)
+    return values
+
+
+async def aget_many_or_compute(keys, compute, timeout, **kwargs):
+    """
+    Async form of :func:`get_many_or_compute`. When every key is cached and
+    fresh the values come from one async cache read; otherwise the sync
+    version runs in a worker thread, as ``compute`` usually hits the database.
+    """
+    keys = list(keys)
+    envelopes = await cache.aget_many(keys)
+    now = time.time()
+    if len(envelopes) == len(keys) and all(envelope["fresh_until"] > now for envelope in envelopes.values()):
+        if kwargs.get("stats_prefix"):
+            await abump_stat(f"{kwargs['stats_prefix']}:hits", len(keys))
+        return {key: envelope["value"] for key, envelope in envelopes.items()}
+    return await sync_to_async(get_many_or_compute)(keys, compute, timeout, **kwargs)
+
+
+def get_or_compute(key, compute, timeout, **kwargs):
+    """Single-key form of :func:`get_many_or_compute`; ``compute`` takes no arguments."""
+    return get_many_or_compute([key], lambda keys: {key: compute()}, timeout, **kwargs)[key]
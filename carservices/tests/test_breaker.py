@@ -0,0 +1,86 @@
+import pytest
+from django.core.cache import cache
+
+from carservices.breaker import CircuitBreaker, CircuitOpen
+
+
+class Rejected(Exception):
+    pass
+
+
+def fail():
+    raise RuntimeError("down")
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RuntimeError):
+            breaker.call(fail)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=3)
+        trip(breaker)
+
+        calls = []
+        with pytest.raises(CircuitOpen):
+            breaker.call(calls.append, 1)
+        assert calls == []
+
+    def test_success_resets_the_count(self):
+        breaker = CircuitBreaker("test", failure_threshold=3)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                breaker.call(fail)
+        assert breaker.call(lambda: "ok") == "ok"
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                breaker.call(fail)
+
+        assert breaker.allow()
+
+    def test_slow_calls_count_as_failures(self, monkeypatch):
+        ticks = iter(range(0, 100, 10))
+        monkeypatch.setattr("carservices.breaker.time.monotonic", lambda: next(ticks))
+        breaker = CircuitBreaker("test", failure_threshold=2, latency_threshold=5)
+
+        assert breaker.call(lambda: "slow") == "slow"
+        assert breaker.call(lambda: "slow") == "slow"
+        assert not breaker.allow()
+
+    def test_healthy_errors_do_not_trip(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, healthy_errors=(Rejected,))
+
+        def reject():
+            raise Rejected()
+
+        with pytest.raises(Rejected):
+            breaker.call(reject)
+        assert breaker.allow()
+
+    def test_state_is_shared_by_name(self):
+        trip(CircuitBreaker("test", failure_threshold=2))
+
+        assert not CircuitBreaker("test", failure_threshold=2).allow()
+        assert CircuitBreaker("other", failure_threshold=2).allow()
+
+    def test_one_trial_call_after_the_open_period(self):
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        trip(breaker)
+        cache.delete("breaker:test:open") # the open period expired
+
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.allow() and breaker.allow()
+
+    def test_failed_trial_opens_again(self):
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        trip(breaker)
+        cache.delete("breaker:test:open")
+
+        with pytest.raises(RuntimeError):
+            breaker.call(fail)
+        with pytest.raises(CircuitOpen):
+            breaker.call(lambda: "ok")
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+import redis.asyncio
+from asgiref.sync import async_to_sync
+
+from carservices.broker import CHANNEL_PREFIX, Broker, MemoryBroker, RedisBroker
+
+
+class TestMemoryBroker:
+    def test_fans_out_to_every_subscriber_of_the_channel(self):
+        broker = MemoryBroker()
+
+        async def scenario():
+            async with broker.subscribe("a") as first, broker.subscribe("a") as second, \
+                    broker.subscribe("b") as other:
+                broker.publish("a", {"n": 1})
+                return await first.get(timeout=1), await second.get(timeout=1), await other.get(timeout=0.05)
+
+        assert async_to_sync(scenario)() == ({"n": 1}, {"n": 1}, None)
+
+    def test_publish_from_another_thread(self):
+        broker = MemoryBroker()
+
+        async def scenario():
+            async with broker.subscribe("a") as subscription:
+                thread = threading.Thread(target=broker.publish, args=("a", {"from": "thread"}))
+                thread.start()
+                thread.join()
+                return await subscription.get(timeout=1)
+
+        assert async_to_sync(scenario)() == {"from": "thread"}
+
+    def test_unsubscribes_on_exit(self):
+        broker = MemoryBroker()
+
+        async def scenario():
+            async with broker.subscribe("a"):
+                pass
+
+        async_to_sync(scenario)()
+        broker.publish("a", {"n": 1})
+        assert broker._subscriptions == {}
+
+
+class FakePubSub:
+    """Redis pub/sub that confirms the pattern subscription only after a delay."""
+
+    def __init__(self):
+        self.confirmed = False
+        self.messages = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def psubscribe(self, pattern):
+        self.pattern = pattern
+
+    async def get_message(self, timeout=None):
+        await asyncio.sleep(0.05)
+        self.confirmed = True
+        return {"type": "psubscribe", "pattern": None, "channel": self.pattern.encode(), "data": 1}
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.pubsub_ = FakePubSub()
+
+    def pubsub(self):
+        return self.pubsub_
+
+    async def aclose(self):
+        pass
+
+
+class TestRedisBroker:
+    def test_broker_is_abstract(self):
+        with pytest.raises(TypeError):
+            Broker()
+
+    def test_publish_logs_an_outage_instead_of_raising(self, caplog):
+        broker = RedisBroker("redis://127.0.0.1:1/0")
+
+        with caplog.at_level(logging.WARNING, logger="carservices.broker"):
+            broker.publish("a", {"n": 1})
+
+        assert "Could not publish to a" in caplog.text
+
+    def test_subscribe_returns_once_redis_confirmed(self, monkeypatch):
+        client = FakeRedis()
+        monkeypatch.setattr(redis.asyncio.Redis, "from_url", lambda *args, **kwargs: client)
+        broker = RedisBroker("redis://fake")
+
+        async def scenario():
+            async with broker.subscribe("a") as subscription:
+                confirmed = client.pubsub_.confirmed
+                client.pubsub_.messages.put_nowait(
+                    {"type": "pmessage", "channel": (CHANNEL_PREFIX + "a").encode(), "data": json.dumps({"n": 1})},
+                )
+                message = await subscription.get(timeout=1)
+            for task, _ in broker._listeners.values():
+                task.cancel()
+            return confirmed, message
+
+        assert async_to_sync(scenario)() == (True, {"n": 1})
@@ -0,0 +1,46 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from carservices import locks
+from carservices.locks import LockTimeout, cache_lock, cache_locks
+
+
+class TestCacheLock:
+    def test_lock_is_released_after_block(self):
+        with cache_lock("lock:a"):
+            assert cache.get("lock:a") is not None
+        assert cache.get("lock:a") is None
+
+    def test_busy_lock_times_out(self):
+        cache.add("lock:b", "someone-else", timeout=10)
+
+        with pytest.raises(LockTimeout):
+            with cache_lock("lock:b", wait=0.05):
+                pass
+        assert cache.get("lock:b") == "someone-else"
+
+    def test_many_locks_are_all_held_and_released(self):
+        with cache_locks(["lock:d", "lock:c", "lock:d"]):
+            assert cache.get("lock:c") is not None
+            assert cache.get("lock:d") is not None
+        assert cache.get_many(["lock:c", "lock:d"]) == {}
+
+    def test_expired_lock_taken_by_another_worker_is_kept(self):
+        with cache_lock("lock:e", timeout=10):
+            # our lock expired and another worker took it
+            cache.set("lock:e", "someone-else", timeout=10)
+        assert cache.get("lock:e") == "someone-else"
+
+    def test_redis_release_is_a_single_compare_and_delete(self):
+        redis = mock.Mock()
+        client = mock.Mock(make_key=lambda key: f":1:{key}", encode=lambda value: value.encode())
+        client.get_client.return_value = redis
+
+        with mock.patch.object(locks, "cache", mock.Mock(client=client)):
+            locks.release("lock:f", "token")
+
+        redis.eval.assert_called_once_with(locks.RELEASE_SCRIPT, 1, ":1:lock:f", b"token")
+        redis.get.assert_not_called()
+        redis.delete.assert_not_called()
@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import Booking
+from booking.tests.test import auth_client, make_car, make_category, make_user
+from cars.models import Car
+from services.models import Service
+
+pytestmark = pytest.mark.django_db
+
+START = timezone.now().replace(microsecond=123456) + timezone.timedelta(days=1)
+
+
+@pytest.fixture
+def owner():
+    return make_user()
+
+
+@pytest.fixture
+def client(api_client, owner):
+    return auth_client(api_client, owner)
+
+
+@pytest.fixture
+def car(owner):
+    return make_car(owner, make_category())
+
+
+def walk(client, url):
+    pages = []
+    while url:
+        res = client.get(url)
+        assert res.status_code == 200
+        pages.append([item["id"] for item in res.json()["results"]])
+        url = res.json()["next"]
+    return pages
+
+
+class TestBookingPagination:
+    def test_walks_every_booking_once_in_order(self, client, owner, car):
+        service = Service.objects.create(title="Wash", service_type=Service.Type.Detailing, is_active=True)
+        # several bookings share a start_at so the id tie-break matters
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                user=owner, car=car, service=service,
+                start_at=START + timezone.timedelta(hours=i // 3),
+                end_at=START + timezone.timedelta(hours=i // 3, minutes=30),
+            )
+            for i in range(25)
+        ])
+
+        pages = walk(client, reverse("book-list") + "?page_size=10")
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        expected = [b.id for b in sorted(bookings, key=lambda b: (b.start_at, b.id))]
+        assert [pk for page in pages for pk in page] == expected
+
+    def test_deep_page_costs_the_same_as_the_first(self, client, owner, car):
+        service = Service.objects.create(title="Wash", service_type=Service.Type.Detailing, is_active=True)
+        Booking.objects.bulk_create([
+            Booking(
+                user=owner, car=car, service=service,
+                start_at=START + timezone.timedelta(hours=i),
+                end_at=START + timezone.timedelta(hours=i, minutes=30),
+            )
+            for i in range(60)
+        ])
+        first = client.get(reverse("book-list") + "?page_size=5").json()
+        url = first["next"]
+        for _ in range(8):
+            url = client.get(url).json()["next"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.get(url)
+
+        assert res.status_code == 200
+        assert len(res.json()["results"]) == 5
+        booking_queries = [q["sql"] for q in ctx.captured_queries if "booking_booking" in q["sql"]]
+        assert len(booking_queries) == 1
+        assert "OFFSET" not in booking_queries[0].upper()
+        assert "LIMIT 6" in booking_queries[0].upper()
+
+    def test_invalid_cursor_returns_404(self, client):
+        res = client.get(reverse("book-list") + "?cursor=not-a-cursor")
+        assert res.status_code == 404
+
+
+class TestCarPagination:
+    def test_cars_without_created_at_are_paginated_too(self, client, owner, car):
+        for i in range(4):
+            make_car(owner, car.category, name=f"Car{i}", pelak=f"2{i}B", vin=f"VIN2{i}")
+        Car.objects.filter(name__in=["Car0", "Car2"]).update(created_at=None)
+
+        pages = walk(client, "/cars/my-car/?page_size=2")
+
+        ids = [pk for page in pages for pk in page]
+        assert sorted(ids) == sorted(Car.objects.filter(owner=owner).values_list("id", flat=True))
+        assert len(ids) == len(set(ids)) == 5
+        legacy = set(Car.objects.filter(created_at__isnull=True).values_list("id", flat=True))
+        assert set(ids[:2]) == legacy
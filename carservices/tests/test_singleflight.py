@@ -0,0 +1,68 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+from carservices import singleflight
+
+
+class TestSingleFlight:
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        barrier = threading.Barrier(25)
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        def worker():
+            barrier.wait()
+            results.append(singleflight.get_or_compute("sf:herd", compute, timeout=60))
+
+        threads = [threading.Thread(target=worker) for _ in range(25)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 25
+
+    def test_stale_value_served_while_another_worker_refreshes(self):
+        singleflight.get_or_compute("sf:stale", lambda: "old", timeout=0, stale_timeout=60)
+        lock_key = singleflight._lock_key(["sf:stale"])
+        cache.add(lock_key, "someone-else", timeout=10)
+
+        value = singleflight.get_or_compute("sf:stale", lambda: "new", timeout=60)
+
+        assert value == "old"
+
+    def test_stale_value_is_refreshed_by_lock_holder(self):
+        singleflight.get_or_compute("sf:refresh", lambda: "old", timeout=0, stale_timeout=60)
+
+        assert singleflight.get_or_compute("sf:refresh", lambda: "new", timeout=60) == "new"
+        assert singleflight.get_or_compute("sf:refresh", lambda: "newer", timeout=60) == "new"
+
+    def test_waiter_computes_itself_when_lock_holder_never_finishes(self):
+        cache.add(singleflight._lock_key(["sf:orphan"]), "dead-worker", timeout=10)
+
+        value = singleflight.get_or_compute("sf:orphan", lambda: "mine", timeout=60, wait_timeout=0.1)
+
+        assert value == "mine"
+
+    def test_many_keys_compute_only_missing(self):
+        singleflight.get_or_compute("sf:a", lambda: 1, timeout=60)
+        seen = []
+
+        def compute(keys):
+            seen.append(sorted(keys))
+            return {key: 2 for key in keys}
+
+        values = singleflight.get_many_or_compute(["sf:a", "sf:b"], compute, timeout=60, stats_prefix="sf:stats")
+
+        assert values == {"sf:a": 1, "sf:b": 2}
+        assert seen == [["sf:b"]]
+        assert cache.get("sf:stats:hits") == 1
+        assert cache.get("sf:stats:misses") == 1
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 from django.test import override_settings
 from rest_framework.test import APIClient
 
@@ -15,5 +16,10 @@ def api_client():
 
 @pytest.fixture(autouse=True)
 def _use_test_cache():
-    with override_settings(CACHES=TEST_CACHES):
+    from booking import schedule
+
+    with override_settings(CACHES=TEST_CACHES, EVENTS_BROKER_URL="memory://"):
+        cache.clear()
+        # test rollbacks change the calendar tables without any signal
+        schedule.forget()
         yield
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from services.models import Service
+from services.models import Service, ServiceBay
 
 
 @admin.register(Service)
@@ -10,8 +10,15 @@ class ServiceAdmin(admin.ModelAdmin):
         "service_type",
         "get_service_type_display",
         "base_duration_minutes",
+        "slot_minutes",
         "is_active",
     )
 
     list_filter = ("service_type", "is_active")
     search_fields = ("title",)
+
+
+@admin.register(ServiceBay)
+class ServiceBayAdmin(admin.ModelAdmin):
+    list_display = ("id", "title", "service_type", "capacity", "is_active")
+    list_filter = ("service_type", "is_active")
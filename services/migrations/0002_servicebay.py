@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceBay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=50)),
+                ('service_type', models.IntegerField(choices=[(1, 'Periodic'), (2, 'Mechanical'), (3, 'Body/Paint'), (4, 'Detailing')])),
+                ('capacity', models.PositiveSmallIntegerField(default=1)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-18 14:40
+
+import django.core.validators
+from django.db import migrations, models
+
+MAX_BOOKING_MINUTES = 540
+
+
+def check_durations(apps, schema_editor):
+    Service = apps.get_model("services", "Service")
+    invalid = list(
+        Service.objects.exclude(base_duration_minutes__gte=1, base_duration_minutes__lte=MAX_BOOKING_MINUTES)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    if invalid:
+        raise RuntimeError(
+            f"Services {invalid} last outside 1..{MAX_BOOKING_MINUTES} minutes and could never be booked; "
+            "fix their base_duration_minutes before migrating."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_servicebay'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_durations, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='service',
+            name='base_duration_minutes',
+            field=models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(540)]),
+        ),
+        migrations.AddConstraint(
+            model_name='service',
+            constraint=models.CheckConstraint(condition=models.Q(('base_duration_minutes__gte', 1), ('base_duration_minutes__lte', 540)), name='service_duration_bookable'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 15:50
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_service_duration_bookable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='slot_minutes',
+            field=models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(540)]),
+        ),
+    ]
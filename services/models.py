@@ -1,6 +1,10 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
+from booking.defaults import MAX_BOOKING_MINUTES, SLOT_MINUTES
+
 
 class Service(models.Model):
     class Type(models.IntegerChoices):
@@ -12,9 +16,33 @@ class Service(models.Model):
 
     title = models.CharField(max_length=50)
     is_active = models.BooleanField(default=True)
-    base_duration_minutes = models.PositiveSmallIntegerField(default=30)
+    # a longer service could never be booked
+    base_duration_minutes = models.PositiveSmallIntegerField(
+        default=30, validators=[MinValueValidator(1), MaxValueValidator(MAX_BOOKING_MINUTES)],
+    )
     service_type = models.IntegerField(choices=Type.choices)
+    # length of one slot in this service's availability grid
+    slot_minutes = models.PositiveSmallIntegerField(
+        default=SLOT_MINUTES, validators=[MinValueValidator(5), MaxValueValidator(MAX_BOOKING_MINUTES)],
+    )
     description = models.TextField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(base_duration_minutes__gte=1, base_duration_minutes__lte=MAX_BOOKING_MINUTES),
+                name="service_duration_bookable",
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class ServiceBay(models.Model):
+    title = models.CharField(max_length=50)
+    service_type = models.IntegerField(choices=Service.Type.choices)
+    capacity = models.PositiveSmallIntegerField(default=1)
+    is_active = models.BooleanField(default=True)
+
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.title} ({self.get_service_type_display()})"
@@ -14,4 +14,5 @@ class ServiceSerializer(serializers.ModelSerializer):
             "service_type_display",
             "description",
             "base_duration_minutes",
+            "slot_minutes",
         )
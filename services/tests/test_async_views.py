@@ -0,0 +1,20 @@
+import pytest
+from django.urls import reverse
+
+from services.models import Service
+from services.tests.test import extract_items
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAsyncServiceList:
+    def test_async_list_matches_sync_list(self, api_client):
+        Service.objects.create(title="Periodic", service_type=Service.Type.Periodic, is_active=True)
+        Service.objects.create(title="Wash", service_type=Service.Type.Detailing, is_active=True)
+        Service.objects.create(title="Old", service_type=Service.Type.Body, is_active=False)
+
+        res = api_client.get(reverse("async-service-list"))
+
+        assert res.status_code == 200
+        assert res.json() == extract_items(api_client.get(reverse("service-list")).json())
+        assert len(res.json()) == 2
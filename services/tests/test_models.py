@@ -0,0 +1,20 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+
+from booking.defaults import MAX_BOOKING_MINUTES
+from services.models import Service
+
+pytestmark = pytest.mark.django_db
+
+
+class TestServiceModel:
+    def test_duration_longer_than_a_booking_is_invalid(self):
+        service = Service(
+            title="Overhaul", service_type=Service.Type.Mechanical, base_duration_minutes=MAX_BOOKING_MINUTES + 1,
+        )
+
+        with pytest.raises(ValidationError):
+            service.full_clean()
+        with pytest.raises(IntegrityError):
+            service.save()
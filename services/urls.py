@@ -1,7 +1,10 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from services.views import ServiceViewSet
+from services.views import ServiceViewSet, service_list_async
 
 router = DefaultRouter()
 router.register("services", ServiceViewSet, basename="service")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("async/services/", service_list_async, name="async-service-list"),
+] + router.urls
@@ -1,3 +1,5 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.permissions import AllowAny
 
@@ -9,3 +11,10 @@ class ServiceViewSet(ReadOnlyModelViewSet):
     queryset = Service.objects.filter(is_active=True)
     serializer_class = ServiceSerializer
     permission_classes = [AllowAny]
+
+
+@require_GET
+async def service_list_async(request):
+    """Async twin of ``ServiceViewSet.list``, reading with the async ORM."""
+    services = [service async for service in Service.objects.filter(is_active=True)]
+    return JsonResponse(ServiceSerializer(services, many=True).data, safe=False)
@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from carservices.breaker import CircuitBreaker, CircuitOpen
+
+LOGIN_OTP = "login_otp"
+REMINDER = "reminder"
+
+BREAKER_FAILURES = 5 # consecutive provider errors that open the circuit
+BREAKER_LATENCY_SECONDS = 5 # a provider call slower than this counts as an error
+BREAKER_OPEN_SECONDS = 30 # how long an open circuit fails fast before one trial call
+
+outbox = [] # messages "sent" by MemoryBackend, like django.core.mail.outbox
+
+
+class SMSRejected(ValidationError):
+    """The provider answered and refused the message, e.g. an invalid recipient."""
+
+
+class SMSUnavailable(ValidationError):
+    """Nothing was sent: the circuit is open and there is no fallback backend."""
+
+
+class BaseBackend(ABC):
+    """
+    An SMS provider. ``pattern`` is a logical template name (LOGIN_OTP,
+    REMINDER) that each backend maps to its own template; ``params`` fill it.
+    """
+
+    MAX_RECIPIENTS_PER_REQUEST = 100
+
+    @abstractmethod
+    def send_pattern(self, pattern, recipients, params):
+        """Send ``pattern`` filled with ``params`` to every number in ``recipients``."""
+
+
+class MemoryBackend(BaseBackend):
+    """Keeps messages in ``outbox`` for tests."""
+
+    def send_pattern(self, pattern, recipients, params):
+        outbox.append({"pattern": pattern, "recipients": list(recipients), "params": dict(params)})
+        return {"status": "ok"}
+
+
+_write_lock = threading.Lock()
+
+
+def _json_line(pattern, recipients, params):
+    return json.dumps({
+        "sent_at": timezone.now().isoformat(),
+        "pattern": pattern,
+        "recipients": list(recipients),
+        "params": dict(params),
+    }, ensure_ascii=False) + "\n"
+
+
+class FileBackend(BaseBackend):
+    """Appends one JSON line per message to ``settings.SMS_FILE_PATH``, for local runs."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.SMS_FILE_PATH
+
+    def send_pattern(self, pattern, recipients, params):
+        with _write_lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(_json_line(pattern, recipients, params))
+        return {"status": "ok"}
+
+
+class ConsoleBackend(BaseBackend):
+    """Prints one JSON line per message to stdout."""
+
+    def send_pattern(self, pattern, recipients, params):
+        with _write_lock:
+            sys.stdout.write(_json_line(pattern, recipients, params))
+            sys.stdout.flush()
+        return {"status": "ok"}
+
+
+class FailoverBackend(BaseBackend):
+    """
+    Sends through ``primary`` behind a cache-shared CircuitBreaker. While the
+    circuit is open every send fails fast: it goes to ``secondary`` when one
+    is configured and raises SMSUnavailable otherwise, so tasks never queue
+    up behind a provider that is down or crawling.
+    """
+
+    def __init__(self, primary, secondary=None, breaker=None):
+        self.primary = primary
+        self.secondary = secondary
+        self.breaker = breaker or CircuitBreaker(
+            f"sms:{type(primary).__name__}",
+            failure_threshold=BREAKER_FAILURES,
+            latency_threshold=BREAKER_LATENCY_SECONDS,
+            open_seconds=BREAKER_OPEN_SECONDS,
+            healthy_errors=(SMSRejected,),
+        )
+        self.MAX_RECIPIENTS_PER_REQUEST = min(
+            backend.MAX_RECIPIENTS_PER_REQUEST for backend in (primary, secondary) if backend is not None
+        )
+
+    def send_pattern(self, pattern, recipients, params):
+        try:
+            return self.breaker.call(self.primary.send_pattern, pattern, recipients, params)
+        except CircuitOpen:
+            if self.secondary is None:
+                raise SMSUnavailable(f"SMS provider {type(self.primary).__name__} is unavailable.")
+        return self.secondary.send_pattern(pattern, recipients, params)
+
+
+def build_backend():
+    primary = import_string(settings.SMS_BACKEND)()
+    secondary = import_string(settings.SMS_FALLBACK_BACKEND)() if settings.SMS_FALLBACK_BACKEND else None
+    return FailoverBackend(primary, secondary)
+
+
+_backends = {}
+
+
+def get_sms_backend():
+    """
+    The SMS backend of this process (``settings.SMS_BACKEND``, failing over
+    to ``settings.SMS_FALLBACK_BACKEND``), built on first use so every worker
+    process keeps its own connection pool instead of sharing sockets across
+    a fork.
+    """
+    pid = os.getpid()
+    if pid not in _backends:
+        _backends.clear()
+        _backends[pid] = build_backend()
+    return _backends[pid]
@@ -1,17 +1,51 @@
 import requests
 import os
 from django.core.exceptions import ValidationError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from third_parties.sms.backends import LOGIN_OTP, REMINDER, BaseBackend, SMSRejected
 
-class SMSHandler:
+CONNECT_TIMEOUT_SECONDS = 3.05 # TCP/TLS setup with the provider
+READ_TIMEOUT_SECONDS = 10 # waiting for the provider's response
+MAX_RETRIES = 3 # on connection errors and 5xx answers; a read timeout is never retried, the message may be out
+RETRY_BACKOFF_SECONDS = 0.5 # doubled after every retry
+RETRY_STATUSES = (500, 502, 503, 504)
+POOL_CONNECTIONS = 10 # keep-alive connections kept per process
+
+
+def build_session():
+    """A keep-alive session whose adapter retries connection errors and 5xx answers with backoff."""
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=False,
+        status=MAX_RETRIES,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,
+        backoff_factor=RETRY_BACKOFF_SECONDS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=POOL_CONNECTIONS)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class SMSHandler(BaseBackend):
     BASE_URL = "https://edge.ippanel.com/v1"
+    MAX_RECIPIENTS_PER_REQUEST = 100 # provider limit for one pattern send
     
     def __init__(self):
         self.api_key = os.getenv("FARAZ_SMS_API_KEY", None)
         self.sender_number = os.getenv("FARAZ_SMS_SENDER_NUMBER", None)
         self.login_otp_pattern_code = os.getenv("FARAZ_SMS_LOGIN_OTP_PATTERN_CODE", None)
+        self.reminder_pattern_code = os.getenv("FARAZ_SMS_REMINDER_PATTERN_CODE", None)
         self.phone_book_id = os.getenv("FARAZ_SMS_PHONE_BOOK_ID", None)
-        self.validate_env_config() 
+        self.validate_env_config()
+        self.pattern_codes = {LOGIN_OTP: self.login_otp_pattern_code, REMINDER: self.reminder_pattern_code}
+        self.session = build_session()
             
     def validate_env_config(self):
         required_fields = ("api_key", "sender_number", "login_otp_pattern_code", "phone_book_id")
@@ -26,16 +60,25 @@ class SMSHandler:
         }
         
     def send_request(self, method, url, headers, body):
-        response = requests.request(
-            url=url,
-            method=method,
-            headers=headers,
-            json=body,
-        )
+        try:
+            response = self.session.request(
+                url=url,
+                method=method,
+                headers=headers,
+                json=body,
+                timeout=(CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS),
+            )
+        except requests.ReadTimeout:
+            # the provider may have accepted the message; not a rejection
+            raise
+        except requests.RequestException as exc:
+            raise ValidationError(f"Failed to send request to faraz sms: {exc}")
         if not (200 <= response.status_code <300):
-            raise ValidationError(
+            # a 4xx is the provider refusing this message, not the provider failing
+            error = SMSRejected if response.status_code < 500 else ValidationError
+            raise error(
                 f"Failed to send request to faraz sms, status: {response.status_code},"
-                f"body: {response.json()}"
+                f"body: {response.text}"
             )
             
         return response.json()
@@ -65,4 +108,30 @@ class SMSHandler:
             headers=headers,
             body=body,
         )
-        
\ No newline at end of file
+
+    def send_pattern_to_many(self, pattern_code, recipient_phone_numbers, params):
+        """
+        Send one pattern message with the same ``params`` to every recipient,
+        in as few requests as the provider's recipient limit allows.
+        """
+        url = f"{self.BASE_URL}/api/send"
+        headers = self.get_headers()
+        responses = []
+        for i in range(0, len(recipient_phone_numbers), self.MAX_RECIPIENTS_PER_REQUEST):
+            body = {
+                "sending_type": "pattern",
+                "from_number": self.sender_number,
+                "code": pattern_code,
+                "recipients": recipient_phone_numbers[i:i + self.MAX_RECIPIENTS_PER_REQUEST],
+                "params": params,
+            }
+            responses.append(self.send_request(method="POST", url=url, headers=headers, body=body))
+        return responses
+
+    def send_pattern(self, pattern, recipients, params):
+        code = self.pattern_codes.get(pattern)
+        if code is None:
+            raise ValidationError(f"Faraz sms has no pattern code for {pattern}.")
+        if pattern == LOGIN_OTP and len(recipients) == 1:
+            return self.send_sms_with_pattern(recipients[0], params["verification-code"])
+        return self.send_pattern_to_many(code, recipients, params)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from users.models import User, Role
+from users.models import User, Role, SmsOutbox
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -63,4 +63,12 @@ class UserAdmin(BaseUserAdmin):
 
 @admin.register(Role)
 class RoleAdmin(admin.ModelAdmin):
-    list_display = ("id", "name",)
\ No newline at end of file
+    list_display = ("id", "name",)
+
+
+@admin.register(SmsOutbox)
+class SmsOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "phone_number", "pattern", "status", "attempts", "latency_ms", "created_at", "sent_at")
+    list_filter = ("status", "pattern", "created_at")
+    search_fields = ("phone_number",)
+    readonly_fields = ("created_at", "claimed_at", "sent_at", "latency_ms", "attempts", "last_error")
@@ -1,7 +1,9 @@
 import logging
 
+from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 
 from users import defaults
 
@@ -15,3 +17,28 @@ class CookieJWTAuthentication(JWTAuthentication):
             return self.get_user(validated_token), validated_token
         except (TokenError, InvalidToken):
             return None
+
+
+def token_user_id(request):
+    """
+    User id from a valid access token cookie, or ``None``. Does not touch the
+    database, so it cannot tell a deactivated or deleted user; async views
+    use atoken_user_id.
+    """
+    raw_token = request.COOKIES.get(defaults.ACCESS_TOKEN_COOKIE_KEY_NAME, None)
+    try:
+        validated_token = CookieJWTAuthentication().get_validated_token(raw_token)
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except (TokenError, InvalidToken, KeyError):
+        return None
+
+
+async def atoken_user_id(request):
+    """
+    token_user_id for async views that, like CookieJWTAuthentication, also
+    turns away users that were deactivated or deleted: one ``exists`` query.
+    """
+    user_id = token_user_id(request)
+    if user_id is None or not await get_user_model().objects.filter(pk=user_id, is_active=True).aexists():
+        return None
+    return user_id
@@ -2,4 +2,11 @@ ACCESS_TOKEN_COOKIE_KEY_NAME = 'accessToken'
 REFRESH_TOKEN_COOKIE_KEY_NAME = 'refreshToken'
 ACCESS_TOKEN_LIFETIME = 3 * 24 * 60 * 60  # in seconds
 REFRESH_TOKEN_LIFETIME = 7 # in days
-OTP_EXPIRY_SECONDS = 120 # OTP Expiry time in seconds (2 minutes)
\ No newline at end of file
+OTP_EXPIRY_SECONDS = 120 # OTP Expiry time in seconds (2 minutes)
+OUTBOX_BATCH_SIZE = 100 # outbox rows claimed per dispatcher transaction
+OUTBOX_MAX_BATCHES = 50 # per dispatcher run; the next run picks up the rest
+OUTBOX_SEND_WORKERS = 8 # provider calls in flight per dispatcher
+OUTBOX_MAX_ATTEMPTS = 3 # sends tried while the provider is failing before a row is marked failed
+OUTBOX_LEASE_SECONDS = 300 # a row SENDING longer than this was left by a dead dispatcher and is claimed again
+OUTBOX_LINGER_SECONDS = 0.02 # a kicked dispatcher starts this late, so a burst of messages is claimed by one run
+OUTBOX_KICK_SECONDS = 10 # longest a kick blocks further kicks, should its dispatcher never start
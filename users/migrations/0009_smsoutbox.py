@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_remove_user_car'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=32)),
+                ('pattern', models.CharField(max_length=32)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'Sending'), (3, 'Sent'), (4, 'Failed')], default=1)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('latency_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 1)), fields=['created_at', 'id'], name='smsoutbox_pending_idx'), models.Index(fields=['phone_number', 'created_at'], name='users_smsou_phone_n_83563c_idx')],
+            },
+        ),
+    ]
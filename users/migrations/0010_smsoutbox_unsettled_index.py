@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_smsoutbox'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='smsoutbox',
+            name='smsoutbox_pending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='smsoutbox',
+            index=models.Index(condition=models.Q(('status__in', [1, 2])), fields=['created_at', 'id'], name='smsoutbox_unsettled_idx'),
+        ),
+    ]
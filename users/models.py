@@ -67,4 +67,46 @@ class User(AbstractUser):
         return f"{self.first_name} {self.last_name}"
 
     def __str__(self) -> str:
-        return f"{self.first_name} {self.last_name} ({self.phone_number})"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name} ({self.phone_number})"
+
+
+class SmsStatus(models.IntegerChoices):
+    PENDING = 1, _("Pending")
+    SENDING = 2, _("Sending")
+    SENT = 3, _("Sent")
+    FAILED = 4, _("Failed")
+
+
+class SmsOutbox(models.Model):
+    """
+    An SMS written in the same transaction as the request that caused it and
+    delivered later by the outbox dispatcher; rows stay as delivery history.
+    """
+
+    Status = SmsStatus # module level so the index condition in Meta can name it
+
+    phone_number = models.CharField(max_length=32)
+    pattern = models.CharField(max_length=32)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.PositiveSmallIntegerField(choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the dispatcher's claim query, lease reclaims included; settled rows leave the index
+            models.Index(
+                fields=["created_at", "id"],
+                name="smsoutbox_unsettled_idx",
+                condition=models.Q(status__in=[SmsStatus.PENDING, SmsStatus.SENDING]),
+            ),
+            models.Index(fields=["phone_number", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"SmsOutbox#{self.id} {self.pattern} -> {self.phone_number} ({self.get_status_display()})"
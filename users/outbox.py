@@ -0,0 +1,189 @@
+import json
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from carservices.db import write_transaction
+from third_parties.sms.backends import LOGIN_OTP, SMSRejected, SMSUnavailable, get_sms_backend
+from users.defaults import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_KICK_SECONDS,
+    OUTBOX_LEASE_SECONDS,
+    OUTBOX_LINGER_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_MAX_BATCHES,
+    OUTBOX_SEND_WORKERS,
+)
+from users.models import SmsOutbox
+
+logger = logging.getLogger(__name__)
+
+SCRUBBED_PATTERNS = {LOGIN_OTP} # params dropped once a row is settled, so codes never sit in the history
+KICK_CACHE_KEY = "sms-outbox:kick"
+
+
+def enqueue(phone_number, pattern, params, expires_at=None):
+    """
+    Write an SMS to the outbox and kick a dispatcher once the surrounding
+    transaction commits. A lost kick only delays the message until the
+    periodic dispatcher run.
+    """
+    message = SmsOutbox.objects.create(
+        phone_number=str(phone_number), pattern=pattern, params=params, expires_at=expires_at,
+    )
+    transaction.on_commit(kick, robust=True)
+    return message
+
+
+def kick():
+    """
+    Start a dispatcher OUTBOX_LINGER_SECONDS from now unless one is already
+    waiting to start. Messages enqueued meanwhile ride along, so a login
+    burst is claimed in a few batches by one run instead of one run per
+    message, and rows with equal params share a provider call.
+    """
+    from users.tasks import dispatch_sms_outbox
+
+    if cache.add(KICK_CACHE_KEY, True, timeout=OUTBOX_KICK_SECONDS):
+        try:
+            dispatch_sms_outbox.apply_async(countdown=OUTBOX_LINGER_SECONDS)
+        except Exception:
+            cache.delete(KICK_CACHE_KEY)
+            raise
+
+
+def _fail(row, reason):
+    row.status = SmsOutbox.Status.FAILED
+    row.last_error = reason
+    if row.pattern in SCRUBBED_PATTERNS:
+        row.params = {}
+
+
+def claim(batch_size, run_started_at):
+    """
+    Lock up to ``batch_size`` pending rows, skipping rows other dispatchers
+    hold, and mark them SENDING. Rows this run already tried and put back
+    are left for the next run. Rows still SENDING after the lease belong to
+    a dispatcher that died mid-send: they are claimed again as another
+    attempt, or failed when they have none left.
+    """
+    now = timezone.now()
+    lease_expired = now - timezone.timedelta(seconds=OUTBOX_LEASE_SECONDS)
+    with write_transaction():
+        rows = list(
+            SmsOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=SmsOutbox.Status.PENDING) & (Q(claimed_at__isnull=True) | Q(claimed_at__lt=run_started_at))
+                | Q(status=SmsOutbox.Status.SENDING, claimed_at__lt=lease_expired)
+            )
+            .order_by("created_at", "id")[:batch_size]
+        )
+        for row in rows:
+            row.claimed_at = now
+            if row.attempts < OUTBOX_MAX_ATTEMPTS:
+                row.status = SmsOutbox.Status.SENDING
+                row.attempts += 1
+            else:
+                _fail(row, "the dispatcher stopped before its last attempt was settled")
+        SmsOutbox.objects.bulk_update(rows, ["status", "claimed_at", "attempts", "params", "last_error"])
+    return rows
+
+
+def _send_group(backend, pattern, params, rows):
+    started = time.monotonic()
+    try:
+        backend.send_pattern(pattern, [row.phone_number for row in rows], params)
+        error = None
+    except Exception as exc:
+        error = exc
+    return rows, error, round((time.monotonic() - started) * 1000)
+
+
+def _settle(row, error, latency_ms, now):
+    row.latency_ms = latency_ms
+    if error is None:
+        row.status = SmsOutbox.Status.SENT
+        row.sent_at = now
+        row.last_error = ""
+    elif isinstance(error, SMSUnavailable):
+        # the circuit is open and nothing was sent, so the attempt is not spent
+        row.status = SmsOutbox.Status.PENDING
+        row.attempts -= 1
+        row.last_error = str(error)
+    else:
+        # a provider failure is retried; a rejection or a read timeout (the
+        # message may be out) is final
+        retry = isinstance(error, ValidationError) and not isinstance(error, SMSRejected)
+        row.status = (
+            SmsOutbox.Status.PENDING if retry and row.attempts < OUTBOX_MAX_ATTEMPTS else SmsOutbox.Status.FAILED
+        )
+        row.last_error = str(error)
+    if row.status != SmsOutbox.Status.PENDING and row.pattern in SCRUBBED_PATTERNS:
+        row.params = {}
+
+
+def send_batch(backend, rows, executor):
+    """
+    Send claimed ``rows``: rows with equal pattern and params share one
+    provider call, and the calls run on ``executor``. Returns the count of
+    each resulting status.
+    """
+    now = timezone.now()
+    groups = {}
+    for row in rows:
+        if row.status == SmsOutbox.Status.FAILED:
+            continue
+        if row.expires_at is not None and row.expires_at <= now:
+            _fail(row, "expired before it could be sent")
+            continue
+        groups.setdefault((row.pattern, json.dumps(row.params, sort_keys=True)), []).append(row)
+
+    futures = [
+        executor.submit(_send_group, backend, pattern, json.loads(params), group[i:i + backend.MAX_RECIPIENTS_PER_REQUEST])
+        for (pattern, params), group in groups.items()
+        for i in range(0, len(group), backend.MAX_RECIPIENTS_PER_REQUEST)
+    ]
+    for future in futures:
+        group, error, latency_ms = future.result()
+        for row in group:
+            _settle(row, error, latency_ms, timezone.now())
+
+    SmsOutbox.objects.bulk_update(rows, ["status", "attempts", "params", "last_error", "latency_ms", "sent_at"])
+    return Counter(SmsOutbox.Status(row.status).name.lower() for row in rows)
+
+
+def dispatch(batch_size=OUTBOX_BATCH_SIZE, max_batches=OUTBOX_MAX_BATCHES):
+    """
+    Claim and send pending outbox rows batch by batch until none are left or
+    ``max_batches`` ran. Any number of dispatchers can run at once.
+    """
+    # messages enqueued from here on kick the next run
+    cache.delete(KICK_CACHE_KEY)
+    started = time.monotonic()
+    run_started_at = timezone.now()
+    backend = get_sms_backend()
+    totals = Counter()
+    batches = 0
+    with ThreadPoolExecutor(max_workers=OUTBOX_SEND_WORKERS, thread_name_prefix="sms-outbox") as executor:
+        while batches < max_batches:
+            rows = claim(batch_size, run_started_at)
+            if not rows:
+                break
+            batches += 1
+            totals.update(send_batch(backend, rows, executor))
+
+    return {
+        "sent": totals["sent"],
+        "failed": totals["failed"],
+        "retried": totals["pending"],
+        "batches": batches,
+        "exhausted": batches >= max_batches,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
@@ -1,16 +1,27 @@
 from celery import shared_task
 import logging
-from third_parties.sms.faraz_sms import SMSHandler
+from third_parties.sms.backends import LOGIN_OTP, get_sms_backend
+from users import outbox
 
 logger = logging.getLogger(__name__)
 
+OTP_PARAM = "verification-code"
+
+
 @shared_task
 def send_otp_sms(phone_number, otp_code):
+    """
+    OTP requests now go through the SMS outbox; this drains tasks queued
+    before that.
+    """
     try:
-        sms_hanler = SMSHandler()
-        sms_hanler.send_sms_with_pattern(
-            recipient_phone_number=phone_number, 
-            otp_code=otp_code
-        )
+        get_sms_backend().send_pattern(LOGIN_OTP, [phone_number], {OTP_PARAM: otp_code})
     except Exception as e:
-        logger.error(f"Failed to send SMS: {e}")
\ No newline at end of file
+        logger.error(f"Failed to send SMS: {e}")
+
+
+@shared_task
+def dispatch_sms_outbox():
+    metrics = outbox.dispatch()
+    logger.info("SMS outbox: %s", metrics)
+    return metrics
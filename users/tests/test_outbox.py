@@ -0,0 +1,164 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from third_parties.sms import backends
+from users import outbox, tasks
+from users.defaults import OUTBOX_LEASE_SECONDS, OUTBOX_LINGER_SECONDS, OUTBOX_MAX_ATTEMPTS
+from users.models import SmsOutbox
+
+pytestmark = pytest.mark.django_db
+
+
+class ScriptedBackend(backends.BaseBackend):
+    """Answers each call with the next scripted error, or succeeds once the script runs out."""
+
+    MAX_RECIPIENTS_PER_REQUEST = 2
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    def send_pattern(self, pattern, recipients, params):
+        self.calls.append((pattern, recipients, params))
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"status": "ok"}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = ScriptedBackend()
+    monkeypatch.setattr(outbox, "get_sms_backend", lambda: backend)
+    backend.kicks = []
+    monkeypatch.setattr(tasks.dispatch_sms_outbox, "apply_async", lambda **kwargs: backend.kicks.append(kwargs))
+    return backend
+
+
+def otp(phone, code, **kwargs):
+    return outbox.enqueue(phone, backends.LOGIN_OTP, {"verification-code": code}, **kwargs)
+
+
+class TestSmsOutbox:
+    def test_dispatch_sends_and_records_delivery(self, backend):
+        first = otp("+989121111111", "11111")
+        second = otp("+989121111112", "22222")
+
+        metrics = tasks.dispatch_sms_outbox()
+
+        assert metrics["sent"] == 2 and metrics["batches"] == 1
+        assert sorted(call[1] for call in backend.calls) == [["+989121111111"], ["+989121111112"]]
+        for message in (first, second):
+            message.refresh_from_db()
+            assert message.status == SmsOutbox.Status.SENT
+            assert message.sent_at is not None and message.latency_ms is not None
+            assert message.attempts == 1
+            assert message.params == {} # codes are not kept in the history
+
+    def test_a_burst_kicks_one_lingering_dispatcher(self, backend, django_capture_on_commit_callbacks):
+        for i in range(3):
+            with django_capture_on_commit_callbacks(execute=True):
+                otp(f"+98912111111{i}", f"{i:05d}")
+
+        assert backend.kicks == [{"countdown": OUTBOX_LINGER_SECONDS}]
+        assert outbox.dispatch()["sent"] == 3
+
+        with django_capture_on_commit_callbacks(execute=True):
+            otp("+989121111119", "99999")
+        assert len(backend.kicks) == 2
+
+    def test_equal_messages_share_a_call_within_the_provider_limit(self, backend):
+        for i in range(3):
+            outbox.enqueue(f"+98912111111{i}", backends.REMINDER, {"time": "10:00"})
+
+        outbox.dispatch()
+
+        assert sorted(len(recipients) for _, recipients, _ in backend.calls) == [1, 2]
+        assert SmsOutbox.objects.filter(status=SmsOutbox.Status.SENT, params={"time": "10:00"}).count() == 3
+
+    def test_batches_until_nothing_is_pending(self, backend):
+        for i in range(5):
+            otp(f"+98912111111{i}", f"{i:05d}")
+
+        metrics = outbox.dispatch(batch_size=2)
+
+        assert metrics["batches"] == 3 and metrics["sent"] == 5
+
+    def test_rows_held_elsewhere_are_skipped(self, backend):
+        message = otp("+989121111111", "11111")
+        SmsOutbox.objects.filter(id=message.id).update(status=SmsOutbox.Status.SENDING, claimed_at=timezone.now())
+
+        assert outbox.dispatch()["batches"] == 0
+        assert backend.calls == []
+
+    def test_rows_of_a_crashed_dispatcher_are_claimed_after_the_lease(self, backend):
+        message = otp("+989121111111", "11111")
+        outbox.claim(10, timezone.now()) # the dispatcher dies before sending
+
+        assert outbox.dispatch()["batches"] == 0
+        SmsOutbox.objects.filter(id=message.id).update(
+            claimed_at=timezone.now() - timezone.timedelta(seconds=OUTBOX_LEASE_SECONDS + 1),
+        )
+        assert outbox.dispatch()["sent"] == 1
+
+        message.refresh_from_db()
+        assert (message.status, message.attempts) == (SmsOutbox.Status.SENT, 2)
+
+    def test_a_reclaimed_row_without_attempts_left_fails(self, backend):
+        message = otp("+989121111111", "11111")
+        SmsOutbox.objects.filter(id=message.id).update(
+            status=SmsOutbox.Status.SENDING, attempts=OUTBOX_MAX_ATTEMPTS,
+            claimed_at=timezone.now() - timezone.timedelta(seconds=OUTBOX_LEASE_SECONDS + 1),
+        )
+
+        assert outbox.dispatch()["failed"] == 1
+        assert backend.calls == []
+        message.refresh_from_db()
+        assert (message.status, message.attempts, message.params) == (SmsOutbox.Status.FAILED, OUTBOX_MAX_ATTEMPTS, {})
+
+    def test_provider_failures_are_retried_on_later_runs(self, backend):
+        backend.errors = [ValidationError("502"), ValidationError("503")]
+        message = otp("+989121111111", "11111")
+
+        assert outbox.dispatch()["retried"] == 1
+        assert outbox.dispatch()["retried"] == 1
+        assert outbox.dispatch()["sent"] == 1
+
+        message.refresh_from_db()
+        assert (message.status, message.attempts) == (SmsOutbox.Status.SENT, 3)
+
+    def test_an_open_circuit_does_not_spend_attempts(self, backend):
+        backend.errors = [backends.SMSUnavailable("down")] * 10
+        message = otp("+989121111111", "11111")
+
+        for _ in range(10):
+            assert outbox.dispatch()["retried"] == 1
+
+        message.refresh_from_db()
+        assert (message.status, message.attempts) == (SmsOutbox.Status.PENDING, 0)
+        backend.errors = []
+        assert outbox.dispatch()["sent"] == 1
+
+    def test_attempts_are_bounded(self, backend):
+        backend.errors = [ValidationError("503")] * 10
+        message = otp("+989121111111", "11111")
+
+        for _ in range(5):
+            outbox.dispatch()
+
+        message.refresh_from_db()
+        assert message.status == SmsOutbox.Status.FAILED
+        assert len(backend.calls) == message.attempts == 3
+        assert "503" in message.last_error
+
+    def test_rejections_and_expired_codes_fail_without_retry(self, backend):
+        backend.errors = [backends.SMSRejected("invalid number")]
+        rejected = otp("+989121111111", "11111")
+        expired = otp("+989121111112", "22222", expires_at=timezone.now() - timezone.timedelta(seconds=1))
+
+        assert outbox.dispatch()["failed"] == 2
+        assert len(backend.calls) == 1
+        rejected.refresh_from_db()
+        expired.refresh_from_db()
+        assert rejected.status == expired.status == SmsOutbox.Status.FAILED
+        assert expired.last_error == "expired before it could be sent"
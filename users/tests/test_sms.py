@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from django.core.exceptions import ValidationError
+
+from third_parties.sms import backends, faraz_sms
+from users import tasks
+
+
+class StubProvider(ThreadingHTTPServer):
+    """Local stand-in for the SMS provider that counts TCP connections and requests."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.connections = 0
+        self.requests = []
+        self.statuses = []
+        self.delay = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.server.requests.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+        time.sleep(self.server.delay)
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = json.dumps({"status": status}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    server = StubProvider()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    for name, value in {
+        "FARAZ_SMS_API_KEY": "key",
+        "FARAZ_SMS_SENDER_NUMBER": "+983000",
+        "FARAZ_SMS_LOGIN_OTP_PATTERN_CODE": "otp",
+        "FARAZ_SMS_REMINDER_PATTERN_CODE": "reminder",
+        "FARAZ_SMS_PHONE_BOOK_ID": "1",
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(faraz_sms.SMSHandler, "BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(faraz_sms, "RETRY_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(backends, "_backends", {})
+
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestSMSHandler:
+    def test_login_pattern_code_is_required(self, provider, monkeypatch):
+        monkeypatch.delenv("FARAZ_SMS_LOGIN_OTP_PATTERN_CODE")
+
+        with pytest.raises(EnvironmentError):
+            faraz_sms.SMSHandler()
+
+    def test_missing_reminder_pattern_code_only_fails_reminders(self, provider, monkeypatch):
+        monkeypatch.delenv("FARAZ_SMS_REMINDER_PATTERN_CODE")
+        handler = faraz_sms.SMSHandler()
+
+        handler.send_pattern(backends.LOGIN_OTP, ["+989121111111"], {"verification-code": "12345"})
+        with pytest.raises(ValidationError):
+            handler.send_pattern(backends.REMINDER, ["+989121111111"], {"time": "10:00"})
+        assert len(provider.requests) == 1
+
+    def test_sends_reuse_one_connection(self, provider):
+        handler = faraz_sms.SMSHandler()
+        for i in range(5):
+            handler.send_sms_with_pattern("+989121111111", f"{i:05d}")
+
+        assert len(provider.requests) == 5
+        assert provider.connections == 1
+
+    def test_retries_5xx_then_succeeds(self, provider):
+        provider.statuses = [503, 502]
+
+        assert faraz_sms.SMSHandler().send_sms_with_pattern("+989121111111", "12345") == {"status": 200}
+        assert len(provider.requests) == 3
+
+    def test_retries_are_bounded(self, provider):
+        provider.statuses = [500] * 10
+
+        with pytest.raises(ValidationError):
+            faraz_sms.SMSHandler().send_sms_with_pattern("+989121111111", "12345")
+        assert len(provider.requests) == 1 + faraz_sms.MAX_RETRIES
+
+    def test_client_errors_are_not_retried(self, provider):
+        provider.statuses = [400]
+
+        with pytest.raises(backends.SMSRejected):
+            faraz_sms.SMSHandler().send_sms_with_pattern("+989121111111", "12345")
+        assert len(provider.requests) == 1
+
+    def test_read_timeout_fails_fast_without_resending(self, provider, monkeypatch):
+        monkeypatch.setattr(faraz_sms, "READ_TIMEOUT_SECONDS", 0.1)
+        provider.delay = 0.5
+
+        with pytest.raises(requests.ReadTimeout):
+            faraz_sms.SMSHandler().send_sms_with_pattern("+989121111111", "12345")
+        assert len(provider.requests) == 1
+
+    def test_connection_errors_surface_as_validation_errors(self, provider, monkeypatch):
+        port = provider.server_address[1]
+        provider.shutdown()
+        provider.server_close()
+
+        with pytest.raises(ValidationError):
+            faraz_sms.SMSHandler().send_request("POST", f"http://127.0.0.1:{port}/v1/api/send", {}, {})
+
+
+class DownBackend(backends.BaseBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def send_pattern(self, pattern, recipients, params):
+        self.calls += 1
+        raise ValidationError("provider is down")
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    monkeypatch.setattr(backends, "outbox", [])
+    return backends.outbox
+
+
+class TestBackends:
+    def test_backend_is_abstract(self):
+        with pytest.raises(TypeError):
+            backends.BaseBackend()
+
+    def test_open_circuit_fails_over_without_calling_the_primary(self, outbox):
+        primary = DownBackend()
+        backend = backends.FailoverBackend(primary, backends.MemoryBackend())
+
+        for _ in range(backends.BREAKER_FAILURES):
+            with pytest.raises(ValidationError):
+                backend.send_pattern(backends.LOGIN_OTP, ["+989121111111"], {"verification-code": "12345"})
+        backend.send_pattern(backends.LOGIN_OTP, ["+989121111111"], {"verification-code": "54321"})
+
+        assert primary.calls == backends.BREAKER_FAILURES
+        assert outbox == [
+            {"pattern": "login_otp", "recipients": ["+989121111111"], "params": {"verification-code": "54321"}},
+        ]
+
+    def test_open_circuit_without_fallback_fails_fast(self):
+        primary = DownBackend()
+        backend = backends.FailoverBackend(primary)
+        for _ in range(backends.BREAKER_FAILURES):
+            with pytest.raises(ValidationError):
+                backend.send_pattern(backends.REMINDER, ["+989121111111"], {})
+
+        with pytest.raises(backends.SMSUnavailable):
+            backend.send_pattern(backends.REMINDER, ["+989121111111"], {})
+        assert primary.calls == backends.BREAKER_FAILURES
+
+    def test_breaker_is_shared_by_every_worker(self):
+        for _ in range(backends.BREAKER_FAILURES):
+            with pytest.raises(ValidationError):
+                backends.FailoverBackend(DownBackend()).send_pattern(backends.REMINDER, ["+989121111111"], {})
+
+        other_worker = DownBackend()
+        with pytest.raises(backends.SMSUnavailable):
+            backends.FailoverBackend(other_worker).send_pattern(backends.REMINDER, ["+989121111111"], {})
+        assert other_worker.calls == 0
+
+    def test_rejections_keep_the_circuit_closed(self, provider):
+        provider.statuses = [400] * (backends.BREAKER_FAILURES + 1)
+        backend = backends.FailoverBackend(faraz_sms.SMSHandler())
+
+        for _ in range(backends.BREAKER_FAILURES + 1):
+            with pytest.raises(backends.SMSRejected):
+                backend.send_pattern(backends.LOGIN_OTP, ["+989121111111"], {"verification-code": "12345"})
+        assert len(provider.requests) == backends.BREAKER_FAILURES + 1
+
+    def test_file_and_console_backends_write_json_lines(self, tmp_path, capsys):
+        path = tmp_path / "sms.log"
+        backends.FileBackend(path).send_pattern(backends.REMINDER, ["+989121111111"], {"time": "10:00"})
+        backends.ConsoleBackend().send_pattern(backends.REMINDER, ["+989121111112"], {"time": "11:00"})
+
+        assert json.loads(path.read_text())["params"] == {"time": "10:00"}
+        assert json.loads(capsys.readouterr().out)["recipients"] == ["+989121111112"]
+
+    def test_backend_comes_from_settings(self, settings, monkeypatch, outbox):
+        monkeypatch.setattr(backends, "_backends", {})
+        settings.SMS_BACKEND = "third_parties.sms.backends.MemoryBackend"
+
+        tasks.send_otp_sms("+989121111111", "12345")
+
+        assert outbox == [
+            {"pattern": "login_otp", "recipients": ["+989121111111"], "params": {"verification-code": "12345"}},
+        ]
+
+
+class TestSendOtpTask:
+    def test_worker_builds_one_handler(self, provider):
+        tasks.send_otp_sms("+989121111111", "12345")
+        tasks.send_otp_sms("+989121111112", "54321")
+
+        assert [body["recipients"] for body in provider.requests] == [["+989121111111"], ["+989121111112"]]
+        assert [body["params"]["verification-code"] for body in provider.requests] == ["12345", "54321"]
+        assert provider.connections == 1
+        assert backends.get_sms_backend() is backends.get_sms_backend()
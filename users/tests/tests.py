@@ -5,37 +5,43 @@ from django.contrib.auth import get_user_model
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from users.models import SmsOutbox
+
 User = get_user_model()
 pytestmark = pytest.mark.django_db
 
 
 class TestOTPAuth:
-    def test_otp_request_stores_otp_and_calls_celery(self, api_client, monkeypatch):
+    def test_otp_request_stores_otp_and_writes_outbox(
+        self, api_client, monkeypatch, django_capture_on_commit_callbacks,
+    ):
         phone = "+989121234567"
         fixed_otp = "1234"
 
         # Mock OTP generator
         monkeypatch.setattr("users.views.generate_otp", lambda length=4: fixed_otp)
 
-        # Mock celery delay
-        called = {"ok": False, "args": None}
+        # Mock the dispatcher kick
+        called = {"count": 0}
 
-        def fake_delay(p, o):
-            called["ok"] = True
-            called["args"] = (p, o)
+        def fake_apply_async(**kwargs):
+            called["count"] += 1
 
-        monkeypatch.setattr("users.views.send_otp_sms.delay", fake_delay)
+        monkeypatch.setattr("users.tasks.dispatch_sms_outbox.apply_async", fake_apply_async)
 
-        res = api_client.post(
-            "/users/otp/request/",
-            data={"phone_number": phone},
-            format="json"
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            res = api_client.post(
+                "/users/otp/request/",
+                data={"phone_number": phone},
+                format="json"
+            )
 
         assert res.status_code == 200
         assert cache.get(f"otp_{phone}") == fixed_otp
-        assert called["ok"] is True
-        assert called["args"] == (phone, fixed_otp)
+        message = SmsOutbox.objects.get()
+        assert (message.phone_number, message.params) == (phone, {"verification-code": fixed_otp})
+        assert message.status == SmsOutbox.Status.PENDING
+        assert called["count"] == 1
 
     def test_otp_login_sets_cookies_and_deletes_cache(self, api_client):
         phone = "+989121234567"
@@ -69,3 +75,15 @@ class TestUserInfo:
 
         assert res.status_code == 200
         assert res.json()["phone_number"] == "+989121234567"
+
+    def test_async_user_info_matches_sync_view(self, api_client):
+        user = User.objects.create_user(phone_number="+989121234567", password="x12345678")
+        api_client.cookies["accessToken"] = str(RefreshToken.for_user(user).access_token)
+
+        res = api_client.get("/users/async/info/")
+
+        assert res.status_code == 200
+        assert res.json() == api_client.get("/users/info/").json()
+
+    def test_async_user_info_requires_auth(self, api_client):
+        assert api_client.get("/users/async/info/").status_code == 401
@@ -13,4 +13,5 @@ urlpatterns = [
     path('otp/login/', views.OTPLoginView.as_view()),
 
     path('info/', views.UserInfoView.as_view()),
+    path('async/info/', views.user_info_async),
 ]
\ No newline at end of file
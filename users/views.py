@@ -7,11 +7,16 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import InvalidToken
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.utils import timezone
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 
 from users.serializers import SignUpSerializer, OTPRequestSerializer, OTPLoginSerializer, UserInfoSerializer
+from users.authentications import token_user_id
 from users.utils import set_tokens_on_cookie, generate_otp
-from users.tasks import send_otp_sms
+from users import outbox
 from users.defaults import OTP_EXPIRY_SECONDS
+from third_parties.sms.backends import LOGIN_OTP
 
 User = get_user_model()
 
@@ -56,9 +61,11 @@ class OTPRequestView(APIView):
         normalized_phone = serializer.validated_data["phone_number"]
 
         otp = generate_otp()
-        print(otp)
         cache.set(f"otp_{raw_phone}", otp, timeout=OTP_EXPIRY_SECONDS)
-        send_otp_sms.delay(raw_phone, otp)
+        outbox.enqueue(
+            raw_phone, LOGIN_OTP, {"verification-code": otp},
+            expires_at=timezone.now() + timezone.timedelta(seconds=OTP_EXPIRY_SECONDS),
+        )
 
         return Response({"message": "OTP sent successfully"}, status=status.HTTP_200_OK)
 
@@ -106,4 +113,20 @@ class UserInfoView(APIView):
             User.objects.only("id", "phone_number", "first_name", "last_name","is_phone_verified")
             .get(id=request.user.id))
         
-        return Response(UserInfoSerializer(user).data)
\ No newline at end of file
+        return Response(UserInfoSerializer(user).data)
+
+
+@require_GET
+async def user_info_async(request):
+    """Async twin of ``UserInfoView.get``: token check without a query, one async ORM read."""
+    user_id = token_user_id(request)
+    if user_id is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    try:
+        user = await (
+            User.objects.only("id", "phone_number", "first_name", "last_name","is_phone_verified")
+            .aget(id=user_id, is_active=True))
+    except User.DoesNotExist:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    return JsonResponse(UserInfoSerializer(user).data)